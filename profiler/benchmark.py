@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""Benchmark suite of the sampler, the deterministic calculation routines and end-to-end MCS.
+
+Every benchmark is run at scales (i.e. number of samples, data points or time steps) from 1e2 up to `--max-scale`
+with fixed seeds, and timings are saved in a JSON file to be compared between versions.
+
+Usage:
+    python profiler/benchmark.py [--out=<file>] [--max-scale=<n>] [--repeat=<n>] [--filter=<str>]
+    python profiler/benchmark.py --compare=<baseline> [--tolerance=<ratio>] [--out=<file>] ...
+
+Examples:
+    python profiler/benchmark.py --out=benchmark-0.8.1.json --max-scale=1e4
+    python profiler/benchmark.py --filter=teq_main --compare=benchmark-0.8.1.json
+"""
+import argparse
+import contextlib
+import copy
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+SEED = 0
+SCALES = (100, 1000, 10000, 100000, 1000000)
+BENCHMARKS = dict()  # {name: (setup, scales)}, see `benchmark`
+
+
+def benchmark(name: str, scales: tuple = SCALES):
+    """Registers `setup` as a benchmark, `setup(scale)` prepares inputs and returns a callable which is timed."""
+
+    def decorator(setup):
+        BENCHMARKS[name] = (setup, scales)
+        return setup
+
+    return decorator
+
+
+def _example_case(**kwargs) -> dict:
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT
+    x = copy.deepcopy(list(EXAMPLE_INPUT_DICT.values())[0])
+    x.update(kwargs)
+    return x
+
+
+# fire types of `teq_main`, (fire_mode, timber_exposed_area)
+TEQ_MAIN_FIRES = dict(parametric=(0, 0), travelling=(1, 0), din=(2, 0), timber=(3, 100))
+
+
+@benchmark('mcs_gen.random_variable_generator')
+def _random_variable_generator(scale: int):
+    from sfeprapy.func.mcs_gen import random_variable_generator
+
+    dists = [
+        dict(dist='gumbel_r_', lbound=10, ubound=1500, mean=420, sd=126),
+        dict(dist='lognorm_mod_', lbound=0.0001, ubound=0.9999, mean=0.2, sd=0.2),
+        dict(dist='norm_', lbound=623.15, ubound=2023.15, mean=1323.15, sd=93),
+        dict(dist='uniform_', lbound=0.0035, ubound=0.0190),
+    ]
+
+    def run():
+        rng = np.random.default_rng(SEED)
+        for dist in dists:
+            random_variable_generator(copy.copy(dist), scale, rng=rng)
+
+    return run
+
+
+@benchmark('mcs_gen.main')
+def _mcs_gen_main(scale: int):
+    from sfeprapy.func.mcs_gen import main
+
+    x = _example_case()
+    return lambda: main(copy.deepcopy(x), scale, rng=np.random.default_rng(SEED))
+
+
+def _teq_main_samples(fire: str, scale: int):
+    from sfeprapy.func.mcs_gen import main
+
+    fire_mode, timber_exposed_area = TEQ_MAIN_FIRES[fire]
+    x = _example_case(fire_mode=fire_mode, timber_exposed_area=timber_exposed_area, n_simulations=scale)
+    return main(x, scale, rng=np.random.default_rng(SEED))
+
+
+def _teq_main(fire: str):
+    def setup(scale: int):
+        from sfeprapy.mcs0.mcs0_calc import teq_main
+
+        x = _teq_main_samples(fire, scale).to_dict(orient='records')
+
+        def run():
+            np.random.seed(SEED)
+            for kwargs in x:
+                teq_main(**kwargs)
+
+        return run
+
+    return setup
+
+
+def _teq_main_batch(fire: str):
+    def setup(scale: int):
+        from sfeprapy.mcs0.mcs0_calc import teq_main_batch
+
+        df = _teq_main_samples(fire, scale)
+
+        def run():
+            np.random.seed(SEED)
+            teq_main_batch(df)
+
+        return run
+
+    return setup
+
+
+for fire_ in TEQ_MAIN_FIRES:
+    benchmark(f'mcs0.teq_main[{fire_}]', SCALES[:3])(_teq_main(fire_))
+    benchmark(f'mcs0.teq_main_batch[{fire_}]', SCALES[:3])(_teq_main_batch(fire_))
+
+
+def _run_mcs(n_threads: int):
+    def setup(scale: int):
+        from sfeprapy.mcs0.mcs0_calc import MCS0
+
+        x = _example_case(n_simulations=scale)
+
+        def run():
+            mcs = MCS0()
+            mcs.mcs_inputs = {x['case_name']: copy.deepcopy(x)}
+            mcs.mcs_config = dict(n_threads=n_threads, seed=SEED)  # `cwd` undefined, results are not written
+            with contextlib.redirect_stdout(io.StringIO()):
+                mcs.run_mcs()
+
+        return run
+
+    return setup
+
+
+for n_threads_ in (1, 2, 4, 8):
+    benchmark(f'mcs0.MCS0.run_mcs[n_threads={n_threads_}]', SCALES[:3])(_run_mcs(n_threads_))
+
+
+@benchmark('stats_dist_fit.fit')
+def _stats_dist_fit(scale: int):
+    import scipy.stats as st
+    from sfeprapy.func.stats_dist_fit import fit
+
+    data = st.gumbel_r(loc=420, scale=126).rvs(size=scale, random_state=np.random.default_rng(SEED))
+    return lambda: fit(data, distribution_list=[st.norm, st.gumbel_r, st.lognorm], suppress_print=True)
+
+
+@benchmark('heat_transfer_1d_finite_difference', SCALES[:4])
+def _heat_transfer_1d_finite_difference(scale: int):
+    """Steel plate exposed to ISO 834, as the `__main__` of `heat_transfer_1d_finite_difference`, `scale` being the
+    number of time steps."""
+    from sfeprapy.func import heat_transfer_1d_finite_difference as ht
+
+    nodes, dx, dt = 100, 0.1 / 100, 0.025
+    hchot, hccold, effemis, tamb = 25, 9, 0.8, 20
+
+    def run():
+        temp_arr = np.full((nodes,), 20.)
+        for tstep in range(1, scale + 1):
+            lamda = np.array([ht.k_steel_T(temp) for temp in temp_arr])
+            cp = np.array([ht.c_steel_T(temp) for temp in temp_arr])
+            rho = np.full_like(temp_arr, 7850)
+            gas_temp = ht.ISO834_ft(dt * tstep)
+
+            q_inc = ht.ONEDHT_QINC(gas_temp, temp_arr[0], effemis, hchot)
+            temp_arr[0] = ht.ONEDHT_ELEM1(
+                q_inc, temp_arr[0], temp_arr[1], lamda[0], lamda[1], dx, dt, cp[0], rho[0])
+            for i in range(1, nodes - 1):
+                temp_arr[i] = ht.ONEDHT_ELEMJ(
+                    temp_arr[i - 1], temp_arr[i], temp_arr[i + 1], lamda[i - 1], lamda[i], lamda[i + 1], dx, dt,
+                    cp[i], rho[i])
+            q_out = ht.ONEDHT_QOUT(temp_arr[-1], tamb, effemis, hccold)
+            temp_arr[-1] = ht.ONEDHT_ELEMF(
+                q_out, temp_arr[-2], temp_arr[-1], lamda[-2], lamda[-1], dx, dt, cp[-1], rho[-1])
+
+    return run
+
+
+def run_benchmarks(max_scale: int = SCALES[-1], repeat: int = 3, name_filter: str = None) -> dict:
+    """Runs all registered benchmarks up to `max_scale`.
+
+    :param max_scale: largest scale to run.
+    :param repeat: number of timed runs of each benchmark and scale, the fastest is the representative one.
+    :param name_filter: optional, only benchmarks whose name contains this string are run.
+    :return: {'meta': environment, 'results': {'<name>@<scale>': dict(name, scale, times, min, median, per_second)}}
+    """
+    results = dict()
+    for name, (setup, scales) in BENCHMARKS.items():
+        if name_filter and name_filter not in name:
+            continue
+        for scale in scales:
+            if scale > max_scale:
+                break
+            run = setup(scale)
+            times = list()
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - t0)
+            results[f'{name}@{scale}'] = dict(
+                name=name, scale=scale, times=times, min=min(times), median=float(np.median(times)),
+                per_second=scale / min(times),
+            )
+            print(f'{name:<48.48} {scale:>8d} {min(times):>10.4f} s {scale / min(times):>12.1f} /s', flush=True)
+    return dict(meta=_meta(), results=results)
+
+
+def _meta() -> dict:
+    import sfeprapy
+    import scipy
+    import pandas
+
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.realpath(__file__)), stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return dict(
+        sfeprapy=sfeprapy.__version__, commit=commit, python=platform.python_version(), numpy=np.__version__,
+        scipy=scipy.__version__, pandas=pandas.__version__, platform=platform.platform(), cpu_count=os.cpu_count(),
+        seed=SEED, date=datetime.datetime.now().isoformat(timespec='seconds'),
+    )
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.1) -> list:
+    """Compares the fastest timings of benchmarks run in both `baseline` and `current`.
+
+    :return: list of (key, baseline time, current time, ratio) of which ratio exceeds `1 + tolerance`, i.e. regressions.
+    """
+    regressions = list()
+    print(f'{"":<57} {"baseline":>10} {"current":>10} {"ratio":>7}')
+    for key, v in current['results'].items():
+        v0 = baseline['results'].get(key)
+        if v0 is None:
+            continue
+        ratio = v['min'] / v0['min']
+        flag = ' *' if ratio > 1 + tolerance else ''
+        print(f'{key:<57.57} {v0["min"]:>10.4f} {v["min"]:>10.4f} {ratio:>7.2f}{flag}')
+        if flag:
+            regressions.append((key, v0['min'], v['min'], ratio))
+    return regressions
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='sfeprapy benchmark suite')
+    parser.add_argument('--out', default='benchmark.json', help='JSON file to save results, `benchmark.json` default')
+    parser.add_argument('--max-scale', default=f'{SCALES[2]:g}', help='largest scale to run, 1e4 by default')
+    parser.add_argument('--repeat', default=3, type=int, help='number of timed runs per benchmark, 3 by default')
+    parser.add_argument('--filter', default=None, help='only benchmarks whose name contains this string')
+    parser.add_argument('--compare', default=None, help='JSON file of a previous run to compare with')
+    parser.add_argument('--tolerance', default=0.1, type=float, help='slowdown ratio reported as regression')
+    args = parser.parse_args(argv)
+
+    res = run_benchmarks(max_scale=int(float(args.max_scale)), repeat=args.repeat, name_filter=args.filter)
+    with open(args.out, 'w') as f:
+        json.dump(res, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if compare(baseline, res, tolerance=args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,23 @@
 """SfePrapy CLI Help.
 Usage:
     sfeprapy
-    sfeprapy mcs0 run [-p=<int>] <file_name>
+    sfeprapy mcs0 run [-p=<int>] [--resume] [--seed=<int>] [--cache=<dir>] [--iso834-table] [--table-cache=<dir>]
+                      [--remote=<address>] [--authkey=<str>] <file_name>
     sfeprapy mcs0 template <file_name>
-    sfeprapy mcs2 run [-p=<int>] <file_name>
+    sfeprapy mcs2 run [-p=<int>] [--resume] [--seed=<int>] [--cache=<dir>] [--iso834-table] [--table-cache=<dir>]
+                      [--remote=<address>] [--authkey=<str>] <file_name>
     sfeprapy mcs2 template <file_name>
+    sfeprapy worker [-p=<int>] --authkey=<str> <address>
 
 Examples:
     sfeprapy mcs0 template inputs.csv
     sfeprapy mcs0 template inputs.xlsx
     sfeprapy mcs0 run -p 2 inputs.csv
+    sfeprapy mcs0 run -p 2 --resume inputs.csv
+    sfeprapy mcs0 run -p 2 --seed 0 --cache ~/.sfeprapy/cache inputs.csv
+    sfeprapy mcs0 run -p 2 --table-cache ~/.sfeprapy/cache/iso834_steel_table inputs.csv
+    sfeprapy mcs0 run -p 128 --remote 192.168.1.10:50000 --authkey <secret> inputs.csv
+    sfeprapy worker -p 64 --authkey <secret> 192.168.1.10:50000
     sfeprapy mcs0 figure mcs.out.csv
 
 Options:
@@ -21,12 +29,28 @@ Options:
                     0   fit to all available distributions.
                     1   (default) fit to common distribution types.
     -p=<int>        to define number of processes for MCS, positive integer only. 2 by default.
+    --resume        to continue an interrupted MCS from results saved in `mcs.out`, completed samples are skipped.
+    --seed=<int>    master seed, results are reproducible with the same seed. Drawn from OS entropy by default.
+    --cache=<dir>   to load results of cases unchanged since a previous run with the same `--seed` from the cache at
+                    <dir>, results of solved cases are added to it. Ignored if `--seed` is undefined.
+    --iso834-table  to interpolate time equivalence in ISO 834 fire from a steel temperature table of each case
+                    rather than solving the heat transfer of every sample.
+    --table-cache=<dir>
+                    to keep the tables of `--iso834-table` at <dir>, shared by worker processes and runs, implies
+                    `--iso834-table`. Tables are kept in memory of each worker process only by default.
+    --remote=<address>
+                    to serve MCS tasks at <address> (host:port) to workers started by `sfeprapy worker` on any host,
+                    the number of processes is then the total number of worker processes on all hosts.
+    --authkey=<str> shared secret of `--remote` and `sfeprapy worker`, anything connecting with it can run code on
+                    both. Required by `sfeprapy worker` and by `--remote` at other than a loopback address, a random
+                    one is generated and printed for a loopback address if undefined.
     -h --help       to show this message.
 
 Commands:
     mcs0 run        Monte Carlo Simulation to solve equivalent time exposure in ISO 834 fire, method 0.
     mcs0 figure     produce figure from the output file <file_name>.
     mcs0 template   save example input file to <file_name>.
+    worker          start -p worker processes on this host for a MCS run with `--remote` served at <address>.
 """
 
 from docopt import docopt
@@ -59,7 +83,12 @@ def main():
         else:
             fp_mcs_in = arguments["<file_name>"]
             n_threads = arguments["-p"] or 2
-            mcs0(fp_mcs_in=fp_mcs_in, n_threads=int(n_threads))
+            mcs0(
+                fp_mcs_in=fp_mcs_in, n_threads=int(n_threads), resume=arguments["--resume"],
+                cache=arguments["--cache"], remote=arguments["--remote"], authkey=arguments["--authkey"],
+                iso834_table=arguments["--iso834-table"], table_cache=arguments["--table-cache"],
+                seed=int(arguments["--seed"]) if arguments["--seed"] else None,
+            )
 
     elif arguments['mcs2']:
         if arguments['template']:
@@ -71,7 +100,19 @@ def main():
         else:
             fp_mcs_in = arguments["<file_name>"]
             n_threads = arguments["-p"] or 2
-            mcs2(fp_mcs_in=fp_mcs_in, n_threads=int(n_threads))
+            mcs2(
+                fp_mcs_in=fp_mcs_in, n_threads=int(n_threads), resume=arguments["--resume"],
+                cache=arguments["--cache"], remote=arguments["--remote"], authkey=arguments["--authkey"],
+                iso834_table=arguments["--iso834-table"], table_cache=arguments["--table-cache"],
+                seed=int(arguments["--seed"]) if arguments["--seed"] else None,
+            )
+
+    elif arguments["worker"]:
+        from sfeprapy.func.mcs_executor import remote_worker
+        remote_worker(
+            address=arguments["<address>"], authkey=arguments["--authkey"],
+            n_processes=int(arguments["-p"] or 2),
+        )
 
     elif arguments["distfit"]:
         # Default values
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+from typing import Union
+
+import numpy as np
+
+
+def _column(*args) -> list:
+    """Broadcasts float or (n_s,) arguments against each other, each returned as a (n_s, 1) array."""
+    return [np.atleast_1d(np.asarray(v, dtype=float))[:, np.newaxis] for v in np.broadcast_arrays(*args)]
+
+
+def _min(a, b) -> np.ndarray:
+    """Element-wise Python `min(a, b)`, i.e. `a` unless `b` is less, which differs from `np.minimum` for nan."""
+    return np.where(b < a, b, a)
+
+
+def temperature_ec(
+        t: np.ndarray,
+        A_t: Union[float, np.ndarray],
+        A_f: Union[float, np.ndarray],
+        A_v: Union[float, np.ndarray],
+        h_eq: Union[float, np.ndarray],
+        q_fd: Union[float, np.ndarray],
+        lambda_: Union[float, np.ndarray],
+        rho: Union[float, np.ndarray],
+        c: Union[float, np.ndarray],
+        t_lim: Union[float, np.ndarray],
+        temperature_initial: Union[float, np.ndarray] = 293.15,
+) -> np.ndarray:
+    """EN 1991-1-2 Annex A parametric fire gas temperature for a batch of samples, vectorised version of `temperature` in
+    `fsetools.lib.fse_bs_en_1991_1_2_parametric_fire`, expressions and order of operations are kept the same as fsetools
+    so results agree to floating point precision. Ventilation and fuel controlled samples are solved together, the
+    regime is selected per sample.
+
+    :param t:                   [s], (n_t,) time array shared by all samples.
+    :param A_t:                 [m2], total surface area (including openings), float or (n_s,).
+    :param A_f:                 [m2], floor area, float or (n_s,).
+    :param A_v:                 [m2], opening area, float or (n_s,).
+    :param h_eq:                [m], opening height, float or (n_s,).
+    :param q_fd:                [J/m2], fuel density, float or (n_s,).
+    :param lambda_:             [K/kg/m], lining thermal conductivity, float or (n_s,).
+    :param rho:                 [kg/m3], lining density, float or (n_s,).
+    :param c:                   [J/K/kg], lining thermal capacity, float or (n_s,).
+    :param t_lim:               [s], limiting time for the fire, float or (n_s,).
+    :param temperature_initial: [K], float or (n_s,).
+    :return T_g:                [K], (n_s, n_t) gas temperature.
+    """
+    A_t, A_f, A_v, h_eq, q_fd, lambda_, rho, c, t_lim, temperature_initial = _column(
+        A_t, A_f, A_v, h_eq, q_fd, lambda_, rho, c, t_lim, temperature_initial)
+
+    # UNITS: SI -> Equations
+    q_fd = q_fd / 1e6  # [J/m2] -> [MJ/m2]
+    t_lim = t_lim / 3600  # [s] -> [hr]
+    t = np.asarray(t, dtype=float)[np.newaxis, :] / 3600  # [s] -> [hr]
+    temperature_initial = temperature_initial - 273.15  # [K] -> [C]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        b = (lambda_ * rho * c) ** 0.5
+        O = A_v * h_eq ** 0.5 / A_t
+        q_td = q_fd * A_f / A_t
+        Gamma = ((O / 0.04) / (b / 1160)) ** 2
+
+        t_max = 0.0002 * q_td / O
+        t_star_max = Gamma * t_max
+
+        # fuel controlled fire, eq. 3.9 and 3.10
+        O_lim = 0.0001 * q_td / t_lim
+        Gamma_lim = ((O_lim / 0.04) / (b / 1160)) ** 2
+        is_k = (O > 0.04) & (q_td < 75) & (b < 1160)
+        k = 1 + ((O - 0.04) / (0.04)) * ((q_td - 75) / (75)) * ((1160 - b) / (1160))
+        Gamma_lim = np.where(is_k, Gamma_lim * k, Gamma_lim)
+
+        is_vent = t_max >= t_lim  # ventilation controlled fire, otherwise fuel controlled (also if nan)
+        Gamma_heating = np.where(is_vent, Gamma, Gamma_lim)
+        T_max = _temperature_heating(np.where(is_vent, t_star_max, Gamma_lim * t_lim), temperature_initial)
+
+        # eq. 3.16 (ventilation controlled) and eq. 3.22 (fuel controlled)
+        t_star = Gamma * t
+        t_star_0 = np.where(is_vent, t_star_max, Gamma * t_lim)
+        rate = np.select(
+            [t_star_max <= 0.5, (0.5 < t_star_max) & (t_star_max < 2.0), 2.0 <= t_star_max],
+            [np.full_like(t_star_max, 625.), 250 * (3 - t_star_max), np.full_like(t_star_max, 250.)],
+            np.nan,
+        )
+        t_star -= t_star_0
+        t_star *= rate
+        T_g = np.subtract(T_max, t_star, out=t_star)
+
+        # heating (eq. 3.12, increasing) and cooling (decreasing) both reach `T_max` at the peak, i.e. `t_max` if
+        # ventilation controlled or `t_lim` if fuel controlled, after which the cooling is the lesser. The heating
+        # phase, where most of the cost is, is only evaluated up to the peak of each sample
+        t_peak = np.where(is_vent, t_max, t_lim)[:, 0]
+        is_monotonic = np.all(np.isfinite(np.hstack([t_peak[:, None], Gamma, Gamma_heating, T_max, rate])), axis=1)
+        is_monotonic &= (Gamma[:, 0] >= 0) & (Gamma_heating[:, 0] >= 0) & (rate[:, 0] >= 0)
+        n_heating = np.where(is_monotonic, np.searchsorted(t[0], np.where(is_monotonic, t_peak, 0), side='right'),
+                             t.shape[1])
+    for i, n in _row_groups(n_heating):
+        with np.errstate(over='ignore', invalid='ignore'):
+            T_heating_g = _temperature_heating(Gamma_heating[i] * t[:, :n], temperature_initial[i])
+        T_g[i, :n] = np.minimum(T_heating_g, T_g[i, :n])
+
+    np.maximum(T_g, temperature_initial, out=T_g)
+
+    # UNITS: Eq. -> SI
+    T_g += 273.15
+    return T_g
+
+
+def _row_groups(n_columns: np.ndarray, size: int = 32):
+    """Groups of up to `size` rows of similar `n_columns`, yields (row indices, max `n_columns` of the rows)."""
+    order = np.argsort(n_columns, kind='stable')
+    for i_0 in range(0, len(order), size):
+        i = order[i_0:i_0 + size]
+        yield i, int(n_columns[i[-1]])
+
+
+def _temperature_heating(t_star: np.ndarray, temperature_initial: np.ndarray) -> np.ndarray:
+    # eq. 3.12
+    T_g = 1325 * (
+            1
+            - 0.324 * np.exp(-0.2 * t_star)
+            - 0.204 * np.exp(-1.7 * t_star)
+            - 0.472 * np.exp(-19 * t_star)
+    )
+    return T_g + temperature_initial
+
+
+def temperature_din(
+        t_array_s: np.ndarray,
+        A_w_m2: Union[float, np.ndarray],
+        h_w_m2: Union[float, np.ndarray],
+        A_t_m2: Union[float, np.ndarray],
+        A_f_m2: Union[float, np.ndarray],
+        t_alpha_s: Union[float, np.ndarray],
+        b_Jm2s05K: Union[float, np.ndarray],
+        q_x_d_MJm2: Union[float, np.ndarray],
+        gamma_fi_Q: Union[float, np.ndarray] = 1.0,
+        q_ref: Union[float, np.ndarray] = 1300,
+        alpha: Union[float, np.ndarray] = 0.0117,
+        hrrpua_MWm2: Union[float, np.ndarray] = 0.25,
+) -> np.ndarray:
+    """DIN EN 1991-1-2/NA:2010-12 Annex AA parametric fire gas temperature for a batch of samples, vectorised version of
+    `temperature` in `fsetools.lib.fse_din_en_1991_1_2_parametric_fire`, expressions and order of operations
+    (including the modified AA.27 and AA.28 of fsetools) are kept the same as fsetools so results agree to floating
+    point precision. Samples fsetools warns about (unknown fire type or Q_1 out of bound for AA.20 to AA.23) are at 20
+    C, same as fsetools, without the warning.
+
+    :param t_array_s:   [s], (n_t,) time array shared by all samples.
+    :param A_w_m2:      [m2], window opening area, float or (n_s,).
+    :param h_w_m2:      [m], weighted window opening height, float or (n_s,).
+    :param A_t_m2:      [m2], total enclosure internal surface area, including openings, float or (n_s,).
+    :param A_f_m2:      [m2], total floor area, float or (n_s,).
+    :param t_alpha_s:   [s], fire growth factor, float or (n_s,).
+    :param b_Jm2s05K:   [J/m2/s0.5/K], weighted heat storage capacity, float or (n_s,).
+    :param q_x_d_MJm2:  [MJ/m2], design value for fire load density, float or (n_s,).
+    :param gamma_fi_Q:  [-], partial factor according to BB.5.3, float or (n_s,).
+    :param q_ref:       [MJ/m2], reference upper bound heat release rate, float or (n_s,).
+    :param alpha:       [kW/s2], growth constant for t-square fire, float or (n_s,).
+    :param hrrpua_MWm2: [MW/m2], heat release rate per unit area, float or (n_s,).
+    :return T:          [K], (n_s, n_t) gas temperature.
+    """
+    A_w, h_w, A_t, A_f, t_alpha, b, q_x_d, gamma_fi_Q, q_ref, alpha, hrrpua = _column(
+        A_w_m2, h_w_m2, A_t_m2, A_f_m2, t_alpha_s, b_Jm2s05K, q_x_d_MJm2, gamma_fi_Q, q_ref, alpha, hrrpua_MWm2)
+    t = np.asarray(t_array_s, dtype=float)[np.newaxis, :]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Q_max_v_k = 1.21 * A_w * np.sqrt(h_w)  # [MW] AA.1
+        Q_max_f_k = hrrpua * A_f  # [MW] AA.2
+        Q_max_k = _min(Q_max_f_k, Q_max_v_k)  # [MW] AA.3
+        Q_max_v_d = gamma_fi_Q * Q_max_v_k  # [MW] AA.5
+        Q_max_f_d = gamma_fi_Q * Q_max_f_k  # [MW] AA.6
+        Q_max_d = gamma_fi_Q * Q_max_k
+
+        is_vent = Q_max_v_k == Q_max_k
+        is_fuel = ~is_vent & (Q_max_f_k == Q_max_k)
+
+        O = A_w * h_w ** 0.5 / A_t
+        Q_d = q_ref * A_f  # [MJ], total fire load in the compartment
+
+        # AA.7 - AA.12, ventilation controlled fire
+        t_1_v = t_alpha * np.sqrt(Q_max_v_d)
+        T_1_v = -8.75 / O - 0.1 * b + 1175
+        t_2_v = t_1_v + (0.7 * Q_d - t_1_v ** 3 / (3 * t_alpha ** 2)) / Q_max_v_d
+        T_2_v = _min(1134, (0.004 * b - 17) / O - 0.4 * b + 2175)
+        t_3_v = t_2_v + (2 * (0.3 * Q_d))
+        T_3_v = -5.0 / O - 0.16 * b + 1060
+
+        # AA.13 - AA.19, fuel controlled fire
+        k = ((Q_max_f_d ** 2) / (A_w * h_w ** 0.5 * (A_t - A_w) * b)) ** (1 / 3)
+        t_1_f = t_alpha * Q_max_f_d ** 0.5
+        Q_1_f = 1 / 3 * alpha * t_alpha ** 3
+        Q_1_f = Q_1_f * 1e-3
+        T_1_f = _min(980, 24000 * k + 20)
+        t_2_f = t_1_f + (0.7 * Q_d - Q_1_f) / Q_max_f_d
+        T_2_f = _min(1340, 33000 * k + 20)
+        t_3_f = t_2_f + (2 * (0.3 * Q_d)) / Q_max_f_d
+        T_3_f = _min(660, 16000 * k + 20)
+
+        t_1, t_2, t_3, T_1, T_2, T_3 = [
+            np.where(is_vent, v, np.where(is_fuel, f, np.nan)) for v, f in (
+                (t_1_v, t_1_f), (t_2_v, t_2_f), (t_3_v, t_3_f), (T_1_v, T_1_f), (T_2_v, T_2_f), (T_3_v, T_3_f))
+        ]
+
+        # AA.20 - AA.23
+        Q_1 = t_1 ** 3 / (3 * t_alpha ** 2)  # [MW]
+        Q_x_d = q_x_d * A_f
+        is_aa20 = Q_1 < 0.7 * Q_x_d
+        is_aa22 = ~is_aa20 & (Q_1 >= 0.7)
+        t_2_x_aa20 = t_1 + (0.7 * Q_x_d - t_1 ** 3 / (3 * t_alpha ** 2)) / Q_max_d
+        T_2_x_aa20 = (T_2 - T_1) * ((t_2_x_aa20 - t_1) / (t_2 - t_1)) ** 0.5 + T_1
+        t_1_x = (0.7 * Q_x_d * 3 * t_alpha ** 2) ** (1 / 3)
+        T_2_x_aa22 = (T_1 - 20) / (t_1 ** 2) * t_1_x ** 2 + 20
+        t_2_x = np.where(is_aa20, t_2_x_aa20, np.where(is_aa22, t_1_x, np.nan))
+        T_2_x = np.where(is_aa20, T_2_x_aa20, np.where(is_aa22, T_2_x_aa22, np.nan))
+
+        t_3_x = 0.6 * Q_x_d / Q_max_d + t_2_x  # AA.25
+        T_3_x = T_3 * np.log10(t_3_x / 60 + 1) / np.log10(t_3 / 60 + 1)  # AA.24
+
+        # AA.26 - AA.28, flash-over check AA.29 and AA.30
+        Q_fo = 0.0078 * A_t + 0.378 * A_w * h_w ** 0.5
+        t_1_fo = (t_alpha ** 2 * Q_fo) ** 0.5
+        t_1 = _min(t_1, t_1_fo)
+
+    # each phase is only evaluated over its time steps, i.e. [start, stop) of each sample, later phases prevail
+    t = t[0]
+    phases = [
+        (*_interval(t, np.zeros_like(t_1), t_1), lambda i, t_: (T_1[i] - 20) / t_1[i] ** 2 * t_ ** 2 + 20),
+        (*_interval(t, t_1, t_2_x), lambda i, t_: (T_2_x[i] - T_1[i]) * (
+                (t_ - t_1[i]) / (t_2_x[i] - t_1[i])) ** 0.5 + T_1[i]),
+        (*_interval(t, t_2_x, np.full_like(t_2_x, np.inf), is_open_a=True), lambda i, t_: (T_3_x[i] - T_2_x[i]) * (
+                (t_ - t_2_x[i]) / (t_3_x[i] - t_2_x[i])) ** 0.5 + T_2_x[i]),
+    ]
+    T = np.zeros((len(t_1), len(t)))
+    for i, _ in _row_groups(phases[-1][0]):
+        for start, stop, func in phases:
+            c_0, c_1 = np.amin(start[i]), np.amax(stop[i])
+            if c_1 <= c_0:
+                continue
+            columns = np.arange(c_0, c_1)
+            is_phase = (columns >= start[i, None]) & (columns < stop[i, None])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                T[i, c_0:c_1] = np.where(is_phase, func(i, t[c_0:c_1]), T[i, c_0:c_1])
+
+    # No temperature below T_initial
+    np.maximum(T, 20, out=T)
+    T += 273.15
+    return T
+
+
+def _interval(t: np.ndarray, t_a: np.ndarray, t_b: np.ndarray, is_open_a: bool = False) -> tuple:
+    """[start, stop) indices of increasing `t` within `t_a` <= t <= `t_b` (t_a < t <= t_b if `is_open_a`) of each
+    sample, empty if either bound is nan. `t_a` and `t_b` are (n_s, 1)."""
+    t_a, t_b = t_a[:, 0], t_b[:, 0]
+    start = np.searchsorted(t, t_a, side='right' if is_open_a else 'left')
+    stop = np.searchsorted(t, t_b, side='right')
+    is_empty = np.isnan(t_a) | np.isnan(t_b)
+    return np.where(is_empty, 0, start), np.where(is_empty, 0, np.maximum(start, stop))
+
+
+def _test_temperature_ec_fsetools():
+    from fsetools.lib.fse_bs_en_1991_1_2_parametric_fire import temperature as _temperature
+
+    t = np.arange(0, 18000 + 10, 10, dtype=float)
+    # ventilation controlled, fuel controlled and the `k` modification of Gamma_lim, across the cooling branches
+    kwargs = dict(
+        A_t=np.array([1500., 1500., 360., 1500., 1500.]), A_f=np.array([500., 500., 100., 500., 500.]),
+        A_v=np.array([20., 60., 20., 120., 5.]), h_eq=np.array([2., 2.5, 2.5, 2.5, 1.]),
+        q_fd=np.array([420e6, 420e6, 100e6, 200e6, 1200e6]), lambda_=np.array([720., 720., 400., 720., 2000.]) ** 2,
+        rho=1., c=1., t_lim=np.array([20., 20., 20., 15., 25.]) * 60, temperature_initial=293.15,
+    )
+    T_g = temperature_ec(t, **kwargs)
+    assert T_g.shape == (5, len(t))
+    for i in range(5):
+        kwargs_ = {k: (float(v[i]) if np.ndim(v) > 0 else v) for k, v in kwargs.items()}
+        assert np.allclose(T_g[i], _temperature(t=t, **kwargs_), rtol=1e-12, atol=1e-9)
+    assert np.allclose(temperature_ec(t, **{k: (v[0] if np.ndim(v) > 0 else v) for k, v in kwargs.items()}), T_g[0])
+
+
+def _test_temperature_din_fsetools():
+    from fsetools.lib.fse_din_en_1991_1_2_parametric_fire import temperature as _temperature
+
+    t = np.arange(0, 18000 + 10, 10, dtype=float)
+    # ventilation and fuel controlled, and AA.22 (little fire load)
+    kwargs = dict(
+        A_w_m2=np.array([20., 200., 60., 40.]), h_w_m2=np.array([2., 2.5, 2., 2.]),
+        A_t_m2=np.array([1500., 1500., 600., 1500.]), A_f_m2=np.array([500., 500., 200., 500.]),
+        t_alpha_s=np.array([300., 300., 150., 300.]), b_Jm2s05K=np.array([720., 1500., 720., 720.]),
+        q_x_d_MJm2=np.array([420., 600., 300., 0.05]), gamma_fi_Q=np.array([1., 1., 1.2, 1.]),
+    )
+    T_g = temperature_din(t, **kwargs)
+    assert T_g.shape == (4, len(t))
+    for i in range(4):
+        kwargs_ = {k: float(v[i]) for k, v in kwargs.items()}
+        T_g_ = _temperature(t_array_s=t, **kwargs_)
+        assert np.allclose(T_g[i], T_g_, rtol=1e-12, atol=1e-9, equal_nan=True)
+
+
+if __name__ == '__main__':
+    _test_temperature_ec_fsetools()
+    _test_temperature_din_fsetools()
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+from typing import Union
+
+import numpy as np
+from fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c import temperature_max as _steel_temperature_max
+
+from sfeprapy.func.heat_transfer_protected_steel_ec import temperature_max as _steel_temperature_max_batch
+
+GOLDEN_RATIO = (np.sqrt(5) - 1) / 2
+
+# protected steel section of which the peak temperature ranks beam locations, see `worst_case_beam_location`
+REFERENCE_STEEL = dict(
+    beam_rho=7850., beam_cross_section_area=0.017, protection_k=0.2, protection_rho=800., protection_c=1700.,
+    protection_thickness=0.005, protection_protected_perimeter=2.14,
+)
+
+
+def temperature(
+        t: np.ndarray,
+        fire_load_density_MJm2: Union[float, np.ndarray],
+        fire_hrr_density_MWm2: Union[float, np.ndarray],
+        room_length_m: Union[float, np.ndarray],
+        room_width_m: Union[float, np.ndarray],
+        fire_spread_rate_ms: Union[float, np.ndarray],
+        beam_location_height_m: Union[float, np.ndarray],
+        beam_location_length_m: Union[float, np.ndarray],
+        fire_nft_limit_c: Union[float, np.ndarray],
+        *_,
+        **__,
+) -> np.ndarray:
+    """Travelling fire gas temperature for a batch of samples and beam locations, vectorised version of `temperature` in
+    `fsetools.lib.fse_travelling_fire`, expressions and order of operations are kept the same as fsetools so results
+    agree to floating point precision. This function is NOT in SI.
+
+    :param t:                       [s], (n_t,) time array, evenly spaced, shared by all samples.
+    :param fire_load_density_MJm2:  [MJ/m2], fuel density on the floor, float or (n_s,).
+    :param fire_hrr_density_MWm2:   [MW/m2], heat release rate density, float or (n_s,).
+    :param room_length_m:           [m], room length, float or (n_s,).
+    :param room_width_m:            [m], room width, float or (n_s,).
+    :param fire_spread_rate_ms:     [m/s], fire spread speed, float or (n_s,).
+    :param beam_location_height_m:  [m], beam height above the floor, float or (n_s,).
+    :param beam_location_length_m:  [m], beam location along the room length, float, (n_s,) or (n_s, n_l) for `n_l`
+                                    locations of each sample.
+    :param fire_nft_limit_c:        [C], maximum near field temperature, float or (n_s,).
+    :return T_g:                    [C], (n_s, n_t) gas temperature, or (n_s, n_l, n_t) if `beam_location_length_m` is
+                                    two dimensional.
+    """
+    t = np.asarray(t, dtype=float)
+    l_s = np.asarray(beam_location_length_m, dtype=float)
+    source = _fire_source(
+        t, fire_load_density_MJm2, fire_hrr_density_MWm2, room_length_m, room_width_m, fire_spread_rate_ms,
+        beam_location_height_m, fire_nft_limit_c, l_s if l_s.ndim < 2 else l_s[:, 0],
+    )
+    return _temperature_at(l_s, *source)
+
+
+def _fire_source(t: np.ndarray, q_fd, HRRPUA, l, w, s, h_s, T_nft, l_s=0.) -> tuple:
+    """Beam location independent part of `temperature`, (n_s, n_t) arrays of fire median location, near field
+    temperature and far field temperature rise times r ** (2 / 3), and (n_s, 1) arrays of `h_s` and `T_nft`. `l_s` is
+    only to broadcast the number of samples."""
+    q_fd, HRRPUA, l, w, s, h_s, T_nft = [
+        np.atleast_1d(np.asarray(v, dtype=float))[:, np.newaxis] for v in np.broadcast_arrays(
+            q_fd, HRRPUA, l, w, s, h_s, T_nft, l_s)[:-1]
+    ]
+    l, w = np.maximum(l, w), np.minimum(l, w)
+
+    # workout burning time etc.
+    t_burn = np.maximum(q_fd / HRRPUA, 900.0)
+    t_decay = np.maximum(t_burn, l / s)
+    t_lim = np.minimum(t_burn, l / s)
+
+    # reduce resolution to fit time step for t_burn, t_decay, t_lim
+    time_interval_s = t[1] - t[0]
+    t_decay_ = np.round(t_decay / time_interval_s, 0) * time_interval_s
+    t_lim_ = np.round(t_lim / time_interval_s, 0) * time_interval_s
+    t_lim_ = np.where(t_decay_ == t_lim_, t_lim_ - time_interval_s, t_lim_)
+
+    # workout the heat release rate ARRAY (corrected with time)
+    Q_growth = (HRRPUA * w * s * t) * (t < t_lim_)
+    Q_peak = np.minimum(HRRPUA * w * s * t_burn, HRRPUA * w * l) * (t >= t_lim_) * (t <= t_decay_)
+    Q_decay = (np.max(Q_peak, axis=1, keepdims=True) - (t - t_decay_) * w * s * HRRPUA) * (t > t_decay_)
+    Q_decay[Q_decay < 0] = 0
+    Q = (Q_growth + Q_peak + Q_decay) * 1000.0
+
+    # workout the distance between fire median to the structural element r
+    l_fire_front = np.clip(s * t, 0, l)
+    l_fire_end = np.clip(s * (t - t_lim), 0., l)
+    l_fire_median = (l_fire_front + l_fire_end) / 2.0
+
+    Q_23 = np.cbrt(Q * Q)  # i.e. Q ** (2 / 3), cheaper than `np.power`
+    T_g_near = (16.9 * Q_23 / np.power(h_s, 5 / 3)) + 20.0
+    T_g_far = 5.38 * Q_23 / h_s
+    return l_fire_median, T_g_near, T_g_far, h_s, T_nft
+
+
+def _temperature_at(l_s: np.ndarray, l_fire_median, T_g_near, T_g_far, h_s, T_nft) -> np.ndarray:
+    """Gas temperature at beam locations `l_s`, float, (n_s,) or (n_s, n_l), of the fire described by `_fire_source`."""
+    if l_s.ndim == 2:
+        l_fire_median, T_g_near, T_g_far, h_s, T_nft = [
+            v[:, None] for v in (l_fire_median, T_g_near, T_g_far, h_s, T_nft)]
+        l_s = l_s[:, :, None]
+    else:
+        l_s = np.broadcast_to(l_s, (len(h_s),))[:, None]
+
+    # workout the far field temperature of gas T_g
+    r = np.absolute(l_s - l_fire_median)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        T_g = np.where((r / h_s) > 0.8, T_g_far / np.cbrt(r * r) + 20.0, T_g_near)
+    return np.minimum(T_g, T_nft)
+
+
+def worst_case_beam_location(
+        t: np.ndarray,
+        n_grid: int = 5,
+        tol: float = 1.,
+        **kwargs,
+) -> tuple:
+    """Beam location along the room length of the highest peak temperature of `REFERENCE_STEEL`, for a batch of
+    samples, in between half and the full room length.
+
+    Peak steel temperature is not unimodal over the beam location (i.e. plateaus with local bumps before the far end),
+    so `n_grid` evenly spaced locations are evaluated first, then the location is refined by golden-section search
+    within the bracket about the hottest of them (neighbouring locations) to `tol`. The search runs in lockstep for all
+    samples, the location independent part of the fire is evaluated once and gas temperature of all samples (and all
+    grid locations) in one (samples x locations x time) batch per iteration. The hottest location of all evaluated is
+    returned, i.e. never cooler than the grid alone.
+
+    After the grid, gas temperature is only evaluated up to the burnout of the batch, after which steel cools. Peak
+    steel temperature is solved per gas curve by the compiled kernel of fsetools, which is faster than a numpy batch.
+
+    :param t:       [s], (n_t,) time array, evenly spaced, shared by all samples.
+    :param n_grid:  number of locations of the initial grid.
+    :param tol:     [m], width of the bracket at which the golden-section search stops, 0 to only evaluate the grid.
+    :param kwargs:  parameters of `temperature` other than `beam_location_length_m`, float or (n_s,) each.
+    :return T_g:    [C], (n_s, n_t) gas temperature at the worst case location.
+    :return l_s:    [m], (n_s,) worst case beam location.
+    :return n_eval: number of locations evaluated per sample.
+    """
+    t = np.asarray(t, dtype=float)
+    kwargs.pop('beam_location_length_m', None)
+    kwargs = dict(zip(kwargs.keys(), np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(v, dtype=float)) for v in kwargs.values()])))
+    l = np.maximum(kwargs['room_length_m'], kwargs['room_width_m'])
+    n_s = len(l)
+    i_s = np.arange(n_s)
+    source = _fire_source(t, *[kwargs[k] for k in (
+        'fire_load_density_MJm2', 'fire_hrr_density_MWm2', 'room_length_m', 'room_width_m', 'fire_spread_rate_ms',
+        'beam_location_height_m', 'fire_nft_limit_c')])
+    n_t = len(t)
+
+    def evaluate(l_s: np.ndarray, i: np.ndarray) -> tuple:
+        T_g = _temperature_at(l_s, *[v[i, :n_t] for v in source]).reshape((-1, n_t)) + 273.15
+        T_max = np.array([
+            _steel_temperature_max(fire_time=t[:n_t], fire_temperature=T_g_, **REFERENCE_STEEL)[0] for T_g_ in T_g])
+        return T_max.reshape(l_s.shape), T_g
+
+    # initial grid, (n_s, n_grid)
+    grid = 0.5 * l[:, None] * (1 + np.arange(1, n_grid + 1) / (n_grid + 1))
+    T_max, T_g = evaluate(grid, i_s)
+    i_max = np.argmax(T_max, axis=1)
+    l_best, T_max_best = grid[i_s, i_max], T_max[i_s, i_max]
+    n_eval = n_grid
+
+    # golden-section search within the bracket about the hottest grid location
+    a = np.where(i_max > 0, grid[i_s, np.maximum(i_max - 1, 0)], 0.5 * l)
+    b = np.where(i_max < n_grid - 1, grid[i_s, np.minimum(i_max + 1, n_grid - 1)], l)
+    if tol > 0 and np.any(b - a > tol):
+        # gas temperature is ambient (at all locations) once burnt out, the step after is kept for steel to cool
+        is_burning = np.any(T_g > 20. + 273.15, axis=0)
+        n_t = min(n_t, np.flatnonzero(is_burning)[-1] + 2) if np.any(is_burning) else n_t
+
+        def update(l_s: np.ndarray, i: np.ndarray) -> np.ndarray:
+            T_max_ = evaluate(l_s[:, None], i)[0][:, 0]
+            is_hotter = T_max_ > T_max_best[i]
+            l_best[i[is_hotter]], T_max_best[i[is_hotter]] = l_s[is_hotter], T_max_[is_hotter]
+            return T_max_
+
+        c, d = b - GOLDEN_RATIO * (b - a), a + GOLDEN_RATIO * (b - a)
+        f_c, f_d = update(c, i_s), update(d, i_s)
+        n_eval += 2
+        live = np.flatnonzero(b - a > tol)
+        while len(live) > 0:
+            is_left = f_c[live] > f_d[live]  # the maximum is within [a, d], otherwise [c, b]
+            i_l, i_r = live[is_left], live[~is_left]
+            b[i_l], d[i_l], f_d[i_l] = d[i_l], c[i_l], f_c[i_l]
+            c[i_l] = b[i_l] - GOLDEN_RATIO * (b[i_l] - a[i_l])
+            a[i_r], c[i_r], f_c[i_r] = c[i_r], d[i_r], f_d[i_r]
+            d[i_r] = a[i_r] + GOLDEN_RATIO * (b[i_r] - a[i_r])
+            x = np.where(is_left, c[live], d[live])
+            f = update(x, live)
+            f_c[i_l], f_d[i_r] = f[is_left], f[~is_left]
+            n_eval += 1
+            live = live[b[live] - a[live] > tol]
+
+    return _temperature_at(l_best, *source), l_best, n_eval
+
+
+def _test_temperature_fsetools():
+    from fsetools.lib.fse_travelling_fire import temperature as _temperature
+
+    t = np.arange(0, 18000 + 10, 10, dtype=float)
+    kwargs = dict(
+        fire_load_density_MJm2=np.array([380., 760., 200., 600.]),
+        fire_hrr_density_MWm2=np.array([0.25, 0.25, 0.5, 0.15]),
+        room_length_m=np.array([31.25, 31.25, 16., 40.]), room_width_m=np.array([16., 16., 31.25, 10.]),
+        fire_spread_rate_ms=np.array([0.0035, 0.019, 0.01, 0.0125]), beam_location_height_m=3.2,
+        fire_nft_limit_c=np.array([1050., 1050., 1200., 900.]),
+    )
+    l_s = np.array([[18.75, 25., 31.25], [20.2, 26., 31.], [10., 16., 30.], [20., 36., 40.]])
+
+    T_g = temperature(t, beam_location_length_m=l_s, **kwargs)
+    T_g_1 = temperature(t, beam_location_length_m=l_s[:, 1], **kwargs)
+    assert T_g.shape == (4, 3, len(t)) and T_g_1.shape == (4, len(t))
+    for i in range(4):
+        kwargs_ = {k: (v[i] if np.ndim(v) > 0 else v) for k, v in kwargs.items()}
+        for j in range(3):
+            T_g_ = _temperature(t=t, beam_location_length_m=float(l_s[i, j]), **kwargs_)
+            assert np.allclose(T_g[i, j], T_g_, rtol=1e-12, atol=1e-9)
+        assert np.allclose(T_g_1[i], T_g[i, 1])
+
+
+def _test_worst_case_beam_location():
+    t = np.arange(0, 18000 + 10, 10, dtype=float)
+    rng = np.random.default_rng(0)
+    n_s = 50
+    kwargs = dict(
+        fire_load_density_MJm2=rng.uniform(200, 900, n_s), fire_hrr_density_MWm2=0.25, room_length_m=31.25,
+        room_width_m=16., fire_spread_rate_ms=rng.uniform(0.0035, 0.019, n_s), beam_location_height_m=3.2,
+        fire_nft_limit_c=rng.normal(1050, 93, n_s),
+    )
+
+    def peak_steel_temperature(T_g: np.ndarray) -> np.ndarray:
+        return _steel_temperature_max_batch(t, T_g + 273.15, **REFERENCE_STEEL)[0]
+
+    # grid only, same as the hottest of the grid locations
+    T_g, l_s, n_eval = worst_case_beam_location(t, tol=0, **kwargs)
+    assert n_eval == 5 and np.all((l_s > 15.625) & (l_s < 31.25))
+    T_max_grid = peak_steel_temperature(T_g)
+
+    # refined, never cooler than the grid and close to the hottest of a fine grid of locations
+    T_g, l_s_, n_eval = worst_case_beam_location(t, **kwargs)
+    T_max = peak_steel_temperature(T_g)
+    assert n_eval < 15 and np.all(T_max >= T_max_grid)
+    assert np.allclose(T_g, temperature(t, beam_location_length_m=l_s_, **kwargs))
+
+    l_fine = np.broadcast_to(np.linspace(15.625, 31.25, 201), (n_s, 201))
+    T_max_fine = peak_steel_temperature(
+        temperature(t, beam_location_length_m=l_fine, **kwargs).reshape((-1, len(t)))).reshape((n_s, 201)).max(axis=1)
+    assert np.mean(T_max_fine - T_max_grid) > 5  # i.e. the grid alone is not accurate
+    assert np.median(T_max_fine - T_max) < 1 and np.mean(T_max_fine - T_max) < 2
+
+    # one sample of scalar parameters
+    T_g, l_s, _ = worst_case_beam_location(t, **{k: (v[0] if np.ndim(v) > 0 else v) for k, v in kwargs.items()})
+    assert T_g.shape == (1, len(t)) and abs(l_s[0] - l_s_[0]) < 1e-9
+
+
+if __name__ == '__main__':
+    _test_temperature_fsetools()
+    _test_worst_case_beam_location()
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+from typing import Union
+
+import numpy as np
+
+
+def c_steel_T(temperature: Union[float, np.ndarray]) -> np.ndarray:
+    """Specific heat capacity of carbon steel in accordance with BS EN 1993-1-2:2005, 3.4.1.2. Vectorised version of the
+    `c_steel_T` in `fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c`, temperature below 20 [C] is taken as 20 [C].
+
+    :param temperature: [K], steel temperature, float or array.
+    :return c_s:        [J/kg/K], steel specific heat capacity, same shape as `temperature`.
+    """
+    T = np.asarray(temperature, dtype=float) - 273.15
+    T_ = np.maximum(T, 20.).ravel()
+
+    # polynomial in Horner form, the branches above 600 [C] are only evaluated where applicable, i.e. not at all early
+    # in a fire
+    c_s = 425 + T_ * (0.773 + T_ * (-1.69e-3 + T_ * 2.22e-6))
+    i = np.flatnonzero(~(T_ < 600))
+    if len(i) > 0:
+        T_i = T_[i]
+        c_s_i = np.where(
+            T_i < 735, 666 + 13002 / (738 - np.minimum(T_i, 735)), 545 + 17820 / (np.maximum(T_i, 735) - 731))
+        c_s_i[~(T_i < 900)] = 650.
+        c_s[i] = c_s_i
+
+    return c_s.reshape(T.shape)
+
+
+def _broadcast_samples(fire_temperature: np.ndarray, *props) -> tuple:
+    """Broadcasts gas temperature to (n_s, n_t) and scalar/array properties to (n_s,) for the batch kernels below."""
+    fire_temperature = np.atleast_2d(np.asarray(fire_temperature, dtype=float))
+    props = np.broadcast_arrays(
+        np.empty((fire_temperature.shape[0],)), *[np.atleast_1d(np.asarray(v, dtype=float)) for v in props]
+    )[1:]
+    n_s = len(props[0])
+    if fire_temperature.shape[0] != n_s:
+        fire_temperature = np.broadcast_to(fire_temperature, (n_s, fire_temperature.shape[1]))
+    return (fire_temperature, *props)
+
+
+_LN_2_718_10 = np.log(2.718) / 10.0  # i.e. 2.718 ** (x / 10) == exp(x * _LN_2_718_10)
+
+
+def _lumped_capacity_constants(
+        V: np.ndarray,
+        rho_a: np.ndarray,
+        lambda_p: np.ndarray,
+        rho_p: np.ndarray,
+        c_p: np.ndarray,
+        d_p: np.ndarray,
+        A_p: np.ndarray,
+) -> tuple:
+    """Parts of Eq. 4.27 in `_lumped_capacity_increment` which do not depend on temperature, evaluated once per sample
+    rather than every time step, i.e. `phi * c_s` and `a * c_s`."""
+    return c_p * rho_p * d_p * A_p / (rho_a * V), lambda_p * A_p / (V * d_p * rho_a)
+
+
+def _lumped_capacity_increment(
+        T_a: np.ndarray,
+        T_g: np.ndarray,
+        T_g_0: np.ndarray,
+        d: float,
+        k_phi: np.ndarray,
+        k_a: np.ndarray,
+) -> np.ndarray:
+    """Steel temperature rate [K/s] in accordance with BS EN 1993-1-2:2005, Clauses 4.2.5.2, Eq. 4.27, same expressions
+    as fsetools with the properties of each sample factored out by `_lumped_capacity_constants`, and powers taken by
+    multiplication and `np.exp` which are several times faster than `np.power`. Results agree with fsetools to floating
+    point precision, i.e. within a few ulp."""
+
+    c_s = c_steel_T(T_a)
+
+    phi = k_phi / c_s
+
+    a = k_a / c_s
+    b = (T_g - T_a) / (1.0 + phi / 3.0)
+    c = (np.exp(phi * _LN_2_718_10) - 1.0) * (T_g - T_g_0)
+
+    dT = a * b - c / d  # deviated from e4.27, converted to rate [s-1]
+    dT[(dT < 0) & (0 < (T_g - T_g_0))] = 0
+
+    return dT
+
+
+def temperature(
+        fire_time: np.ndarray,
+        fire_temperature: np.ndarray,
+        beam_rho: Union[float, np.ndarray],
+        beam_cross_section_area: Union[float, np.ndarray],
+        protection_k: Union[float, np.ndarray],
+        protection_rho: Union[float, np.ndarray],
+        protection_c: Union[float, np.ndarray],
+        protection_thickness: Union[float, np.ndarray],
+        protection_protected_perimeter: Union[float, np.ndarray],
+) -> np.ndarray:
+    """Protected steel temperature history for a batch of samples, vectorised version of `temperature` in
+    `fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c`.
+
+    :param fire_time:                       [s], (n_t,) time array, shared by all samples.
+    :param fire_temperature:                [K], (n_t,) or (n_s, n_t) gas temperature.
+    :param beam_rho:                        [kg/m3], steel density, float or (n_s,).
+    :param beam_cross_section_area:         [m2], steel section area, float or (n_s,).
+    :param protection_k:                    [W/m/K], protection thermal conductivity, float or (n_s,).
+    :param protection_rho:                  [kg/m3], protection density, float or (n_s,).
+    :param protection_c:                    [J/kg/K], protection specific heat, float or (n_s,).
+    :param protection_thickness:            [m], protection thickness, float or (n_s,).
+    :param protection_protected_perimeter:  [m], protected perimeter, float or (n_s,).
+    :return T_a:                            [K], (n_s, n_t) steel temperature.
+    """
+    fire_time = np.asarray(fire_time, dtype=float)
+    fire_temperature, V, rho_a, lambda_p, rho_p, c_p, d_p, A_p = _broadcast_samples(
+        fire_temperature, beam_cross_section_area, beam_rho, protection_k, protection_rho, protection_c,
+        protection_thickness, protection_protected_perimeter,
+    )
+    n_s = len(V)
+    k_phi, k_a = _lumped_capacity_constants(V, rho_a, lambda_p, rho_p, c_p, d_p, A_p)
+
+    T_a = np.empty((n_s, len(fire_time)), dtype=float)
+    T_a[:, 0] = fire_temperature[:, 0]  # initially, steel temperature is equal to ambient
+    for i in range(1, len(fire_time)):
+        d = fire_time[i] - fire_time[i - 1]
+        dT = _lumped_capacity_increment(
+            T_a[:, i - 1], fire_temperature[:, i], fire_temperature[:, i - 1], d, k_phi, k_a)
+        T_a[:, i] = T_a[:, i - 1] + dT * d
+
+    return T_a
+
+
+def temperature_max(
+        fire_time: np.ndarray,
+        fire_temperature: np.ndarray,
+        beam_rho: Union[float, np.ndarray],
+        beam_cross_section_area: Union[float, np.ndarray],
+        protection_k: Union[float, np.ndarray],
+        protection_rho: Union[float, np.ndarray],
+        protection_c: Union[float, np.ndarray],
+        protection_thickness: Union[float, np.ndarray],
+        protection_protected_perimeter: Union[float, np.ndarray],
+) -> tuple:
+    """Peak protected steel temperature for a batch of samples, vectorised version of `temperature_max` in
+    `fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c`. Each sample stops at the first cooling time step, only the
+    memory of the current time step is kept so this works for any number of samples.
+
+    See `temperature` for parameter descriptions, `fire_time` is assumed to be evenly spaced.
+
+    :return T_max:  [K], (n_s,) peak steel temperature.
+    :return t:      [s], (n_s,) time at which the peak steel temperature occurred.
+    """
+    fire_time = np.asarray(fire_time, dtype=float)
+    fire_temperature, V, rho_a, lambda_p, rho_p, c_p, d_p, A_p = _broadcast_samples(
+        fire_temperature, beam_cross_section_area, beam_rho, protection_k, protection_rho, protection_c,
+        protection_thickness, protection_protected_perimeter,
+    )
+    n_s = len(V)
+
+    d = fire_time[1] - fire_time[0]
+
+    T = np.array(fire_temperature[:, 0], dtype=float)  # current steel temperature
+    t = np.full((n_s,), fire_time[-2], dtype=float)  # time at peak, the last time step is taken if never cooled
+    live = np.arange(n_s)
+    # properties of the samples still heating, only compacted when a sample stops rather than indexed every time step
+    T_live, T_g_0, props = T.copy(), fire_temperature[:, 0], _lumped_capacity_constants(
+        V, rho_a, lambda_p, rho_p, c_p, d_p, A_p)
+    for i in range(1, len(fire_time)):
+        T_g = fire_temperature[live, i]
+        dT = _lumped_capacity_increment(T_live, T_g, T_g_0, d, *props)
+        T_live = T_live + dT * d
+        T_g_0 = T_g
+
+        cooling = dT < 0
+        if np.any(cooling):
+            T[live] = T_live
+            t[live[cooling]] = fire_time[i - 1]
+            heating = ~cooling
+            live, T_live, T_g_0 = live[heating], T_live[heating], T_g_0[heating]
+            props = tuple(v[heating] for v in props)
+            if len(live) == 0:
+                break
+    T[live] = T_live
+
+    return T, t
+
+
+def time_to_temperature(
+        fire_time: np.ndarray,
+        fire_temperature: np.ndarray,
+        temperature_goal: Union[float, np.ndarray],
+        beam_rho: Union[float, np.ndarray],
+        beam_cross_section_area: Union[float, np.ndarray],
+        protection_k: Union[float, np.ndarray],
+        protection_rho: Union[float, np.ndarray],
+        protection_c: Union[float, np.ndarray],
+        protection_thickness: Union[float, np.ndarray],
+        protection_protected_perimeter: Union[float, np.ndarray],
+) -> np.ndarray:
+    """Time at which the protected steel temperature first reaches `temperature_goal`, linearly interpolated between
+    time steps. Intended for monotonic heating exposures (e.g. ISO 834) where it is equivalent to interpolating time from
+    the steel temperature history, but only the current time step is kept in memory.
+
+    See `temperature` for parameter descriptions, `temperature_goal` [K] is float or (n_s,).
+
+    :return t:  [s], (n_s,) time at which `temperature_goal` is reached, `np.nan` if not reached within `fire_time`.
+    """
+    fire_time = np.asarray(fire_time, dtype=float)
+    fire_temperature, V, rho_a, lambda_p, rho_p, c_p, d_p, A_p, T_goal = _broadcast_samples(
+        fire_temperature, beam_cross_section_area, beam_rho, protection_k, protection_rho, protection_c,
+        protection_thickness, protection_protected_perimeter, temperature_goal,
+    )
+    n_s = len(V)
+    k_phi, k_a = _lumped_capacity_constants(V, rho_a, lambda_p, rho_p, c_p, d_p, A_p)
+
+    T = np.array(fire_temperature[:, 0], dtype=float)
+    t = np.full((n_s,), np.nan, dtype=float)
+    live = np.arange(n_s)
+    for i in range(1, len(fire_time)):
+        d = fire_time[i] - fire_time[i - 1]
+        T_0 = T[live]
+        dT = _lumped_capacity_increment(
+            T_0, fire_temperature[live, i], fire_temperature[live, i - 1], d, k_phi[live], k_a[live])
+        T_1 = T_0 + dT * d
+        T[live] = T_1
+
+        reached = T_1 >= T_goal[live]
+        if np.any(reached):
+            T_0, T_1, T_goal_ = T_0[reached], T_1[reached], T_goal[live[reached]]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                f = np.where(T_1 > T_0, (T_goal_ - T_0) / (T_1 - T_0), 1.)
+            t[live[reached]] = fire_time[i - 1] + f * d
+            live = live[~reached]
+            if len(live) == 0:
+                break
+
+    return t
+
+
+def _test_temperature_fsetools():
+    from fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c import temperature as _temperature
+    from fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c import temperature_max as _temperature_max
+
+    from sfeprapy.func.fire_iso834 import fire as fire_iso834
+
+    fire_time = np.arange(0, 3 * 60 * 60 + 10, 10, dtype=float)
+    fire_temperature = fire_iso834(fire_time, 293.15)
+    fire_temperature_cooling = np.where(fire_time < 3600, fire_temperature, fire_temperature[fire_time == 3600][0])
+    fire_temperature_cooling -= np.where(fire_time > 3600, (fire_time - 3600) / 10, 0)
+    kwargs = dict(
+        beam_rho=7850., beam_cross_section_area=0.017, protection_k=0.2, protection_rho=800., protection_c=1700.,
+        protection_protected_perimeter=2.14,
+    )
+    d_p = np.array([0.001, 0.005, 0.01, 0.02])
+
+    T_a = temperature(fire_time, fire_temperature, protection_thickness=d_p, **kwargs)
+    T_max, t_max = temperature_max(fire_time, fire_temperature_cooling, protection_thickness=d_p, **kwargs)
+    t_goal = time_to_temperature(fire_time, fire_temperature, 893.15, protection_thickness=d_p, **kwargs)
+    for i, d_p_ in enumerate(d_p):
+        T_a_ = _temperature(
+            fire_time=fire_time, fire_temperature=fire_temperature, protection_thickness=d_p_, **kwargs)
+        assert np.allclose(T_a[i], T_a_)
+        T_max_, t_max_ = _temperature_max(
+            fire_time=fire_time, fire_temperature=fire_temperature_cooling, protection_thickness=d_p_, **kwargs)
+        assert abs(T_max[i] - T_max_) < 1e-6
+        assert t_max[i] == t_max_
+        if np.amax(T_a_) >= 893.15:
+            assert abs(t_goal[i] - np.interp(893.15, T_a_, fire_time)) < 1e-6
+        else:
+            assert np.isnan(t_goal[i])
+
+
+if __name__ == '__main__':
+    _test_temperature_fsetools()
@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+import collections
+import json
+import os
+import shutil
+import threading
+from typing import Optional, Union
+
+import numpy as np
+from fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c import temperature as _steel_temperature
+
+from sfeprapy.func.mcs_cache import case_key
+
+N_THICKNESS = 128  # number of protection thicknesses tabulated, see `ISO834SteelTable.build`
+MAX_TABLES = 32  # number of tables kept in memory per process
+KEY_SIGNIFICANT_DIGITS = 9  # significant digits of the properties a table is keyed and built with
+TABLE_VERSION = 1  # version of the table and its on-disk format, tables of other versions are not read
+
+
+def iso834_fire_temperature(fire_time: np.ndarray) -> np.ndarray:
+    """ISO 834 fire temperature [K] of `fire_time` [s], same expression as `teq_main`."""
+    return (345.0 * np.log10((np.asarray(fire_time, dtype=float) / 60.0) * 8.0 + 1.0) + 20.0) + 273.15
+
+
+class ISO834SteelTable:
+    """Protected steel temperature in ISO 834 fire tabulated over protection thickness (thickness x time), to solve the
+    time at which a temperature is reached for any thickness within the table without solving the heat transfer.
+
+    Each tabulated thickness is inverted the same way as `sfeprapy.func.heat_transfer_protected_steel_ec.
+    time_to_temperature`, i.e. time of the first time step reaching the temperature, linearly interpolated between time
+    steps, and the time is then interpolated linearly between the two neighbouring thicknesses. Thicknesses are evenly
+    spaced in their square root, where time to temperature is closer to linear. With `N_THICKNESS` thicknesses between
+    0.1 and 30 mm, the error is within 0.1 s.
+
+    Example:
+
+        >>> table = ISO834SteelTable.build(fire_time, d_p_1=0.0001, d_p_2=0.03, **steel_properties)
+        >>> t = table.time_to_temperature(893.15, protection_thickness=np.array([0.01, 0.02]))
+
+    :param fire_time: [s], (n_t,) evenly spaced time array.
+    :param protection_thickness: [m], (n_d,) increasing protection thickness.
+    :param steel_temperature: [K], (n_d, n_t) steel temperature of each thickness, non decreasing in time.
+    """
+
+    def __init__(self, fire_time: np.ndarray, protection_thickness: np.ndarray, steel_temperature: np.ndarray):
+        steel_temperature = np.asarray(steel_temperature, dtype=float)
+        # all rows are offset by their index times `stride`, so time steps of any row are found by one `searchsorted`
+        stride = float(np.ceil(np.amax(steel_temperature) + 1.))
+        self.__init(fire_time, protection_thickness, steel_temperature + stride * np.arange(
+            len(steel_temperature))[:, None], stride)
+
+    def __init(self, fire_time: np.ndarray, protection_thickness: np.ndarray, offset_table: np.ndarray, stride: float):
+        self.fire_time = np.asarray(fire_time, dtype=float)
+        self.protection_thickness = np.asarray(protection_thickness, dtype=float)
+        self.__stride = stride
+        self.__offset_table = offset_table  # (n_d, n_t), can be a read only memory map, see `ISO834SteelTableCache`
+        self.__flat = offset_table.reshape(-1)
+
+    @property
+    def steel_temperature(self) -> np.ndarray:
+        """[K], (n_d, n_t) steel temperature of each tabulated thickness."""
+        return self.__offset_table - self.__stride * np.arange(len(self.protection_thickness))[:, None]
+
+    @property
+    def is_memory_mapped(self) -> bool:
+        """Whether the table is memory mapped from a file, see `load`."""
+        return isinstance(self.__offset_table, np.memmap)
+
+    def save(self, dir_path: str):
+        """Writes the table into `dir_path` as `.npy` files, see `load`."""
+        os.makedirs(dir_path, exist_ok=True)
+        np.save(os.path.join(dir_path, 'fire_time.npy'), self.fire_time)
+        np.save(os.path.join(dir_path, 'protection_thickness.npy'), self.protection_thickness)
+        np.save(os.path.join(dir_path, 'offset_table.npy'), np.ascontiguousarray(self.__offset_table))
+        with open(os.path.join(dir_path, 'meta.json'), 'w') as f:
+            json.dump(dict(version=TABLE_VERSION, stride=self.__stride), f)
+
+    @classmethod
+    def load(cls, dir_path: str, mmap_mode: Optional[str] = 'r') -> 'ISO834SteelTable':
+        """Reads a table written by `save`, the table is memory mapped (i.e. not copied into the memory of the process
+        and shared by all processes reading it) unless `mmap_mode` is None.
+
+        :raises FileNotFoundError: if not saved or of another `TABLE_VERSION`.
+        """
+        with open(os.path.join(dir_path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        if meta.get('version') != TABLE_VERSION:
+            raise FileNotFoundError(f'Table of version {meta.get("version")} is not supported, {dir_path}')
+        table = cls.__new__(cls)
+        table.__init(
+            np.load(os.path.join(dir_path, 'fire_time.npy'), allow_pickle=False),
+            np.load(os.path.join(dir_path, 'protection_thickness.npy'), allow_pickle=False),
+            np.load(os.path.join(dir_path, 'offset_table.npy'), mmap_mode=mmap_mode, allow_pickle=False),
+            float(meta['stride']),
+        )
+        return table
+
+    @classmethod
+    def build(
+            cls,
+            fire_time: np.ndarray,
+            d_p_1: float,
+            d_p_2: float,
+            beam_rho: float,
+            beam_cross_section_area: float,
+            protection_k: float,
+            protection_rho: float,
+            protection_c: float,
+            protection_protected_perimeter: float,
+            n_thickness: int = N_THICKNESS,
+    ) -> 'ISO834SteelTable':
+        """Tabulates `n_thickness` thicknesses between `d_p_1` and `d_p_2` [m], solved by the compiled kernel of
+        fsetools, see `sfeprapy.func.heat_transfer_protected_steel_ec.temperature` for the other parameters."""
+        fire_time = np.ascontiguousarray(fire_time, dtype=float)
+        fire_temperature = iso834_fire_temperature(fire_time)
+        protection_thickness = np.linspace(np.sqrt(d_p_1), np.sqrt(d_p_2), n_thickness) ** 2
+        steel_temperature = np.array([
+            _steel_temperature(
+                fire_time=fire_time, fire_temperature=fire_temperature, beam_rho=beam_rho,
+                beam_cross_section_area=beam_cross_section_area, protection_k=protection_k,
+                protection_rho=protection_rho, protection_c=protection_c, protection_thickness=d_p,
+                protection_protected_perimeter=protection_protected_perimeter,
+            ) for d_p in protection_thickness
+        ], dtype=float)
+        # the steel temperature is non decreasing in ISO 834 fire, this only removes round off
+        return cls(fire_time, protection_thickness, np.maximum.accumulate(steel_temperature, axis=1))
+
+    def is_within(self, protection_thickness: Union[float, np.ndarray]) -> np.ndarray:
+        """Whether `protection_thickness` is within the tabulated thicknesses."""
+        d_p = np.asarray(protection_thickness, dtype=float)
+        return (d_p >= self.protection_thickness[0]) & (d_p <= self.protection_thickness[-1])
+
+    def __row_time_to_temperature(self, i: np.ndarray, temperature_goal: np.ndarray) -> np.ndarray:
+        n_t = len(self.fire_time)
+        offset = self.__stride * i
+        j = np.searchsorted(self.__flat, temperature_goal + offset, side='left') - i * n_t
+        is_reached = (j > 0) & (j < n_t)
+        j = np.clip(j, 1, n_t - 1)
+        T_0, T_1 = self.__flat[i * n_t + j - 1] - offset, self.__flat[i * n_t + j] - offset
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f = np.where(T_1 > T_0, (temperature_goal - T_0) / (T_1 - T_0), 1.)
+        t = self.fire_time[j - 1] + f * (self.fire_time[j] - self.fire_time[j - 1])
+        return np.where(is_reached, t, np.nan)
+
+    def time_to_temperature(
+            self,
+            temperature_goal: Union[float, np.ndarray],
+            protection_thickness: Union[float, np.ndarray],
+    ) -> np.ndarray:
+        """:param temperature_goal: [K], float or (n_s,).
+        :param protection_thickness: [m], float or (n_s,), within the tabulated thicknesses, see `is_within`.
+        :return t: [s], (n_s,) time at which `temperature_goal` is reached, `np.nan` if not reached within `fire_time`
+            or `protection_thickness` is not within the table.
+        """
+        temperature_goal, d_p = [
+            np.atleast_1d(v) for v in np.broadcast_arrays(
+                np.asarray(temperature_goal, dtype=float), np.asarray(protection_thickness, dtype=float))
+        ]
+        is_within = self.is_within(d_p)
+        d_p_ = np.where(is_within, d_p, self.protection_thickness[0])
+
+        i = np.clip(np.searchsorted(self.protection_thickness, d_p_, side='right') - 1, 0,
+                    len(self.protection_thickness) - 2)
+        d_p_0, d_p_1 = self.protection_thickness[i], self.protection_thickness[i + 1]
+        t_0 = self.__row_time_to_temperature(i, temperature_goal)
+        t_1 = self.__row_time_to_temperature(i + 1, temperature_goal)
+        t = t_0 + (d_p_ - d_p_0) / (d_p_1 - d_p_0) * (t_1 - t_0)
+        return np.where(is_within, t, np.nan)
+
+
+class ISO834SteelTableCache:
+    """Local store of `ISO834SteelTable`, shared by runs, worker processes and projects. One directory per table named
+    after its key (see `table_key`), tables are memory mapped when read so workers attach the same pages of the file
+    rather than building or copying the table. The least recently used tables are evicted once the total size exceeds
+    `max_size`, same as `sfeprapy.func.mcs_cache.ResultCache`.
+
+    :param dir_path: cache directory, created if not exist.
+    :param max_size: [byte], maximum total size of the tables, unlimited if undefined.
+    """
+
+    def __init__(self, dir_path: str, max_size: int = None):
+        self.dir_path = os.path.realpath(os.path.expanduser(dir_path))
+        self.max_size = max_size
+        os.makedirs(self.dir_path, exist_ok=True)
+
+    def __entry_dir(self, key: str) -> str:
+        return os.path.join(self.dir_path, key)
+
+    def get(self, key: str) -> Optional[ISO834SteelTable]:
+        """Returns the memory mapped table stored under `key`, or None if not stored."""
+        dir_path = self.__entry_dir(key)
+        try:
+            table = ISO834SteelTable.load(dir_path)
+        except (FileNotFoundError, ValueError):
+            return None  # i.e. not stored, evicted meanwhile or of another version
+        try:
+            os.utime(dir_path)  # last access time used for eviction
+        except FileNotFoundError:
+            pass
+        return table
+
+    def put(self, key: str, table: ISO834SteelTable):
+        """Stores `table` under `key`, then evicts the least recently used tables if `max_size` is exceeded."""
+        dir_path = self.__entry_dir(key)
+        # written into a temporary directory and moved into place, so a partial table is never read
+        dir_path_temp = f'{dir_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        shutil.rmtree(dir_path_temp, ignore_errors=True)
+        table.save(dir_path_temp)
+        shutil.rmtree(dir_path, ignore_errors=True)  # i.e. of another version
+        try:
+            os.rename(dir_path_temp, dir_path)
+        except OSError:
+            # i.e. stored by another process meanwhile, which is the same table
+            shutil.rmtree(dir_path_temp, ignore_errors=True)
+        self.evict()
+
+    def __entries(self) -> list:
+        entries = list()
+        for name in os.listdir(self.dir_path):
+            dir_path = os.path.join(self.dir_path, name)
+            if name.endswith('.tmp') or not os.path.isdir(dir_path):
+                continue
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(dir_path))
+                entries.append((os.stat(dir_path).st_mtime, dir_path, size))
+            except FileNotFoundError:
+                pass  # i.e. evicted by another process
+        return entries
+
+    def size(self) -> int:
+        """[byte], total size of all tables."""
+        return sum(size for _, _, size in self.__entries())
+
+    def evict(self):
+        """Removes the least recently used tables until the total size is within `max_size`. Tables memory mapped by
+        running processes remain readable by them until closed."""
+        if self.max_size is None:
+            return
+        entries = sorted(self.__entries())
+        size = sum(size_ for _, _, size_ in entries)
+        for _, dir_path, size_ in entries:
+            if size <= self.max_size:
+                break
+            shutil.rmtree(dir_path, ignore_errors=True)
+            size -= size_
+
+
+def table_key(fire_time: np.ndarray, d_p_1: float, d_p_2: float, **properties) -> tuple:
+    """Key of the table of a case, i.e. the time array, protection thickness bounds and steel and protection properties
+    rounded to `KEY_SIGNIFICANT_DIGITS` significant digits, which the table is built with."""
+    fire_time = np.asarray(fire_time, dtype=float)
+    rounded = lambda v: float(f'{float(v):.{KEY_SIGNIFICANT_DIGITS}g}')
+    return (
+        ('n_t', len(fire_time)), ('t_1', rounded(fire_time[0])), ('t_2', rounded(fire_time[-1])),
+        ('d_p_1', rounded(d_p_1)), ('d_p_2', rounded(d_p_2)),
+        *sorted((k, rounded(v)) for k, v in properties.items()),
+    )
+
+
+def table_cache(dir_path: Optional[str], max_size: int = None) -> Optional[ISO834SteelTableCache]:
+    """The on-disk cache at `dir_path` (tables of `TABLE_VERSION` are kept in a sub-directory), one instance per
+    directory and process. None if `dir_path` is undefined, i.e. tables are kept in memory only, or not writable.
+
+    :param dir_path: cache directory, e.g. `iso834_table_cache_dir` of `MCS.mcs_config`.
+    :param max_size: [byte], maximum total size of the tables, unlimited if undefined.
+    """
+    if not dir_path:
+        return None
+    dir_path = os.path.join(dir_path, f'v{TABLE_VERSION}')
+    cache = _table_caches.get(dir_path)
+    if cache is None or cache.max_size != max_size:
+        try:
+            cache = _table_caches[dir_path] = ISO834SteelTableCache(dir_path, max_size=max_size)
+        except OSError:
+            return None
+    return cache
+
+
+_table_caches = dict()  # {directory: ISO834SteelTableCache}
+_tables = collections.OrderedDict()  # {key: ISO834SteelTable}, the least recently used first
+_tables_lock = threading.Lock()
+
+
+def iso834_steel_table(
+        fire_time: np.ndarray,
+        fire_temperature: np.ndarray,
+        d_p_1: float,
+        d_p_2: float,
+        beam_rho: float,
+        beam_cross_section_area: float,
+        protection_k: float,
+        protection_rho: float,
+        protection_c: float,
+        protection_protected_perimeter: float,
+        cache_dir: str = None,
+        cache_max_size: int = None,
+) -> Optional[ISO834SteelTable]:
+    """Table of the case (i.e. of the same time array, protection thickness bounds and steel and protection properties),
+    kept in memory by the process and, if `cache_dir` is defined, in the on-disk cache (see `table_cache`). The table is
+    read from the on-disk cache, or built and stored if not cached. None is returned if `fire_temperature` is not the
+    ISO 834 fire of `fire_time`, where the heat transfer is to be solved.
+
+    Whether a table is used is decided per case by the caller (see `iso834_table` of `sfeprapy.mcs0.mcs0_calc.teq_main`)
+    and the table only depends on the key, so results do not depend on what else the process has solved. Each distinct
+    set of steel and protection properties builds a table, i.e. tables are for cases of deterministic properties.
+
+    :param cache_dir: optional, directory of the on-disk cache shared by processes and runs, see `table_cache`.
+    :param cache_max_size: optional, [byte], maximum total size of the on-disk cache, see `table_cache`.
+    :return: ISO834SteelTable or None.
+    """
+    if not np.array_equal(iso834_fire_temperature(fire_time), fire_temperature):
+        return None
+    key = table_key(
+        fire_time, d_p_1, d_p_2, beam_rho=beam_rho, beam_cross_section_area=beam_cross_section_area,
+        protection_k=protection_k, protection_rho=protection_rho, protection_c=protection_c,
+        protection_protected_perimeter=protection_protected_perimeter,
+    )
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None:
+            cache = table_cache(cache_dir, cache_max_size)
+            cache_key = case_key(dict(key), version=TABLE_VERSION) if cache is not None else None
+            table = cache.get(cache_key) if cache is not None else None
+            if table is None:
+                table = ISO834SteelTable.build(fire_time, **dict(key[3:]))
+                if cache is not None:
+                    try:
+                        cache.put(cache_key, table)
+                    except OSError:
+                        pass  # i.e. cache directory not writable or full, the table is kept in memory only
+            _tables[key] = table
+        _tables.move_to_end(key)
+        while len(_tables) > MAX_TABLES:
+            _tables.popitem(last=False)
+    return table
+
+
+def _test_iso834_steel_table():
+    from sfeprapy.func.heat_transfer_protected_steel_ec import time_to_temperature
+
+    fire_time = np.arange(0, 18000 + 10, 10, dtype=float)
+    fire_temperature = iso834_fire_temperature(fire_time)
+    kwargs = dict(
+        beam_rho=7850., beam_cross_section_area=0.017, protection_k=0.2, protection_rho=800., protection_c=1700.,
+        protection_protected_perimeter=2.14,
+    )
+    table = ISO834SteelTable.build(fire_time, d_p_1=0.0001, d_p_2=0.03, **kwargs)
+
+    rng = np.random.default_rng(0)
+    d_p = np.concatenate([rng.uniform(0.0001, 0.03, 500), table.protection_thickness, [0.00005, 0.031]])
+    temperature_goal = np.concatenate([rng.uniform(700, 1100, 500), np.full((130,), 893.15)])
+    t = table.time_to_temperature(temperature_goal, d_p)
+    t_ = time_to_temperature(fire_time, fire_temperature, temperature_goal, protection_thickness=d_p, **kwargs)
+    is_within = table.is_within(d_p)
+    assert np.sum(~is_within) == 2 and np.all(np.isnan(t[~is_within]))
+    assert np.all(np.isnan(t[is_within]) == np.isnan(t_[is_within]))  # i.e. not reached within the fire time
+    assert np.nanmax(np.abs(t - t_)) < 0.2
+    assert np.allclose(t[500:628], t_[500:628], rtol=0, atol=1e-9)  # i.e. at the tabulated thicknesses
+    assert abs(table.time_to_temperature(893.15, 0.01)[0] - time_to_temperature(
+        fire_time, fire_temperature, 893.15, protection_thickness=0.01, **kwargs)[0]) < 0.2
+
+    # only for the ISO 834 fire, built once per process and stored in the on-disk cache if defined
+    import tempfile
+    assert table_cache(None) is None
+    with tempfile.TemporaryDirectory() as dir_work:
+        try:
+            kwargs.update(protection_k=0.21)
+            _tables.clear()
+            # in memory only unless the cache directory is defined
+            table = iso834_steel_table(fire_time, fire_temperature, 0.0001, 0.03, **kwargs)
+            assert isinstance(table, ISO834SteelTable) and not table.is_memory_mapped
+            assert len(os.listdir(dir_work)) == 0
+            _tables.clear()
+            assert iso834_steel_table(fire_time, fire_temperature + 1, 0.0001, 0.03, cache_dir=dir_work, **kwargs) is None
+            assert len(os.listdir(table_cache(dir_work).dir_path)) == 0
+            table = iso834_steel_table(fire_time, fire_temperature, 0.0001, 0.03, cache_dir=dir_work, **kwargs)
+            assert isinstance(table, ISO834SteelTable) and not table.is_memory_mapped
+            assert iso834_steel_table(fire_time, fire_temperature, 0.0001, 0.03, cache_dir=dir_work, **kwargs) is table
+            assert len(os.listdir(table_cache(dir_work).dir_path)) == 1
+
+            # warm start, i.e. another process, the table is memory mapped from the cache and not built
+            _tables.clear()
+            table_ = iso834_steel_table(fire_time, fire_temperature, 0.0001, 0.03, cache_dir=dir_work, **kwargs)
+            assert table_.is_memory_mapped
+            assert np.array_equal(table_.steel_temperature, table.steel_temperature)
+            assert np.array_equal(table_.time_to_temperature(temperature_goal, d_p),
+                                  table.time_to_temperature(temperature_goal, d_p), equal_nan=True)
+            # properties are keyed with `KEY_SIGNIFICANT_DIGITS` significant digits
+            assert table_key(fire_time, 0.0001, 0.03, **kwargs) == table_key(
+                fire_time, 0.0001, 0.03, **dict(kwargs, protection_k=0.21 + 1e-12))
+
+            # versioned and limited in size
+            cache = table_cache(dir_work)
+            key = os.listdir(cache.dir_path)[0]
+            with open(os.path.join(cache.dir_path, key, 'meta.json'), 'w') as f:
+                json.dump(dict(version=TABLE_VERSION - 1, stride=0.), f)
+            assert cache.get(key) is None
+            cache.put(key, table)
+            size = cache.size()
+            cache.put('other', table)
+            assert cache.size() == 2 * size
+            cache.max_size = int(size * 1.5)
+            os.utime(os.path.join(cache.dir_path, key), (0, 0))
+            cache.evict()
+            assert cache.get(key) is None and cache.get('other') is not None
+        finally:
+            _tables.clear()
+
+
+if __name__ == '__main__':
+    _test_iso834_steel_table()
@@ -1,14 +1,436 @@
+import asyncio
+import concurrent.futures
+import contextlib
 import copy
-import multiprocessing as mp
+import functools
 import os
 import time
 from abc import ABC, abstractmethod
-from typing import Union, Callable
+from typing import Union, Callable, Iterator
 
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
+from sfeprapy import __version__, logger
+from sfeprapy.func.mcs_cache import ResultCache, case_key
+from sfeprapy.func.mcs_convergence import FractileConvergence, control_variate_fractile_interval, \
+    fractile_confidence_interval
+from sfeprapy.func.mcs_executor import MCSExecutor, make_executor
+from sfeprapy.func.mcs_gen import StratifiedSampler, case_seed_sequence, chunk_seed_sequence, sampler_rng
 from sfeprapy.func.mcs_gen import main as mcs_gen_main
+from sfeprapy.func.mcs_profile import merge as profile_merge, profile_report, profiling
+from sfeprapy.func.mcs_shared import SharedConstants, get_shared_constants, join_constant_columns, \
+    split_constant_columns
+from sfeprapy.func.mcs_sink import ColumnarSink, read_columnar
+from sfeprapy.func.mcs_surrogate import PolynomialChaosSurrogate
+from sfeprapy.func.mcs_telemetry import MCSTelemetry, worker_name
+
+
+def _mcs_calc_chunk(args) -> Union[list, pd.DataFrame]:
+    """Evaluates a contiguous block of samples, this is the unit of work in chunked dispatch.
+
+    :param args: tuple (func, x, constants, seed, profile), `x` is either a DataFrame of samples which is passed to
+        `func` in one go (i.e. `func` is a batch calculation routine), or a list of dict with each dict being the
+        keyword arguments of one sample, or a callable returning either of them (i.e. samples are produced by the
+        worker, see `_sample_rows`). `constants` is a `SharedConstants.handle` of the case-invariant parameters
+        dropped from `x`, or None. `seed` is tuple (case_ss, start) of the case `SeedSequence` and the first row of the
+        chunk, the global `np.random` state is seeded with `chunk_seed_sequence` of the chunk (batch) or of
+        every row while `func` is evaluated (i.e. for calculation routines with random initial guess), or None.
+        `profile` is bool, to record timings of the stages of `func`, see `profiling`.
+    :return res: a DataFrame if `x` is a DataFrame, otherwise a list of results, one per sample.
+    :return worker: name of the worker, see `worker_name`.
+    :return busy: [s], evaluation time.
+    :return stats: timings of the stages of `func`, empty if `profile` is False.
+    """
+    t0 = time.perf_counter()
+    func, x, constants, seed, profile = args
+    if callable(x):
+        x = x()
+    if constants is not None:
+        x = join_constant_columns(x, get_shared_constants(constants))
+    case_ss, start = seed if seed is not None else (None, 0)
+    with profiling(profile, n_samples=len(x)) as stats:
+        if isinstance(x, pd.DataFrame):
+            with _np_random_seeded(case_ss, start):
+                res = func(x)
+        else:
+            res = list()
+            for i, kwargs in enumerate(x):
+                with _np_random_seeded(case_ss, start + i):
+                    res.append(func(**kwargs))
+    return res, worker_name(), time.perf_counter() - t0, stats
+
+
+def _sample_rows(sampler: StratifiedSampler, start: int, stop: int, records: bool) -> Union[list, pd.DataFrame]:
+    """Samples of a chunk produced by the worker, as a list of dict (one per sample) if `records`."""
+    x = sampler.rows(start, stop)
+    return x.to_dict(orient="records") if records else x
+
+
+@contextlib.contextmanager
+def _np_random_seeded(case_ss: np.random.SeedSequence = None, start: int = 0):
+    """Seeds the global `np.random` state with `chunk_seed_sequence` of row `start` of a case within the context and
+    restores it afterwards, no effect if `case_ss` is None."""
+    if case_ss is None:
+        yield
+        return
+    state = np.random.get_state()
+    np.random.seed(chunk_seed_sequence(case_ss, start).generate_state(4))
+    try:
+        yield
+    finally:
+        np.random.set_state(state)
+
+
+class _MCSCase:
+    """Solving state of a case. Tasks are submitted to the executor by `_MCSCase.submit` and results are collected in
+    order by `_MCSCase.collect`. Tasks of the following cases are submitted before a case is collected, so the executor
+    is kept busy over case boundaries and per case post-processing is done while the following cases are being solved.
+
+    :param func: per sample calculation routine.
+    :param x: samples of the case, or a `StratifiedSampler` in which case samples are produced chunk by chunk by the
+        workers and are never held as a whole.
+    :param executor: an opened executor.
+    :param func_batch: optional, columnar calculation routine, see `MCS.mcs_deterministic_calc_batch`.
+    :param chunk_size: optional, number of samples per task.
+    :param sink: optional, to write results of each chunk as they complete.
+    :param convergence: optional, adaptive sample size criterion, see `FractileConvergence`.
+    :param batch_size: number of samples solved between convergence checks, all samples in one batch if undefined.
+    :param n_replicates: optional, number of replicates interleaved by row (see `qmc_points`), passed to `convergence`
+        as `index % n_replicates`.
+    :param surrogate: optional, an emulator (see `PolynomialChaosSurrogate`) trained on results of the first
+        `surrogate_n_train` samples, the remaining samples are predicted by it and only those not confidently predicted
+        are solved. Emulated samples have `solver_time_equivalence_solved` and `fire_type` predicted, the sampled
+        inputs passed through, other results undefined (nan) and `surrogate` True.
+    :param surrogate_n_train: number of samples solved to train `surrogate`.
+    :param seed: optional, `SeedSequence` of the case, each sample (or chunk if `func_batch`) is solved with its own
+        stream, see `chunk_seed_sequence`.
+    :param telemetry: optional, updated with every completed task.
+    :param profile: to record timings of the stages of `func` (or `func_batch`) in `_MCSCase.profile`.
+    """
+
+    def __init__(
+            self, func, x: Union[pd.DataFrame, StratifiedSampler], executor: MCSExecutor, func_batch=None,
+            chunk_size: int = None, sink: ColumnarSink = None, convergence: Callable = None, batch_size: int = None,
+            n_replicates: int = None, surrogate: PolynomialChaosSurrogate = None, surrogate_n_train: int = None,
+            seed: np.random.SeedSequence = None, telemetry: MCSTelemetry = None, profile: bool = False,
+    ):
+        if isinstance(x, StratifiedSampler):
+            self.case_name, self.n_simulations = x.x["case_name"], len(x)
+        else:
+            self.case_name, self.n_simulations = x["case_name"].iloc[0], len(x.index)
+        self.sink, self.convergence = sink, convergence
+        self.__func, self.__func_batch = func, func_batch
+        self.__x, self.__executor, self.__batch_size, self.__seed = x, executor, batch_size, seed
+        self.__n_replicates = n_replicates
+        self.surrogate, self.__surrogate_n_train = surrogate, surrogate_n_train
+        self.__is_surrogate_fitted, self.__surrogate_train, self.__result_columns = False, list(), None
+        self.__telemetry = telemetry
+        self.__profile = bool(profile)
+        self.profile = dict() if profile else None  # timings of all tasks, see `profiling`
+
+        n_threads = executor.n_threads
+        if func_batch is not None and not chunk_size:
+            # columnar calculation without chunk size defined, samples are split into one block per thread
+            chunk_size = int(np.ceil(self.n_simulations / n_threads))
+        elif not chunk_size and (
+                n_threads > 1 or isinstance(x, StratifiedSampler) or convergence is not None or surrogate is not None
+        ):
+            # progress is counted by completed chunks, four chunks per thread as `multiprocessing.Pool.map` would do
+            chunk_size = int(np.ceil(self.n_simulations / (4 * n_threads)))
+        self.chunk_size = int(chunk_size) if chunk_size else None
+
+        self.__shared_constants, self.__constants_values = None, None
+        self.__is_submitted = False
+        self.__batches, self.__futures, self.__teq = None, None, None
+
+    def submit(self):
+        """Submits tasks of the case to the executor, only the first batch if adaptive sample size."""
+        if self.__is_submitted:
+            return
+        self.__is_submitted = True
+
+        executor = self.__executor
+        if executor.n_threads > 1 and isinstance(self.__x, pd.DataFrame):
+            # case-invariant parameters are published once for all tasks rather than being pickled with every task
+            constants, self.__x = split_constant_columns(self.__x)
+            self.__constants_values = constants
+            self.__shared_constants = SharedConstants(constants, use_shared_memory=executor.shared_memory)
+
+        if self.chunk_size:
+            # chunked dispatch, contiguous blocks of samples are sent as a single task and one block of results is
+            # returned per task
+            # only rows not completed by a previous run are solved if resumed
+            sink, convergence = self.sink, self.convergence
+            rows = sink.pending(self.n_simulations) if sink is not None else [[0, self.n_simulations]]
+            n_train = self.__surrogate_n_train if self.surrogate is not None else None
+            if n_train is not None:
+                # training samples are solved first and in batches of their own, the emulator is fitted before the rest
+                rows = [
+                    rows_ for start, stop in rows
+                    for rows_ in ((start, min(stop, n_train)), (max(start, n_train), stop)) if rows_[0] < rows_[1]
+                ]
+            rows = [
+                (i, min(i + self.chunk_size, stop)) for start, stop in rows for i in range(start, stop, self.chunk_size)
+            ]
+
+            # adaptive sample size, chunks are solved in batches and the remaining batches are skipped once converged
+            batches, batch_size = [list()], self.__batch_size if convergence is not None else None
+            for rows_ in rows:
+                if batches[-1] and (
+                        (batch_size and sum(j - i for i, j in batches[-1]) >= batch_size) or
+                        (n_train is not None and batches[-1][-1][1] <= n_train <= rows_[0])
+                ):
+                    batches.append(list())
+                batches[-1].append(rows_)
+            self.__teq = list()
+            if convergence is not None and sink is not None and len(sink) > 0:
+                # results completed by a previous run, i.e. resumed
+                self.__teq.append(sink.read(columns=self.__convergence_columns))
+                if self.__converged():
+                    batches = list()
+                    if self.__telemetry is not None:
+                        self.__telemetry.discount(sum(j - i for i, j in rows))
+            self.__batches, self.__futures = batches, [None] * len(batches)
+            if batches:
+                self.__submit_batch(0)
+
+    @property
+    def n_queued(self) -> int:
+        """Number of tasks submitted and not yet completed."""
+        if not self.__futures:
+            return 0
+        return sum(not future.done() for futures in self.__futures if futures is not None for future in futures)
+
+    @property
+    def __status(self):
+        return self.__telemetry.status if self.__telemetry is not None else None
+
+    @property
+    def __constants(self):
+        return self.__shared_constants.handle if self.__shared_constants else None
+
+    @property
+    def __convergence_columns(self) -> list:
+        return ["solver_time_equivalence_solved", "sample_weight"] + (["index"] if self.__n_replicates else [])
+
+    def __converged(self) -> bool:
+        """Evaluates `convergence` with all results obtained so far, weighted if importance sampled."""
+        teq = pd.concat(self.__teq) if self.__teq else pd.DataFrame(columns=self.__convergence_columns)
+        w = teq["sample_weight"].to_numpy(dtype=float) if "sample_weight" in teq else None
+        return self.convergence(
+            teq["solver_time_equivalence_solved"].to_numpy(dtype=float),
+            w=w if w is not None and np.any(w != 1) else None,
+            replicate=teq["index"].to_numpy(dtype=np.int64) % self.__n_replicates if self.__n_replicates else None,
+        )
+
+    def __chunk_seed(self, start: int):
+        return (self.__seed, start) if self.__seed is not None else None
+
+    def __submit_batch(self, i_batch: int):
+        if self.surrogate is not None and self.__batches[i_batch][0][0] >= self.__surrogate_n_train:
+            self.__fit_surrogate()
+            self.__futures[i_batch] = [self.__submit_emulated(i, j) for i, j in self.__batches[i_batch]]
+            return
+        x, constants = self.__x, self.__constants
+        if isinstance(x, StratifiedSampler):
+            tasks = [
+                (
+                    self.__func_batch or self.__func,
+                    functools.partial(_sample_rows, x, i, j, self.__func_batch is None),
+                    None, self.__chunk_seed(i), self.__profile,
+                ) for i, j in self.__batches[i_batch]
+            ]
+        elif self.__func_batch is not None:
+            tasks = [
+                (self.__func_batch, x.iloc[i:j], constants, self.__chunk_seed(i), self.__profile)
+                for i, j in self.__batches[i_batch]
+            ]
+        else:
+            tasks = [
+                (self.__func, x.iloc[i:j].to_dict(orient="records"), constants, self.__chunk_seed(i), self.__profile)
+                for i, j in self.__batches[i_batch]
+            ]
+        self.__futures[i_batch] = [self.__executor.submit(_mcs_calc_chunk, task) for task in tasks]
+
+    def __rows(self, start: int, stop: int) -> pd.DataFrame:
+        """Samples of rows [`start`, `stop`) with all columns, in the current process."""
+        if isinstance(self.__x, StratifiedSampler):
+            return self.__x.rows(start, stop)
+        x = self.__x.iloc[start:stop]
+        return join_constant_columns(x, self.__constants_values) if self.__constants_values is not None else x
+
+    def __fit_surrogate(self):
+        """Trains `surrogate` with results of the training samples, once."""
+        if self.__is_surrogate_fitted:
+            return
+        self.__is_surrogate_fitted = True
+        n_train = min(self.__surrogate_n_train, self.n_simulations)
+        if self.sink is not None:
+            res = self.sink.read()
+            if self.__result_columns is None:
+                self.__result_columns = list(res.columns)  # i.e. resumed, all training samples solved before
+        else:
+            res = pd.concat(self.__surrogate_train)
+            self.__surrogate_train = list()
+        res = res[res["index"].values < n_train]
+        x = self.__rows(0, n_train).iloc[res["index"].to_numpy(dtype=np.int64)]
+        self.surrogate.fit(
+            x, res["solver_time_equivalence_solved"].to_numpy(dtype=float),
+            labels=res["fire_type"].to_numpy() if "fire_type" in res else None,
+        )
+
+    def __submit_emulated(self, start: int, stop: int) -> concurrent.futures.Future:
+        """Predicts rows [`start`, `stop`) by `surrogate` and submits a task of rows not confidently predicted, returns
+        a future of the same result as `_mcs_calc_chunk` of all the rows."""
+        x = self.__rows(start, stop)
+        y, labels, is_confident = self.surrogate.predict(x)
+        columns = self.__result_columns
+        emulated = pd.DataFrame({
+            k: x[k].values[is_confident] if k in x else np.full((np.sum(is_confident),), np.nan) for k in columns
+        })
+        emulated["solver_time_equivalence_solved"] = y[is_confident]
+        if "fire_type" in emulated:
+            emulated["fire_type"] = labels[is_confident]
+        emulated["surrogate"] = True
+
+        future = concurrent.futures.Future()
+        if np.all(is_confident):
+            future.set_result((emulated, None, None, dict()))
+            return future
+
+        def done(future_: concurrent.futures.Future):
+            try:
+                res, worker, busy, stats = future_.result()
+            except BaseException as e:
+                future.set_exception(e)
+                return
+            res = (pd.DataFrame(res) if isinstance(res, list) else res).assign(surrogate=False)
+            res = pd.concat([res[columns], emulated], ignore_index=True).sort_values("index", kind="stable")
+            future.set_result((res, worker, busy, stats))
+
+        x_ = x[~is_confident]
+        if self.__func_batch is not None:
+            task = (self.__func_batch, x_, None, self.__chunk_seed(start), self.__profile)
+        else:
+            task = (self.__func, x_.to_dict(orient="records"), None, self.__chunk_seed(start), self.__profile)
+        self.__executor.submit(_mcs_calc_chunk, task).add_done_callback(done)
+        return future
+
+    def collect(self):
+        """Collects results of the case, a generator of `MCS.__run` steps which returns a DataFrame of results."""
+        self.submit()
+        case_name, n_simulations = self.case_name, self.n_simulations
+        if self.chunk_size:
+            sink, convergence, teq = self.sink, self.convergence, self.__teq
+            mcs_out = list()
+            n_completed = n_simulations - sum(j - i for batch in self.__batches for i, j in batch)
+            i_batch = -1
+            for i_batch, batch in enumerate(self.__batches):
+                if self.__futures[i_batch] is None:
+                    self.__submit_batch(i_batch)
+                for rows_, future in zip(batch, self.__futures[i_batch]):
+                    res, worker, busy, stats = yield 'wait', future
+                    if self.profile is not None:
+                        profile_merge(self.profile, stats)
+                    res = pd.DataFrame(res) if isinstance(res, list) else res
+                    if self.surrogate is not None and "surrogate" not in res:
+                        # i.e. a training sample
+                        res = res.assign(surrogate=False)
+                        self.__result_columns = self.__result_columns or list(res.columns)
+                        if sink is None:
+                            self.__surrogate_train.append(res)
+                    if sink is not None:
+                        sink.append(res, rows=rows_)
+                    else:
+                        mcs_out.append(res)
+                    if convergence is not None:
+                        teq.append(res[[k for k in self.__convergence_columns if k in res]])
+                    n_completed += len(res.index)
+                    if self.__telemetry is not None:
+                        self.__telemetry.update(len(res.index), worker, busy)
+                    yield 'event', dict(
+                        event='chunk', case_name=case_name, n_completed=n_completed, n_simulations=n_simulations,
+                        rows=rows_, result=res, telemetry=self.__status,
+                    )
+
+                if convergence is not None and self.__converged():
+                    break
+
+            if convergence is not None and convergence.status is None:
+                self.__converged()
+            if self.__telemetry is not None:
+                # i.e. converged, samples of the remaining batches are not solved
+                self.__telemetry.discount(sum(j - i for batch in self.__batches[i_batch + 1:] for i, j in batch))
+
+            df_mcs_out = sink.read() if sink is not None else pd.concat(mcs_out)
+            df_mcs_out.sort_values("solver_time_equivalence_solved", inplace=True)  # sort base on time equivalence
+            return df_mcs_out
+
+        # per sample in the current process, progress events are without results
+        mcs_out = list()
+        worker = worker_name()
+        for i, kwargs in enumerate(self.__x.to_dict(orient="records")):
+            t0 = time.perf_counter()
+            with _np_random_seeded(self.__seed, i), profiling(self.__profile) as stats:
+                mcs_out.append(self.__func(**kwargs))
+            if self.profile is not None:
+                profile_merge(self.profile, stats)
+            if self.__telemetry is not None:
+                self.__telemetry.update(1, worker, time.perf_counter() - t0)
+            yield 'event', dict(
+                event='chunk', case_name=case_name, n_completed=len(mcs_out), n_simulations=n_simulations,
+                rows=None, result=None, telemetry=self.__status,
+            )
+
+        # clean and convert results to dataframe and return
+        df_mcs_out = pd.DataFrame(mcs_out)
+        df_mcs_out.sort_values("solver_time_equivalence_solved", inplace=True)  # sort base on time equivalence
+        return df_mcs_out
+
+    def close(self):
+        """Releases the published case-invariant parameters, to be called once collected or abandoned."""
+        if self.__shared_constants:
+            self.__shared_constants.unlink()
+            self.__shared_constants = None
+
+
+class _MCSCachedCase:
+    """Counterpart of `_MCSCase` of which results are loaded from `ResultCache`, nothing is submitted to the executor.
+
+    :param case_name: name of the case.
+    :param n_simulations: number of samples defined for the case.
+    :param df: cached results.
+    :param sink: optional, cached results are written to it upon collected.
+    :param convergence: optional, the adaptive sample size criterion with the cached `status`.
+    """
+
+    def __init__(
+            self, case_name: str, n_simulations: int, df: pd.DataFrame, sink: ColumnarSink = None,
+            convergence: FractileConvergence = None,
+    ):
+        self.case_name, self.n_simulations = case_name, n_simulations
+        self.sink, self.convergence = sink, convergence
+        self.profile = None
+        self.__df = df
+
+    def submit(self):
+        pass
+
+    def collect(self):
+        df = self.__df
+        if self.sink is not None:
+            self.sink.append(df, rows=(0, len(df.index)))
+            df = self.sink.read()
+        yield 'event', dict(
+            event='chunk', case_name=self.case_name, n_completed=len(df.index), n_simulations=self.n_simulations,
+            rows=(0, len(df.index)), result=df, telemetry=None,
+        )
+        return df
+
+    def close(self):
+        pass
 
 
 class MCS(ABC):
@@ -33,14 +455,137 @@ class MCS(ABC):
         `MCS.mcs_deterministic_calc`
             A method to carry out deterministic calculation.
             NOTE! This method needs to be re-defined in a child class.
+        `MCS.mcs_deterministic_calc_batch`
+            Optional, a columnar version of `MCS.mcs_deterministic_calc` which takes all samples of a case as a
+            DataFrame. Used in place of `MCS.mcs_deterministic_calc` when `batch` is set to True in `MCS.mcs_config`.
+        `MCS.mcs_deterministic_calc_control`
+            Optional, a cheap (i.e. closed form) model correlated with the deterministic calculation, takes a DataFrame
+            of samples and returns an array of one result per sample. Used as the control variate of the fractiles
+            when `control_variate_n` is set in `MCS.mcs_config`.
+
+    `MCS.mcs_config` items:
+
+        `n_threads`
+            int, number of processes.
+        `batch`
+            bool, optional, to use `MCS.mcs_deterministic_calc_batch`.
+        `chunk_size`
+            int, optional, number of samples sent to a process as a single task. Four tasks per process if undefined,
+            or one task per process if undefined and `batch` is True. Samples are solved one by one in the current
+            process if undefined and `n_threads` is 1.
+        `stream_out`
+            bool, optional, to write results of each chunk to `<cwd>/mcs.out/<case_name>/` as they complete, see
+            `ColumnarSink`. `MCS.mcs_out` is then loaded from these files when accessed. `chunk_size` defaults to
+            `DEFAULT_STREAM_CHUNK_SIZE` if undefined. `cwd` is required, also by `stream_in` and resuming.
+        `stream_in`
+            bool, optional, to produce samples chunk by chunk where they are solved rather than sampling all at once,
+            see `StratifiedSampler`. Only the sampler is sent with each task and results are written to disk as
+            `stream_out` (implied), so memory of sampling and solving is independent of `n_simulations`. The same
+            stratified values are sampled as otherwise, in a different order.
+        `sampler`
+            str, optional, 'random' (default) to stratify every stochastic input on its own and pair them by independent
+            shuffles, or 'lhs', 'sobol' or 'halton' to sample all stochastic inputs of a case from one joint
+            (quasi-random) point set mapped through the truncated ppf of each input, see `sfeprapy.func.mcs_gen.main`.
+        `sampler_scramble`
+            bool, optional, to scramble the point sets of `sampler`, True by default.
+        `sampler_replicates`
+            int, optional, number of independently scrambled point sets of `sampler` interleaved by row, the replicate
+            of a sample is `index % sampler_replicates`. With more than one, the confidence interval of the
+            `adaptive_fractile` in `MCS.mcs_convergence` (and of adaptive sample size) is estimated from the spread
+            between replicates (randomised quasi-Monte Carlo), see `replicate_fractile_interval`.
+        `adaptive_tolerance`
+            float, optional, to enable adaptive sample size. Samples are solved in batches and a case stops once the
+            confidence interval of the `adaptive_fractile` of `solver_time_equivalence_solved` is narrower than this
+            value [s], `n_simulations` of the case is the maximum number of samples. See `FractileConvergence`, the
+            achieved precision of each case is kept in `MCS.mcs_convergence`.
+        `adaptive_fractile`
+            float, optional, fractile of interest, 0.8 by default.
+        `adaptive_confidence`
+            float, optional, confidence level of the interval, 0.95 by default.
+        `adaptive_batch_size`
+            int, optional, number of samples solved between convergence checks, `DEFAULT_ADAPTIVE_BATCH_SIZE` by default.
+        `surrogate_n_train`
+            int, optional, to enable the emulator of the deterministic calculation routine. This number of samples of
+            each case is solved first to train a `PolynomialChaosSurrogate`, the remaining samples are predicted by it
+            and only those not confidently predicted (beyond the training range, next to a change of `fire_type` or
+            samples without solution, or error above `surrogate_tolerance`) are solved. Emulated samples are marked by
+            the `surrogate` column of the results, the cross validated error and number of emulated samples of each
+            case are kept in `MCS.mcs_surrogate`.
+        `surrogate_tolerance`
+            float, optional, [s], maximum error of an emulated time equivalence, 180 by default.
+        `surrogate_degree`
+            int, optional, maximum total degree of the polynomial chaos expansion, 3 by default.
+        `control_variate_n`
+            int, optional, to estimate fractiles with a control variate (multi-fidelity). This number of samples of each
+            case is sampled and evaluated by `MCS.mcs_deterministic_calc_control`, the first `n_simulations` of them
+            are solved by the deterministic calculation as usual. Fractiles of `solver_time_equivalence_solved` are then
+            corrected by the cheap model of all samples, see `control_variate_fractile_interval`. Estimates, confidence
+            intervals with and without the correction and variance reduction factors of each case are kept in
+            `MCS.mcs_control_variate` and written to `<cwd>/mcs.out.control_variate.csv`. All samples of the cheap
+            model are saved with the checkpoint of streamed results, so a resumed case pairs its results with the same
+            controls whether seeded or not. Not applicable with `stream_in`.
+        `control_variate_fractiles`
+            list, optional, fractiles to be estimated, [0.5, 0.8, 0.9] by default.
+        `control_variate_confidence`
+            float, optional, confidence level of the intervals, 0.95 by default.
+        `executor`
+            str, optional, executor to run tasks, one of 'serial', 'process', 'futures' or 'remote', see
+            `sfeprapy.func.mcs_executor.EXECUTORS`. 'process' by default, or 'serial' if `n_threads` is 1.
+        `executor_kwargs`
+            dict, optional, keyword arguments of the executor, e.g. dict(address='192.168.1.10:50000', authkey=secret)
+            for 'remote', in which case `n_threads` is the number of remote worker processes. `authkey` is required
+            other than at a loopback address, see `sfeprapy.func.mcs_executor.RemoteExecutor`.
+        `seed`
+            int, optional, master seed. Every case samples and solves each sample (each chunk if `batch`) with its own
+            random stream derived from it (see `case_seed_sequence`), results are then reproducible regardless of the
+            executor, the order of cases and resuming. Drawn from OS entropy if undefined and kept in `MCS.mcs_seed`.
+        `cache_dir`
+            str, optional, to keep results of every case in a `ResultCache` at this directory, keyed by `case_key` of
+            the case inputs, the deterministic calculation routine, sfeprapy version, `seed` and the relevant
+            configuration items. Cases unchanged since a previous run are loaded from the cache instead of being sampled
+            and solved. Only applies if `seed` is defined, results of an unseeded run are neither stored nor loaded as
+            they are not reproducible.
+        `cache_max_size`
+            int, optional, [byte], the least recently used cache entries are evicted beyond this size, unlimited by
+            default.
+        `prefetch_cases`
+            int, optional, number of following cases whose tasks are submitted to the executor while a case is being
+            solved, so workers are not idle between cases. All cases by default, 0 to solve cases one after another.
+        `profile`
+            bool, optional, to record wall time and call count of each stage of the deterministic calculation routine
+            (see `profile_stage`), aggregated over all workers per case. Kept in `MCS.mcs_profile` and written to
+            `<cwd>/mcs.out.profile.csv`, see `profile_report`. Cases loaded from cache are not profiled.
+        `iso834_table`
+            bool, optional, `MCS0` and `MCS2`, to interpolate time equivalence in ISO 834 fire from a steel temperature
+            table of each case rather than solving the heat transfer of every sample, within 0.1 s, see
+            `sfeprapy.func.iso834_steel_table.ISO834SteelTable`. For cases of deterministic steel and protection
+            properties, a table is built per distinct set of properties. False by default.
+        `iso834_table_cache_dir`
+            str, optional, `MCS0` and `MCS2`, to keep the tables of `iso834_table` at this directory, shared by worker
+            processes and runs (see `sfeprapy.func.iso834_steel_table.table_cache`). Tables are kept in memory of each
+            worker process only by default.
+        `iso834_table_cache_max_size`
+            int, optional, [byte], the least recently used tables are evicted beyond this size, unlimited by default.
         `MCS.mcs_post_per_case`
             A method to post processing results.
             NOTE! This method needs to be re-defined in a child class.
+
+    Progress and throughput (samples per second per worker, ETA and queue depth) are recorded in the `sfeprapy` logger
+    and passed to `MCS.telemetry_callback` upon every completed task, see `MCSTelemetry`.
+
+    `MCS.executor` can be assigned with an opened `MCSExecutor`, which is then shared by all cases and any number of
+    `MCS.run_mcs` calls. A temporary executor is created from `MCS.mcs_config` and closed within `MCS.run_mcs` if
+    undefined.
     """
     DEFAULT_TEMP_FOLDER_NAME = "mcs.out"
     DEFAULT_MCS_OUTPUT_FILE_NAME = "mcs.out.csv"
+    DEFAULT_PROFILE_FILE_NAME = "mcs.out.profile.csv"
+    DEFAULT_CONTROL_VARIATE_FILE_NAME = "mcs.out.control_variate.csv"
     DEFAULT_CONFIG_FILE_NAME = "config.json"
     DEFAULT_CONFIG = dict(n_threads=1)
+    DEFAULT_STREAM_CHUNK_SIZE = 1000
+    DEFAULT_ADAPTIVE_BATCH_SIZE = 1000
+    DEFAULT_CONTROL_VARIATE_FRACTILES = (0.5, 0.8, 0.9)
 
     def __init__(self):
 
@@ -55,10 +600,27 @@ class MCS(ABC):
         self._func_mcs_calc_mp: Callable = None  # multiprocessing version of `MCS._mcs_calc`
         self.__mcs_post: Callable = None
         self.__mcs_out: pd.DataFrame = None
+        self.__mcs_out_dirs: list = None  # directories of streamed results, see `ColumnarSink`
+        self.mcs_convergence: dict = None  # {case name: `FractileConvergence.status`}, adaptive or replicates only
+        self.mcs_seed: int = None  # master seed of the last run, `seed` in `MCS.mcs_config` or drawn from OS entropy
+        self.mcs_profile: pd.DataFrame = None  # stage timings of the last run, see `profile_report`, `profile` only
+        self.mcs_surrogate: dict = None  # {case name: `PolynomialChaosSurrogate.status`}, `surrogate_n_train` only
+        self.mcs_control_variate: pd.DataFrame = None  # fractiles per case, `control_variate_n` only
+        self.executor: MCSExecutor = None  # persistent executor, optional
+        self.telemetry_callback: Callable = None  # called with `MCSTelemetry.status` upon every completed task
 
         # assign default properties
         self.func_mcs_gen = mcs_gen_main
 
+    def __getstate__(self):
+        # bound calculation methods are sent to worker processes with this object, results, the executor and callbacks
+        # are not
+        state = self.__dict__.copy()
+        state['_MCS__mcs_out'] = None
+        state['executor'] = None
+        state['telemetry_callback'] = None
+        return state
+
     @abstractmethod
     def mcs_deterministic_calc(self, *args, **kwargs) -> dict:
         """Placeholder method. The Monte Carlo Simulation deterministic calculation routine.
@@ -73,6 +635,20 @@ class MCS(ABC):
         """
         raise NotImplementedError('This method should be overridden by a child class')
 
+    def mcs_deterministic_calc_batch(self, *args, **kwargs) -> pd.DataFrame:
+        """Placeholder method. The Monte Carlo Simulation deterministic calculation routine for a batch of samples, i.e.
+        takes a DataFrame of sampled parameters and returns a DataFrame of results with one row per sample.
+        :return:
+        """
+        raise NotImplementedError('This method should be overridden by a child class')
+
+    def mcs_deterministic_calc_control(self, *args, **kwargs) -> np.ndarray:
+        """Placeholder method. A cheap model correlated with the deterministic calculation routine, takes a DataFrame
+        of sampled parameters and returns an array of one result per sample, see `control_variate_n`.
+        :return:
+        """
+        raise NotImplementedError('This method should be overridden by a child class')
+
     @property
     def mcs_inputs(self) -> dict:
         return self.__mcs_inputs
@@ -114,7 +690,116 @@ class MCS(ABC):
         if 'cwd' in config:
             self.cwd = config['cwd']
 
-    def run_mcs(self, qt_prog_signal_0=None, qt_prog_signal_1=None):
+    def run_mcs(self, qt_prog_signal_0=None, qt_prog_signal_1=None, resume: bool = False):
+        """Samples and solves all cases.
+
+        :param qt_prog_signal_0: optional, Qt signal to emit case progress.
+        :param qt_prog_signal_1: optional, Qt signal to emit sample progress in percentage.
+        :param resume: to continue from results left in `<cwd>/mcs.out/<case_name>/` by an interrupted run, only samples
+            not completed are solved and the sampled inputs are reused. `stream_out` is implied, `cwd` is required.
+        """
+        steps, pbar = self.__run(resume=resume, is_async=False), None
+        try:
+            res = None
+            while True:
+                try:
+                    kind, obj = steps.send(res)
+                except StopIteration:
+                    break
+                res = obj.result() if kind == 'wait' else None
+                if kind != 'event':
+                    continue
+
+                if obj['event'] == 'case_start':
+                    if qt_prog_signal_0:
+                        qt_prog_signal_0.emit(f'{obj["i_case"] + 1}/{obj["n_cases"]} {obj["case_name"]}')
+                    print("{:<24.24}: {}".format("CASE", obj['case_name']))
+                    print("{:<24.24}: {}".format("NO. OF THREADS", obj['n_threads']))
+                    print("{:<24.24}: {}".format("NO. OF SIMULATIONS", obj['n_simulations']), flush=True)
+                    if obj['cached']:
+                        print("{:<24.24}: {}".format("RESULTS", "loaded from cache"), flush=True)
+                    pbar = tqdm(total=obj['n_simulations'], initial=obj['n_completed'], ncols=60)
+                elif obj['event'] == 'chunk':
+                    pbar.update(obj['n_completed'] - pbar.n)
+                    if qt_prog_signal_1:
+                        qt_prog_signal_1.emit(int(obj['n_completed'] / obj['n_simulations'] * 100))
+                elif obj['event'] == 'case_end':
+                    status = obj['convergence']
+                    if status is not None:
+                        pbar.total = pbar.n  # i.e. converged before all samples are solved
+                        pbar.refresh()
+                    else:
+                        pbar.update(pbar.total - pbar.n)
+                    pbar.close()
+                    if qt_prog_signal_1:
+                        qt_prog_signal_1.emit(100)
+                    if status is not None:
+                        print("{:<24.24}: {}".format("NO. OF SIMULATIONS RUN", status['n_samples']))
+                        print("{:<24.24}: {:.3f} [{:.3f}, {:.3f}] at {:g} confidence, {}".format(
+                            f"FRACTILE {status['fractile']:g}", status['estimate'], status['lower'], status['upper'],
+                            status['confidence'], 'converged' if status['converged'] else 'NOT converged',
+                        ))
+                    if obj.get('control_variate') is not None:
+                        for _, row in obj['control_variate'].iterrows():
+                            print("{:<24.24}: {:.3f} [{:.3f}, {:.3f}], variance reduction {:.2f}".format(
+                                f"FRACTILE {row['fractile']:g} (CONTROL)", row['estimate'], row['lower'],
+                                row['upper'], row['variance_reduction'],
+                            ))
+        finally:
+            # i.e. interrupted, the temporary executor is terminated by `MCS.__run`
+            steps.close()
+            if pbar is not None:
+                pbar.close()
+
+    async def run_async(self, resume: bool = False):
+        """Asynchronous counterpart of `MCS.run_mcs` for embedding in an asyncio application (e.g. a web service).
+        Samples are solved by the executor while the event loop awaits them, no thread is used per run. Events are
+        yielded as dict with key `event` being:
+
+            'case_start'
+                keys `case_name`, `i_case`, `n_cases`, `n_simulations`, `n_threads`, `n_completed` (samples
+                completed by a previous run if resumed) and `cached` (True if results are loaded from `ResultCache`).
+            'chunk'
+                keys `case_name`, `n_completed`, `n_simulations`, `rows` (start, stop), `result`, a DataFrame of the
+                results of the chunk (partial results), and `telemetry`, `MCSTelemetry.status` of the run.
+            'case_end'
+                keys `case_name`, `n_completed`, `n_simulations`, `result`, a DataFrame of all results of the case,
+                `convergence`, `FractileConvergence.status` if adaptive sample size or None, and `control_variate`, a
+                DataFrame of the fractiles corrected by the control variate if `control_variate_n` or None.
+            'end'
+                key `result`, same as `MCS.mcs_out`, or None if streamed (`stream_out`), see `MCS.mcs_out_per_case`.
+
+        Samples are always dispatched in chunks, `chunk_size` defaults to a quarter of the samples of a case per
+        thread if undefined. With the 'serial' executor chunks are solved within the event loop thread.
+
+        Example:
+
+            >>> async for event in mcs.run_async():
+            >>>     if event['event'] == 'chunk':
+            >>>         print(event['case_name'], event['n_completed'], '/', event['n_simulations'])
+
+        :param resume: see `MCS.run_mcs`.
+        """
+        steps = self.__run(resume=resume, is_async=True)
+        try:
+            res = None
+            while True:
+                try:
+                    kind, obj = steps.send(res)
+                except StopIteration:
+                    return
+                res = None
+                if kind == 'wait':
+                    res = await asyncio.wrap_future(obj)
+                else:
+                    yield obj
+        finally:
+            # i.e. cancelled or the consumer stopped early, the temporary executor is terminated by `MCS.__run`
+            steps.close()
+
+    def __run(self, resume: bool, is_async: bool):
+        """Steps of a MCS run shared by `MCS.run_mcs` and `MCS.run_async`. A generator yielding ('wait', future), to
+        be sent back with the result of the future, or ('event', dict), see `MCS.run_async`."""
         # ----------------------------
         # Prepare mcs parameter inputs
         # ----------------------------
@@ -156,7 +841,68 @@ class MCS(ABC):
         # ------------------------------
         # Generate mcs parameter samples
         # ------------------------------
-        x2 = {k: self.func_mcs_gen(v, int(v["n_simulations"])) for k, v in x1.items()}
+        stream_in = bool(self.mcs_config.get('stream_in'))
+        sampler_kwargs = self.__sampler_kwargs()
+        stream_out = bool(resume or stream_in or self.mcs_config.get('stream_out'))
+        if stream_out and self.cwd is None:
+            # i.e. not to write into, or remove results from, the current directory of the process
+            raise ValueError('`cwd` is required to stream results or resume, results are kept in `<cwd>/mcs.out/`')
+        # independent random streams per case, for sampling and for solving each chunk
+        seed = np.random.SeedSequence(self.mcs_config.get('seed'))
+        self.mcs_seed = seed.entropy
+        cache = None
+        if self.mcs_config.get('cache_dir'):
+            if self.mcs_config.get('seed') is None:
+                # i.e. another unseeded run of an unchanged case is not to be served the samples of this run
+                logger.warning('`cache_dir` is ignored as `seed` is undefined, results are not cached')
+            else:
+                cache = ResultCache(self.mcs_config['cache_dir'], self.mcs_config.get('cache_max_size'))
+        cache_keys, cache_hits = dict(), dict()
+        case_seeds = {k: case_seed_sequence(seed, k) for k in x1.keys()}
+        x2, cases_resumed = dict(), set()
+        control_variate_n = self.mcs_config.get('control_variate_n')
+        if control_variate_n and stream_in:
+            raise ValueError('`control_variate_n` is not applicable with `stream_in`')
+        x_control = dict()  # {case name: samples evaluated by the cheap model}, `control_variate_n` only
+
+        def n_control(k_: str) -> int:
+            return max(int(control_variate_n), int(x1[k_]['n_simulations']))
+
+        def sample_control(k_: str) -> pd.DataFrame:
+            # the samples solved by the deterministic calculation are the first `n_simulations` of these
+            if k_ not in x_control:
+                x_control[k_] = self.func_mcs_gen(
+                    x1[k_], n_control(k_), rng=sampler_rng(case_seeds[k_]), **sampler_kwargs).reset_index(drop=True)
+            return x_control[k_]
+
+        for k, v in x1.items():
+            if cache is not None:
+                cache_keys[k] = self.__case_key(v)
+                cache_hits[k] = cache.get(cache_keys[k])
+                if cache_hits[k] is not None and (cache_hits[k][1] or dict()).get('seed') != self.mcs_seed:
+                    cache_hits[k] = None  # i.e. not stored with the seed the results are sampled with
+                if cache_hits[k] is not None:
+                    continue  # i.e. unchanged since a previous run, not sampled
+            if resume:
+                # sampled inputs are reused so results already completed remain valid
+                x2[k] = ColumnarSink.load_inputs(self.__mcs_out_dir(k), x_raw=v)
+                if x2[k] is not None and control_variate_n:
+                    # samples of the cheap model are saved in place of the sampled inputs, so results completed
+                    # before are paired with the same controls even if the seed is drawn anew
+                    if len(x2[k].index) < n_control(k):
+                        x2[k] = None  # i.e. saved without `control_variate_n`, sampled anew
+                    else:
+                        x_control[k] = x2[k].iloc[:n_control(k)]
+                        x2[k] = x_control[k].iloc[:int(v["n_simulations"])]
+                if x2[k] is not None:
+                    cases_resumed.add(k)
+                    continue
+            if stream_in:
+                x2[k] = StratifiedSampler(v, int(v["n_simulations"]), seed=case_seeds[k], **sampler_kwargs)
+            elif control_variate_n:
+                x2[k] = sample_control(k).iloc[:int(v["n_simulations"])]
+            else:
+                x2[k] = self.func_mcs_gen(v, int(v["n_simulations"]), rng=sampler_rng(case_seeds[k]), **sampler_kwargs)
 
         # ------------------
         # Run mcs simulation
@@ -167,36 +913,218 @@ class MCS(ABC):
         #   'case_2': df2
         # }
 
-        m, p = mp.Manager(), mp.Pool(self.mcs_config["n_threads"], maxtasksperchild=1000)
-        for k, v in x2.items():
-            if qt_prog_signal_0:
-                qt_prog_signal_0.emit(f'{len(x3) + 1}/{len(x1)} {k}')
-
-            x3_ = self.__mcs_mp(
-                self.mcs_deterministic_calc,
-                self.mcs_deterministic_calc_mp,
-                x=v,
-                n_threads=self.mcs_config["n_threads"],
-                m=m,
-                p=p,
-                qt_prog_signal_1=qt_prog_signal_1
-            )
+        if self.executor is not None and self.executor.is_open:
+            executor, is_temporary_executor = self.executor, False
+        else:
+            executor, is_temporary_executor = self.__make_executor().open(), True
+
+        self.__mcs_out, self.__mcs_out_dirs = None, list() if stream_out else None
+        n_replicates = sampler_kwargs.get('n_replicates', 1)
+        self.mcs_convergence = dict() if self.mcs_config.get('adaptive_tolerance') or n_replicates > 1 else None
+        n_prefetch = self.mcs_config.get('prefetch_cases')
+        is_profile = bool(self.mcs_config.get('profile'))
+        surrogate_n_train = self.mcs_config.get('surrogate_n_train')
+        self.mcs_surrogate = dict() if surrogate_n_train else None
+        self.mcs_control_variate, control_variates = None, list()
+        self.mcs_profile, profiles = None, dict()
+        cases = list()
+        telemetry = MCSTelemetry(
+            0, callback=self.telemetry_callback,
+            queue_depth=lambda: sum(case_.n_queued for case_ in cases if isinstance(case_, _MCSCase)),
+        )
+        try:
+            for k in x1.keys():
+                v = x2.get(k)
+                if stream_out:
+                    sink = ColumnarSink(self.__mcs_out_dir(k), resume=k in cases_resumed)
+                    if v is not None and k not in cases_resumed:
+                        sink.save_inputs(x_control[k] if control_variate_n else v, x_raw=x1[k])
+                    self.__mcs_out_dirs.append(sink.dir_path)
+                else:
+                    sink = None
 
-            # Post process output upon completion per case
-            if self.mcs_post_per_case:
-                self.mcs_post_per_case(df=x3_)
-            x3[k] = copy.copy(x3_)
+                if self.mcs_convergence is not None:
+                    convergence = FractileConvergence(
+                        fractile=self.mcs_config.get('adaptive_fractile', 0.8),
+                        tolerance=self.mcs_config.get('adaptive_tolerance') or np.inf,
+                        confidence=self.mcs_config.get('adaptive_confidence', 0.95),
+                    )
+                    # i.e. all samples in one batch if only the interval of replicates is sought
+                    batch_size = int(
+                        self.mcs_config.get('adaptive_batch_size') or self.DEFAULT_ADAPTIVE_BATCH_SIZE
+                    ) if self.mcs_config.get('adaptive_tolerance') else None
+                else:
+                    convergence, batch_size = None, None
 
-        p.close()
-        p.join()
+                if v is None:
+                    df, status = cache_hits[k]
+                    if convergence is not None:
+                        convergence.status = status['convergence']
+                    cases.append(_MCSCachedCase(k, int(x1[k]['n_simulations']), df, sink, convergence))
+                    continue
+
+                telemetry.n_total += len(v) - (len(sink) if sink is not None else 0)
+                cases.append(_MCSCase(
+                    self.mcs_deterministic_calc,
+                    x=v,
+                    executor=executor,
+                    func_batch=self.mcs_deterministic_calc_batch if self.mcs_config.get('batch') else None,
+                    chunk_size=self.mcs_config.get('chunk_size') or (
+                        int(np.ceil(batch_size / executor.n_threads)) if batch_size else
+                        self.DEFAULT_STREAM_CHUNK_SIZE if sink is not None else
+                        int(np.ceil(len(v) / (4 * executor.n_threads))) if is_async else None
+                    ),
+                    sink=sink,
+                    convergence=convergence,
+                    batch_size=batch_size,
+                    n_replicates=n_replicates if n_replicates > 1 else None,
+                    surrogate=PolynomialChaosSurrogate(
+                        degree=int(self.mcs_config.get('surrogate_degree') or 3),
+                        tolerance=float(self.mcs_config.get('surrogate_tolerance') or 180.),
+                    ) if surrogate_n_train else None,
+                    surrogate_n_train=int(surrogate_n_train) if surrogate_n_train else None,
+                    seed=case_seeds[k],
+                    telemetry=telemetry,
+                    profile=is_profile,
+                ))
+
+            for i_case, case in enumerate(cases):
+                # tasks of the following cases are queued behind the current case, i.e. no idle workers in between
+                for case_ in cases[i_case:len(cases) if n_prefetch is None else i_case + 1 + int(n_prefetch)]:
+                    case_.submit()
+
+                k, sink, convergence = case.case_name, case.sink, case.convergence
+                is_cached = isinstance(case, _MCSCachedCase)
+                yield 'event', dict(
+                    event='case_start', case_name=k, i_case=i_case, n_cases=len(cases),
+                    n_simulations=case.n_simulations, n_threads=executor.n_threads,
+                    n_completed=len(sink) if sink is not None else 0, cached=is_cached,
+                )
+
+                x3_ = yield from case.collect()
+                case.close()
+                if case.profile is not None:
+                    profiles[k] = case.profile
+                if cache is not None and not is_cached:
+                    cache.put(cache_keys[k], x3_, status=dict(
+                        seed=self.mcs_seed, convergence=convergence.status if convergence is not None else None))
+
+                if convergence is not None:
+                    self.mcs_convergence[k] = convergence.status
+                if getattr(case, 'surrogate', None) is not None:
+                    self.mcs_surrogate[k] = case.surrogate.status
+                control_variate = self.__control_variate(x3_, sample_control(k)) if control_variate_n else None
+                if control_variate is not None:
+                    control_variates.append(control_variate.assign(case_name=k))
+                yield 'event', dict(
+                    event='case_end', case_name=k, n_completed=len(x3_.index), n_simulations=case.n_simulations,
+                    result=x3_, convergence=convergence.status if convergence is not None else None,
+                    control_variate=control_variate,
+                )
+
+                # Post process output upon completion per case
+                if self.mcs_post_per_case:
+                    self.mcs_post_per_case(df=x3_)
+                if sink is None:
+                    x3[k] = copy.copy(x3_)
+        except BaseException:
+            # i.e. interrupted or closed before completion, outstanding tasks are discarded, streamed results are kept
+            # to be resumed
+            if is_temporary_executor:
+                executor.close(terminate=True)
+            raise
+        finally:
+            for case in cases:
+                case.close()
+        if is_temporary_executor:
+            executor.close()
 
         # ------------
         # Pack results
         # ------------
-        self.__mcs_out = pd.concat([v for v in x3.values()])
+        if self.__mcs_out_dirs is None:
+            self.__mcs_out = pd.concat([v for v in x3.values()])
+
+        # Post process output upon completion of all cases, streamed results are not loaded, i.e. None
+        mcs_out = self.__mcs_out
+        self.mcs_post_all_cases(mcs_out)
+        if is_profile:
+            self.mcs_profile = profile_report(profiles)
+            if self.cwd is not None:
+                self.mcs_profile.to_csv(os.path.join(self.cwd, self.DEFAULT_PROFILE_FILE_NAME), index=False)
+        if control_variate_n:
+            self.mcs_control_variate = pd.concat(control_variates, ignore_index=True)
+            self.mcs_control_variate = self.mcs_control_variate[
+                ['case_name'] + [k for k in self.mcs_control_variate.columns if k != 'case_name']]
+            if self.cwd is not None:
+                self.mcs_control_variate.to_csv(
+                    os.path.join(self.cwd, self.DEFAULT_CONTROL_VARIATE_FILE_NAME), index=False)
+        yield 'event', dict(event='end', result=mcs_out)
 
-        # Post process output upon completion of all cases
-        self.mcs_post_all_cases(self.__mcs_out)
+    def __control_variate(self, res: pd.DataFrame, x: pd.DataFrame) -> pd.DataFrame:
+        """Fractiles of the results `res` of a case corrected by `MCS.mcs_deterministic_calc_control` of all its
+        samples `x`, one row per fractile of `control_variate_fractiles`, see `control_variate_n`."""
+        fractiles = self.mcs_config.get('control_variate_fractiles') or self.DEFAULT_CONTROL_VARIATE_FRACTILES
+        confidence = self.mcs_config.get('control_variate_confidence', 0.95)
+        c_all = np.asarray(self.mcs_deterministic_calc_control(x), dtype=float)
+        y = res['solver_time_equivalence_solved'].to_numpy(dtype=float)
+        c = c_all[res['index'].to_numpy(dtype=int)]  # i.e. in the order of results
+        w, w_all = None, None
+        if 'sample_weight' in x and np.any(x['sample_weight'].values != 1):
+            w, w_all = x['sample_weight'].values[res['index'].to_numpy(dtype=int)], x['sample_weight'].values
+        is_finite = np.isfinite(y) & np.isfinite(c)
+
+        rows = list()
+        for fractile in fractiles:
+            estimate, lower, upper, variance_reduction = control_variate_fractile_interval(
+                y, c, c_all, fractile, confidence, w=w, w_all=w_all)
+            estimate_, lower_, upper_ = fractile_confidence_interval(y, fractile, confidence, w=w)
+            rows.append(dict(
+                fractile=fractile, confidence=confidence, n_samples=len(y), n_control=len(c_all),
+                correlation=np.corrcoef(y[is_finite], c[is_finite])[0, 1] if np.sum(is_finite) > 1 else np.nan,
+                estimate=estimate, lower=lower, upper=upper, variance_reduction=variance_reduction,
+                estimate_plain=estimate_, lower_plain=lower_, upper_plain=upper_,
+            ))
+        return pd.DataFrame(rows)
+
+    def __make_executor(self) -> MCSExecutor:
+        n_threads = self.mcs_config["n_threads"]
+        name = self.mcs_config.get('executor') or ('serial' if n_threads == 1 else 'process')
+        kwargs = dict()
+        if name == 'process':
+            kwargs.update(preload=[type(self).__module__], maxtasksperchild=1000)
+        elif name == 'futures':
+            kwargs.update(preload=[type(self).__module__])
+        kwargs.update(self.mcs_config.get('executor_kwargs') or dict())
+        return make_executor(name, n_threads, **kwargs)
+
+    def __case_key(self, x_raw: dict) -> str:
+        """`ResultCache` key of a case, anything the results depend on other than the samples being solved."""
+        config = {
+            k: v for k, v in self.mcs_config.items()
+            if k.startswith('adaptive_') or k.startswith('surrogate_') or k.startswith('control_variate_')
+            or k == 'iso834_table'
+        }
+        if self.mcs_config.get('stream_in'):
+            config['stream_in'] = True  # samples in a different order
+        config.update(self.__sampler_kwargs())
+        return case_key(
+            x_raw, calc=f'{type(self).__module__}.{type(self).__qualname__}', version=__version__, config=config,
+            seed=self.mcs_config.get('seed'),
+        )
+
+    def __sampler_kwargs(self) -> dict:
+        """Keyword arguments of `func_mcs_gen` and `StratifiedSampler` from `sampler` items of `MCS.mcs_config`."""
+        sampler = self.mcs_config.get('sampler') or 'random'
+        if sampler == 'random':
+            return dict()
+        return dict(
+            sampler=sampler, n_replicates=int(self.mcs_config.get('sampler_replicates') or 1),
+            scramble=bool(self.mcs_config.get('sampler_scramble', True)),
+        )
+
+    def __mcs_out_dir(self, case_name: str) -> str:
+        return os.path.join(self.cwd, self.DEFAULT_TEMP_FOLDER_NAME, case_name)
 
     @abstractmethod
     def mcs_post_per_case(self, *arg, **kwargs):
@@ -208,55 +1136,35 @@ class MCS(ABC):
     @abstractmethod
     def mcs_post_all_cases(self, *args, **kwargs):
         """
-        This method will be called upon completion of all cases
+        This method will be called upon completion of all cases, with `MCS.mcs_out`, or None if streamed in which case
+        results are to be read one case at a time with `MCS.mcs_out_per_case` rather than all at once
         """
         raise NotImplementedError('This method should be overridden by a child class')
 
     @property
-    def mcs_out(self):
+    def mcs_out(self) -> pd.DataFrame:
+        if self.__mcs_out is None and self.__mcs_out_dirs:
+            # streamed results are loaded from disk every time, they are not kept in memory
+            return pd.concat(list(self.mcs_out_per_case()))
         return self.__mcs_out
 
-    @staticmethod
-    def __mcs_mp(func, func_mp, x: pd.DataFrame, n_threads: int, m, p, qt_prog_signal_1=None) -> pd.DataFrame:
-        list_mcs_in = x.to_dict(orient="records")
-
-        time.sleep(0.5)  # to avoid clashes between the prints and progress bar
-        print("{:<24.24}: {}".format("CASE", list_mcs_in[0]["case_name"]))
-        print("{:<24.24}: {}".format("NO. OF THREADS", n_threads))
-        print("{:<24.24}: {}".format("NO. OF SIMULATIONS", len(x.index)))
-        time.sleep(0.5)  # to avoid clashes between the prints and progress bar
+    def mcs_out_per_case(self, columns: list = None) -> Iterator[pd.DataFrame]:
+        """Results of each case in turn, the same as `MCS.mcs_out` but one case at a time. Streamed results are loaded
+        from disk per case and only `columns`, so results of all cases are never held in memory at once.
 
-        n_simulations = len(list_mcs_in)
-        if n_threads == 1 or func_mp is None:
-            mcs_out = list()
-            j = 0
-            for i in tqdm(list_mcs_in, ncols=60):
-                mcs_out.append(func(**i))
-                j += 1
-                if qt_prog_signal_1:
-                    qt_prog_signal_1.emit(int(j / n_simulations * 100))
-        else:
-
-            q = m.Queue()
-            jobs = p.map_async(func_mp, [(dict_, q) for dict_ in list_mcs_in])
-            with tqdm(total=n_simulations, ncols=60) as pbar:
-                while True:
-                    if jobs.ready():
-                        if n_simulations > pbar.n:
-                            pbar.update(n_simulations - pbar.n)
-                            if qt_prog_signal_1:
-                                qt_prog_signal_1.emit(100)
-                        break
-                    else:
-                        if q.qsize() - pbar.n > 0:
-                            pbar.update(q.qsize() - pbar.n)
-                            if qt_prog_signal_1:
-                                qt_prog_signal_1.emit(int(q.qsize() / n_simulations * 100))
-                        time.sleep(1)
-            mcs_out = jobs.get()
-            time.sleep(0.5)
+        :param columns: column names to be loaded, all columns if undefined. Those not in the results are omitted.
+        """
+        if self.__mcs_out_dirs:
+            for dir_path in self.__mcs_out_dirs:
+                df = read_columnar(dir_path, columns=columns)
+                if columns is not None:
+                    df = df[[k for k in columns if k in df]]
+                if 'solver_time_equivalence_solved' in df:
+                    df = df.sort_values('solver_time_equivalence_solved')
+                yield df
+        elif self.__mcs_out is not None:
+            columns_ = list(self.__mcs_out.columns) if columns is None else [
+                k for k in columns if k in self.__mcs_out]
+            for _, df in self.__mcs_out.groupby('case_name', sort=False):
+                yield df[columns_]
 
-        # clean and convert results to dataframe and return
-        df_mcs_out = pd.DataFrame(mcs_out)
-        df_mcs_out.sort_values("solver_time_equivalence_solved", inplace=True)  # sort base on time equivalence
-        return df_mcs_out
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+from sfeprapy.func.mcs_gen import dict_flatten
+from sfeprapy.func.mcs_sink import ColumnarSink, read_columnar
+
+
+def case_key(x_raw: dict, **kwargs) -> str:
+    """Stable hash of the stochastic definition of a case.
+
+    :param x_raw: stochastic inputs of a case, i.e. one column of the input file, two levels dict or flattened.
+    :param kwargs: anything else the results depend on, e.g. the calculation routine, sfeprapy version, seed and
+        configuration items. Values are to be JSON serialisable or are converted to str.
+    :return: hex digest.
+    """
+    content = dict(inputs=dict_flatten(x_raw), **kwargs)
+    content = json.dumps(content, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Local content-addressed store of case results, one `ColumnarSink` directory per entry named after its key, see
+    `case_key`. The least recently used entries are evicted once the total size exceeds `max_size`.
+
+    Example:
+
+        >>> cache = ResultCache('~/.sfeprapy/cache', max_size=2 ** 30)
+        >>> key = case_key(x_raw, version=sfeprapy.__version__)
+        >>> df = cache.get(key)
+        >>> if df is None:
+        >>>     df = solve(x_raw)
+        >>>     cache.put(key, df)
+
+    :param dir_path: cache directory, created if not exist.
+    :param max_size: [byte], maximum total size of the entries, unlimited if undefined.
+    """
+    STATUS_FILE_NAME = 'status.json'
+
+    def __init__(self, dir_path: str, max_size: int = None):
+        self.dir_path = os.path.realpath(os.path.expanduser(dir_path))
+        self.max_size = max_size
+        os.makedirs(self.dir_path, exist_ok=True)
+
+    def __entry_dir(self, key: str) -> str:
+        return os.path.join(self.dir_path, key)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.isfile(os.path.join(self.__entry_dir(key), ColumnarSink.META_FILE_NAME))
+
+    def get(self, key: str):
+        """Returns (DataFrame, status) of a stored entry, or None if not stored. `status` is the dict saved with the
+        entry or None."""
+        dir_path = self.__entry_dir(key)
+        try:
+            df = read_columnar(dir_path, mmap_mode=None)
+        except (FileNotFoundError, ValueError):
+            return None  # i.e. not stored or evicted meanwhile
+        try:
+            with open(os.path.join(dir_path, self.STATUS_FILE_NAME), 'r') as f:
+                status = json.load(f)
+        except FileNotFoundError:
+            status = None
+        try:
+            os.utime(dir_path)  # last access time used for eviction
+        except FileNotFoundError:
+            pass
+        return df, status
+
+    def put(self, key: str, df: pd.DataFrame, status: dict = None):
+        """Stores `df` and an optional JSON serialisable `status` under `key`, then evicts the least recently used
+        entries if `max_size` is exceeded."""
+        dir_path = self.__entry_dir(key)
+        # written into a temporary directory and moved into place, so a partial entry is never read
+        dir_path_temp = f'{dir_path}.{os.getpid()}.tmp'
+        shutil.rmtree(dir_path_temp, ignore_errors=True)
+        sink = ColumnarSink(dir_path_temp)
+        sink.append(df.reset_index(drop=True))
+        if status is not None:
+            with open(os.path.join(dir_path_temp, self.STATUS_FILE_NAME), 'w') as f:
+                json.dump(status, f, default=float)
+        shutil.rmtree(dir_path, ignore_errors=True)
+        try:
+            os.rename(dir_path_temp, dir_path)
+        except OSError:
+            # i.e. stored by another process meanwhile
+            shutil.rmtree(dir_path_temp, ignore_errors=True)
+        self.evict()
+
+    def size(self) -> int:
+        """[byte], total size of all entries."""
+        return sum(size for _, _, size in self.__entries())
+
+    def __entries(self) -> list:
+        entries = list()
+        for name in os.listdir(self.dir_path):
+            dir_path = os.path.join(self.dir_path, name)
+            if name.endswith('.tmp') or not os.path.isdir(dir_path):
+                continue
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(dir_path))
+                entries.append((os.stat(dir_path).st_mtime, dir_path, size))
+            except FileNotFoundError:
+                pass  # i.e. evicted by another process
+        return entries
+
+    def evict(self):
+        """Removes the least recently used entries until the total size is within `max_size`."""
+        if self.max_size is None:
+            return
+        entries = sorted(self.__entries())
+        size = sum(size_ for _, _, size_ in entries)
+        for _, dir_path, size_ in entries:
+            if size <= self.max_size:
+                break
+            shutil.rmtree(dir_path, ignore_errors=True)
+            size -= size_
+
+    def clear(self):
+        shutil.rmtree(self.dir_path, ignore_errors=True)
+        os.makedirs(self.dir_path, exist_ok=True)
+
+
+def _test_result_cache():
+    import tempfile
+
+    x_raw = dict(case_name='case_1', n_simulations=10, q_fd=dict(dist='gumbel_r_', mean=420, sd=126))
+    key = case_key(x_raw, version='0.0.0')
+    # key is stable and changes with any input
+    assert key == case_key(dict(reversed(list(x_raw.items()))), version='0.0.0')
+    assert key != case_key(dict(x_raw, q_fd=dict(dist='gumbel_r_', mean=421, sd=126)), version='0.0.0')
+    assert key != case_key(x_raw, version='0.0.1')
+
+    df = pd.DataFrame(dict(case_name=['case_1'] * 10, index=range(10), a=[float(i) for i in range(10)]))
+    with tempfile.TemporaryDirectory() as dir_work:
+        cache = ResultCache(dir_work)
+        assert cache.get(key) is None
+        cache.put(key, df, status=dict(converged=True))
+        assert key in cache
+        df_, status = cache.get(key)
+        assert list(df_['case_name']) == list(df['case_name']) and list(df_['a']) == list(df['a'])
+        assert status == dict(converged=True)
+
+        # least recently used entries are evicted once over the size limit
+        size = cache.size()
+        cache.max_size = int(size * 2.5)
+        keys = [case_key(x_raw, version=str(i)) for i in range(3)]
+        for key_ in keys:
+            time.sleep(0.01)  # distinct access times
+            cache.put(key_, df)
+            time.sleep(0.01)
+            cache.get(key)  # keeps the first entry in use
+        assert key in cache
+        assert keys[0] not in cache and keys[1] not in cache and keys[2] in cache
+        assert cache.size() <= cache.max_size
+
+
+if __name__ == '__main__':
+    _test_result_cache()
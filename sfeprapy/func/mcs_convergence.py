@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from scipy.stats import norm, t
+
+
+def fractile_confidence_interval(
+        x: np.ndarray, fractile: float, confidence: float = 0.95, w: np.ndarray = None
+) -> tuple:
+    """Distribution free confidence interval of a fractile, based on order statistics with normal approximation of the
+    binomial distribution of the number of samples below the fractile.
+
+    :param x: samples, nan is ignored, -inf and inf are valid values.
+    :param fractile: fractile of interest, 0 < fractile < 1, e.g. 0.8 for CDF 0.8.
+    :param confidence: confidence level of the interval.
+    :param w: optional, importance sampling weights of `x` (i.e. `sample_weight`), see
+        `weighted_fractile_confidence_interval`.
+    :return estimate: sample fractile.
+    :return lower: lower bound of the confidence interval, -inf if too few samples.
+    :return upper: upper bound of the confidence interval, inf if too few samples.
+    """
+    if w is not None:
+        return weighted_fractile_confidence_interval(x, w, fractile, confidence)
+
+    x = np.sort(np.asarray(x, dtype=float)[~np.isnan(x)])
+    n = len(x)
+    if n == 0:
+        return np.nan, -np.inf, np.inf
+
+    z = norm.ppf(0.5 + confidence / 2)
+    i_lower = int(np.floor(n * fractile - z * np.sqrt(n * fractile * (1 - fractile)))) - 1
+    i_upper = int(np.ceil(n * fractile + z * np.sqrt(n * fractile * (1 - fractile))))
+
+    estimate = x[min(max(int(np.ceil(n * fractile)) - 1, 0), n - 1)]
+    lower = x[i_lower] if i_lower >= 0 else -np.inf
+    upper = x[i_upper] if i_upper < n else np.inf
+    return estimate, lower, upper
+
+
+def weighted_fractile_confidence_interval(
+        x: np.ndarray, w: np.ndarray, fractile: float, confidence: float = 0.95
+) -> tuple:
+    """Counterpart of `fractile_confidence_interval` for weighted samples, i.e. importance sampling. The fractile is
+    read from the self-normalised weighted CDF and the interval from the CDF level +/- z times the standard error of the
+    weighted CDF at the fractile, sqrt(sum(w_i^2 (1[x_i <= estimate] - fractile)^2)) with normalised weights.
+
+    :param x: samples, nan is ignored, -inf and inf are valid values.
+    :param w: weights of `x`.
+    :param fractile: fractile of interest, 0 < fractile < 1.
+    :param confidence: confidence level of the interval.
+    :return: estimate, lower, upper, see `fractile_confidence_interval`.
+    """
+    x, w = np.asarray(x, dtype=float), np.asarray(w, dtype=float)
+    x, w = x[~np.isnan(x)], w[~np.isnan(x)]
+    if len(x) == 0 or not np.sum(w) > 0:
+        return np.nan, -np.inf, np.inf
+    i = np.argsort(x, kind='stable')
+    x, w = x[i], w[i] / np.sum(w)
+    cdf = np.cumsum(w)
+
+    def quantile(q: float) -> float:
+        if q <= 0:
+            return -np.inf
+        if q > cdf[-1] - 1e-12:
+            return np.inf
+        return x[min(int(np.searchsorted(cdf, q)), len(x) - 1)]
+
+    estimate = x[min(int(np.searchsorted(cdf, fractile - 1e-12)), len(x) - 1)]
+    se = np.sqrt(np.sum(w ** 2 * ((x <= estimate) - fractile) ** 2))
+    z = norm.ppf(0.5 + confidence / 2)
+    return estimate, quantile(fractile - z * se), quantile(fractile + z * se)
+
+
+def replicate_fractile_interval(
+        x: np.ndarray, replicate: np.ndarray, fractile: float, confidence: float = 0.95, w: np.ndarray = None
+) -> tuple:
+    """Confidence interval of a fractile from independent replicates, i.e. randomised quasi-Monte Carlo where every
+    replicate is an independently scrambled point set (see `mcs_gen.qmc_points`). The fractile is estimated in each
+    replicate alone and the interval is the mean of the estimates +/- Student's t times their standard error, which
+    captures the faster convergence of low discrepancy points the binomial interval of `fractile_confidence_interval`
+    does not.
+
+    :param x: samples, nan is ignored.
+    :param replicate: int array, replicate of each sample.
+    :param fractile: fractile of interest, 0 < fractile < 1.
+    :param confidence: confidence level of the interval.
+    :param w: optional, importance sampling weights of `x`.
+    :return: estimate, lower, upper, see `fractile_confidence_interval`. Interval is unbounded with fewer than two
+        replicates.
+    """
+    x, replicate = np.asarray(x, dtype=float), np.asarray(replicate)
+    estimates = list()
+    for r in np.unique(replicate):
+        x_ = x[replicate == r]
+        if np.all(np.isnan(x_)):
+            continue
+        estimates.append(fractile_confidence_interval(
+            x_, fractile, confidence, w=None if w is None else np.asarray(w, dtype=float)[replicate == r]
+        )[0])
+    estimates = np.asarray(estimates, dtype=float)
+    if len(estimates) == 0:
+        return np.nan, -np.inf, np.inf
+    estimate = np.mean(estimates)
+    if len(estimates) < 2 or not np.all(np.isfinite(estimates)):
+        return estimate, -np.inf, np.inf
+    se = np.std(estimates, ddof=1) / np.sqrt(len(estimates))
+    z = t.ppf(0.5 + confidence / 2, len(estimates) - 1)
+    return estimate, estimate - z * se, estimate + z * se
+
+
+def effective_sample_size(w: np.ndarray) -> float:
+    """Kish effective sample size of weighted samples, (sum w)^2 / sum(w^2), i.e. the number of unweighted samples of
+    equal precision."""
+    w = np.asarray(w, dtype=float)
+    return float(np.sum(w) ** 2 / np.sum(w ** 2)) if len(w) > 0 else 0.
+
+
+def control_variate_fractile_interval(
+        x: np.ndarray, c: np.ndarray, c_all: np.ndarray, fractile: float, confidence: float = 0.95,
+        w: np.ndarray = None, w_all: np.ndarray = None,
+) -> tuple:
+    """Fractile of `x` and its confidence interval with a control variate (multi-fidelity estimate), i.e. the results
+    `c` of a cheap model correlated with `x` evaluated for the same samples and also for many more samples, `c_all`.
+
+    The control is the indicator of `c` below its `fractile` of `c_all`. The CDF of `x` is corrected by beta times the
+    difference between the control CDF of the samples of `x` and of `c_all`, where beta = cov / var of the indicators of
+    `x` below its fractile and of the control. The fractile is then read from the CDF of `x` at the corrected level and
+    the interval from the level +/- z times the standard error of the corrected CDF. The samples of `x` are assumed to
+    be a part of the samples of `c_all` (nested), the variance reduction factor is 1 / (1 - (1 - n / N) rho^2), rho
+    being the correlation of the indicators and n and N the (effective) numbers of samples.
+
+    :param x: results of the full model, nan is ignored, -inf and inf are valid values.
+    :param c: results of the cheap model for the samples of `x`, nan is treated as inf (consistently with `c_all`).
+    :param c_all: results of the cheap model for all samples.
+    :param fractile: fractile of interest, 0 < fractile < 1.
+    :param confidence: confidence level of the interval.
+    :param w: optional, importance sampling weights of `x`.
+    :param w_all: optional, importance sampling weights of `c_all`.
+    :return estimate: fractile estimate.
+    :return lower: lower bound of the confidence interval.
+    :return upper: upper bound of the confidence interval.
+    :return variance_reduction: variance of the sample fractile of `x` alone over variance of the estimate, i.e. the
+        factor of full model samples saved.
+    """
+    x, c, c_all = np.asarray(x, dtype=float), np.asarray(c, dtype=float), np.asarray(c_all, dtype=float)
+    w = np.ones_like(x) if w is None else np.asarray(w, dtype=float)
+    w_all = np.ones_like(c_all) if w_all is None else np.asarray(w_all, dtype=float)
+    is_valid = ~np.isnan(x)
+    x, c, w = x[is_valid], np.where(np.isnan(c[is_valid]), np.inf, c[is_valid]), w[is_valid]
+    c_all = np.where(np.isnan(c_all), np.inf, c_all)
+    if len(x) == 0 or not np.sum(w) > 0 or len(c_all) == 0:
+        return np.nan, -np.inf, np.inf, np.nan
+
+    # control, fractile of the cheap model from all samples
+    c_fractile = weighted_fractile_confidence_interval(c_all, w_all, fractile)[0]
+    i_c = (c <= c_fractile).astype(float)
+    g = np.sum(w_all * (c_all <= c_fractile)) / np.sum(w_all)
+
+    i = np.argsort(x, kind='stable')
+    x, w_ = x[i], w[i] / np.sum(w)
+    i_c = i_c[i]
+    cdf = np.cumsum(w_)
+
+    def quantile(q: float) -> float:
+        if q <= 0:
+            return -np.inf
+        if q > cdf[-1] - 1e-12:
+            return np.inf
+        return x[min(int(np.searchsorted(cdf, q - 1e-12)), len(x) - 1)]
+
+    i_x = (x <= quantile(fractile)).astype(float)
+    mean_x, mean_c = np.sum(w_ * i_x), np.sum(w_ * i_c)
+    var_x, var_c = np.sum(w_ * (i_x - mean_x) ** 2), np.sum(w_ * (i_c - mean_c) ** 2)
+    cov = np.sum(w_ * (i_x - mean_x) * (i_c - mean_c))
+    beta = cov / var_c if var_c > 0 else 0.
+
+    n, n_all = effective_sample_size(w), effective_sample_size(w_all)
+    share = max(1 - n / n_all, 0.)  # share of `c_all` beyond the samples of `x`
+    var = max(var_x - 2 * beta * share * cov + beta ** 2 * share * var_c, 0.)
+    variance_reduction = var_x / var if var > 0 else (1. if var_x == 0 else np.inf)
+    se = np.sqrt(var / n)
+
+    level = fractile + beta * (mean_c - g)
+    z = norm.ppf(0.5 + confidence / 2)
+    return quantile(level), quantile(level - z * se), quantile(level + z * se), variance_reduction
+
+
+class FractileConvergence:
+    """Convergence criterion for adaptive sample size, converged once the confidence interval of a fractile is narrower
+    than `tolerance`. Called with all results obtained so far and the last evaluation is kept in
+    `FractileConvergence.status`.
+
+    :param fractile: fractile of interest, e.g. 0.8.
+    :param tolerance: maximum width of the confidence interval, in the unit of the results.
+    :param confidence: confidence level of the interval.
+    """
+
+    def __init__(self, fractile: float = 0.8, tolerance: float = 120., confidence: float = 0.95):
+        self.fractile = fractile
+        self.tolerance = tolerance
+        self.confidence = confidence
+        self.status: dict = None
+
+    def __call__(self, x: np.ndarray, w: np.ndarray = None, replicate: np.ndarray = None) -> bool:
+        """:param x: all results obtained so far.
+        :param w: optional, importance sampling weights of `x`.
+        :param replicate: optional, replicate of each of `x`, see `replicate_fractile_interval`.
+        """
+        if replicate is not None:
+            estimate, lower, upper = replicate_fractile_interval(x, replicate, self.fractile, self.confidence, w=w)
+        else:
+            estimate, lower, upper = fractile_confidence_interval(x, self.fractile, self.confidence, w=w)
+        with np.errstate(invalid='ignore'):
+            width = upper - lower
+        converged = bool(width <= self.tolerance)
+        self.status = dict(
+            n_samples=len(x), fractile=self.fractile, confidence=self.confidence, estimate=estimate, lower=lower,
+            upper=upper, width=width, tolerance=self.tolerance, converged=converged,
+            n_effective=effective_sample_size(w) if w is not None else len(x),
+            n_replicates=len(np.unique(replicate)) if replicate is not None else None,
+        )
+        return converged
+
+
+def _test_fractile_confidence_interval():
+    np.random.seed(0)
+    x = np.random.normal(loc=0, scale=1, size=20000)
+    x_ = norm.ppf(0.8)
+
+    estimate, lower, upper = fractile_confidence_interval(x, 0.8)
+    assert lower < x_ < upper
+    assert abs(estimate - x_) < 0.05
+
+    # coverage of the 95% confidence interval
+    n_covered = 0
+    for i in range(400):
+        estimate, lower, upper = fractile_confidence_interval(np.random.normal(size=500), 0.8)
+        n_covered += lower <= x_ <= upper
+    assert 0.9 < n_covered / 400 < 0.99
+
+    # too few samples
+    assert fractile_confidence_interval(x[:3], 0.8)[2] == np.inf
+
+    convergence = FractileConvergence(0.8, tolerance=0.1)
+    assert not convergence(x[:100])
+    assert convergence(x)
+    assert convergence.status['converged'] and convergence.status['width'] <= 0.1
+
+
+def _test_weighted_fractile_confidence_interval():
+    np.random.seed(0)
+    x = np.random.normal(loc=0, scale=1, size=20000)
+
+    # equal weights, same as unweighted
+    estimate, lower, upper = fractile_confidence_interval(x, 0.8)
+    estimate_, lower_, upper_ = fractile_confidence_interval(x, 0.8, w=np.full_like(x, 2.))
+    assert estimate == estimate_ and abs(lower - lower_) < 0.01 and abs(upper - upper_) < 0.01
+    assert effective_sample_size(np.full_like(x, 2.)) == len(x)
+
+    # importance sampling of the upper tail, CDF points tilted towards 1 (see `mcs_gen.stratified_weights`) with
+    # likelihood ratio weights, interval as narrow as three times as many unweighted samples
+    x_, bias = norm.ppf(0.99), 5
+    n_covered, widths, widths_ = 0, list(), list()
+    for i in range(200):
+        u = np.log1p(np.random.uniform(size=500) * np.expm1(bias)) / bias
+        y, w = norm.ppf(u), np.expm1(bias) / (bias * np.exp(bias * u))
+        estimate, lower, upper = fractile_confidence_interval(y, 0.99, w=w)
+        n_covered += lower <= x_ <= upper
+        widths.append(upper - lower)
+        _, lower, upper = fractile_confidence_interval(np.random.normal(size=1500), 0.99)
+        widths_.append(upper - lower)
+    assert 0.9 < n_covered / 200 <= 1
+    assert np.median(widths) < np.median(widths_)
+
+    convergence = FractileConvergence(0.99, tolerance=0.5)
+    assert convergence(y, w=w) and convergence.status['n_effective'] < len(y)
+
+
+def _test_replicate_fractile_interval():
+    from scipy.stats import qmc
+
+    x_ = norm.ppf(0.8)
+
+    # coverage of the 95% confidence interval from 8 scrambled Sobol' replicates
+    n_covered, widths, widths_ = 0, list(), list()
+    for i in range(100):
+        u = np.concatenate([qmc.Sobol(1, seed=i * 8 + r).random(128)[:, 0] for r in range(8)])
+        estimate, lower, upper = replicate_fractile_interval(norm.ppf(u), np.repeat(np.arange(8), 128), 0.8)
+        n_covered += lower <= x_ <= upper
+        widths.append(upper - lower)
+        _, lower, upper = fractile_confidence_interval(np.random.normal(size=1024), 0.8)
+        widths_.append(upper - lower)
+    assert 0.85 < n_covered / 100 <= 1
+    # narrower than the binomial interval of the same number of random samples
+    assert np.median(widths) < np.median(widths_)
+
+    # single replicate, unbounded
+    assert replicate_fractile_interval(np.arange(10.), np.zeros(10), 0.8)[1:] == (-np.inf, np.inf)
+
+    convergence = FractileConvergence(0.8, tolerance=1.)
+    assert convergence(norm.ppf(u), replicate=np.repeat(np.arange(8), 128))
+    assert convergence.status['n_replicates'] == 8
+
+
+def _test_control_variate_fractile_interval():
+    np.random.seed(0)
+    x_ = norm.ppf(0.8, scale=np.sqrt(1 + 0.3 ** 2))
+
+    # full model of 500 samples, cheap model strongly correlated with it of 20000 samples including those 500
+    n_covered, widths, widths_, variance_reductions = 0, list(), list(), list()
+    for i in range(200):
+        z = np.random.normal(size=20000)
+        x, c_all = z[:500] + np.random.normal(scale=0.3, size=500), z
+        estimate, lower, upper, variance_reduction = control_variate_fractile_interval(x, c_all[:500], c_all, 0.8)
+        n_covered += lower <= x_ <= upper
+        widths.append(upper - lower)
+        variance_reductions.append(variance_reduction)
+        _, lower, upper = fractile_confidence_interval(x, 0.8)
+        widths_.append(upper - lower)
+    assert 0.9 < n_covered / 200 <= 1
+    assert np.median(variance_reductions) > 2
+    assert np.median(widths) < np.median(widths_) / 1.3
+
+    # uncorrelated cheap model, nothing gained but still valid
+    estimate, lower, upper, variance_reduction = control_variate_fractile_interval(
+        x, np.random.normal(size=500), np.random.normal(size=20000), 0.8)
+    assert lower < x_ < upper and variance_reduction < 1.1
+
+    # nan of the full model is ignored, nan of the cheap model is treated as inf
+    x[:10], c = np.nan, c_all[:500].copy()
+    c[10:20] = np.nan
+    assert np.isfinite(control_variate_fractile_interval(x, c, np.append(c_all, np.nan), 0.8)[0])
+
+
+if __name__ == '__main__':
+    _test_fractile_confidence_interval()
+    _test_weighted_fractile_confidence_interval()
+    _test_replicate_fractile_interval()
+    _test_control_variate_fractile_interval()
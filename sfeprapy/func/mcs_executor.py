@@ -0,0 +1,680 @@
+# -*- coding: utf-8 -*-
+import collections
+import concurrent.futures
+import importlib
+import ipaddress
+import multiprocessing as mp
+import multiprocessing.pool
+import os
+import queue
+import secrets
+import socket
+import threading
+import time
+import traceback
+from abc import ABC, abstractmethod
+from multiprocessing.managers import BaseManager
+from typing import Callable, Iterable, Iterator, Union
+
+from sfeprapy import logger
+
+
+def _worker_init(preload: tuple):
+    """Pool initializer, imports `preload` modules once per worker process so the first task of every worker does not
+    pay the import cost (e.g. fsetools, scipy)."""
+    for module_name in preload:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            logger.warning(f'Failed to preload module {module_name} in worker process, {e}')
+
+
+class MCSExecutor(ABC):
+    """Executor of `MCS` tasks. An executor is opened once and can be reused by any number of `MCS.run_mcs` calls, until
+    closed explicitly. Child classes implement `MCSExecutor.open`, `MCSExecutor.close` and `MCSExecutor.submit`.
+
+    Example:
+
+        >>> with ProcessExecutor(n_threads=4, preload=['sfeprapy.mcs0.mcs0_calc']) as executor:
+        >>>     for mcs_input in mcs_inputs:
+        >>>         mcs = MCS0()
+        >>>         mcs.mcs_inputs = mcs_input
+        >>>         mcs.executor = executor
+        >>>         mcs.run_mcs()
+
+    :param n_threads: number of workers.
+    """
+    shared_memory = False  # True if workers are on the same host, i.e. `SharedConstants` can be published in memory
+
+    def __init__(self, n_threads: int = 1):
+        self.__n_threads = int(n_threads)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(terminate=exc_type is not None)
+
+    def __getstate__(self):
+        raise TypeError(f'{type(self).__name__} is not picklable, it is owned by the parent process')
+
+    @property
+    def n_threads(self) -> int:
+        return self.__n_threads
+
+    @property
+    @abstractmethod
+    def is_open(self) -> bool:
+        raise NotImplementedError('This method should be overridden by a child class')
+
+    @abstractmethod
+    def open(self):
+        raise NotImplementedError('This method should be overridden by a child class')
+
+    @abstractmethod
+    def close(self, terminate: bool = False):
+        """Closes the executor after outstanding tasks are completed, or discards them immediately if `terminate`."""
+        raise NotImplementedError('This method should be overridden by a child class')
+
+    @abstractmethod
+    def submit(self, func: Callable, args) -> concurrent.futures.Future:
+        """Schedules `func(args)`, returns a `concurrent.futures.Future` which can also be awaited in asyncio by
+        `asyncio.wrap_future`. Thread safe."""
+        raise NotImplementedError('This method should be overridden by a child class')
+
+    def imap(self, func: Callable, iterable: Iterable) -> Iterator:
+        """Applies `func` to every item of `iterable`, results are yielded in order."""
+        futures = [self.submit(func, args) for args in iterable]
+        return (future.result() for future in futures)
+
+    def map(self, func: Callable, iterable: Iterable) -> list:
+        return list(self.imap(func, iterable))
+
+
+class SerialExecutor(MCSExecutor):
+    """Runs tasks one after another in the current process."""
+
+    def __init__(self, *_, **__):
+        super().__init__(n_threads=1)
+        self.__is_open = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.__is_open
+
+    def open(self):
+        self.__is_open = True
+        return self
+
+    def close(self, terminate: bool = False):
+        self.__is_open = False
+
+    def submit(self, func: Callable, args) -> concurrent.futures.Future:
+        # solved upon submission, the returned future is already done
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(func(args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def imap(self, func: Callable, iterable: Iterable) -> Iterator:
+        return map(func, iterable)
+
+
+class ProcessExecutor(MCSExecutor):
+    """A persistent `multiprocessing.Pool`, kept warm with pre-imported modules.
+
+    :param n_threads: number of worker processes.
+    :param preload: module names to be imported in every worker process upon start.
+    :param maxtasksperchild: number of tasks a worker process completes before it is replaced with a fresh one, workers
+        live as long as the pool if undefined.
+    """
+    shared_memory = True
+
+    def __init__(self, n_threads: int = 1, preload: Iterable[str] = None, maxtasksperchild: int = None):
+        super().__init__(n_threads=n_threads)
+        self.__preload = tuple(preload) if preload else tuple()
+        self.__maxtasksperchild = maxtasksperchild
+        self.__pool = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.__pool is not None
+
+    @property
+    def pool(self) -> mp.pool.Pool:
+        if self.__pool is None:
+            raise RuntimeError(f'{type(self).__name__} is not open')
+        return self.__pool
+
+    def open(self):
+        if self.__pool is None:
+            logger.debug(f'Opening process pool, {self.n_threads} processes, preload {self.__preload}')
+            self.__pool = mp.Pool(
+                self.n_threads,
+                initializer=_worker_init,
+                initargs=(self.__preload,),
+                maxtasksperchild=self.__maxtasksperchild,
+            )
+        return self
+
+    def close(self, terminate: bool = False):
+        if self.__pool is not None:
+            if terminate:
+                self.__pool.terminate()
+            else:
+                self.__pool.close()
+            self.__pool.join()
+            self.__pool = None
+
+    def submit(self, func: Callable, args) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        # callbacks are invoked by the result handler thread of the pool
+        self.pool.apply_async(func, (args,), callback=future.set_result, error_callback=future.set_exception)
+        return future
+
+    def imap(self, func: Callable, iterable: Iterable) -> Iterator:
+        return self.pool.imap(func, iterable)
+
+    def map(self, func: Callable, iterable: Iterable) -> list:
+        return self.pool.map(func, iterable)
+
+    def map_async(self, func: Callable, iterable: Iterable):
+        return self.pool.map_async(func, iterable)
+
+
+class FuturesExecutor(MCSExecutor):
+    """A `concurrent.futures` executor.
+
+    :param n_threads: number of workers.
+    :param preload: module names to be imported in every worker upon start.
+    :param kind: 'process' for `concurrent.futures.ProcessPoolExecutor`, or 'thread' for
+        `concurrent.futures.ThreadPoolExecutor` which suits calculation routines releasing the GIL.
+    """
+    shared_memory = True
+
+    def __init__(self, n_threads: int = 1, preload: Iterable[str] = None, kind: str = 'process'):
+        super().__init__(n_threads=n_threads)
+        if kind not in ('process', 'thread'):
+            raise ValueError(f'Unknown executor kind {kind}, expected "process" or "thread"')
+        self.__preload = tuple(preload) if preload else tuple()
+        self.__kind = kind
+        self.__executor = None
+        self.__futures = set()  # futures of `FuturesExecutor.submit` not yet done
+
+    @property
+    def is_open(self) -> bool:
+        return self.__executor is not None
+
+    def open(self):
+        if self.__executor is None:
+            cls = concurrent.futures.ProcessPoolExecutor if self.__kind == 'process' else \
+                concurrent.futures.ThreadPoolExecutor
+            self.__executor = cls(self.n_threads, initializer=_worker_init, initargs=(self.__preload,))
+        return self
+
+    def close(self, terminate: bool = False):
+        if self.__executor is not None:
+            if terminate:
+                # i.e. `cancel_futures` of `Executor.shutdown`, which is not available before Python 3.9
+                for future in list(self.__futures):
+                    future.cancel()
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+            self.__futures.clear()
+
+    def submit(self, func: Callable, args) -> concurrent.futures.Future:
+        if self.__executor is None:
+            raise RuntimeError(f'{type(self).__name__} is not open')
+        future = self.__executor.submit(func, args)
+        self.__futures.add(future)
+        future.add_done_callback(self.__futures.discard)
+        return future
+
+    def imap(self, func: Callable, iterable: Iterable) -> Iterator:
+        if self.__executor is None:
+            raise RuntimeError(f'{type(self).__name__} is not open')
+        return self.__executor.map(func, iterable)
+
+
+REMOTE_TASKS_PER_WORKER = 2  # tasks sent to a remote worker process ahead of completion, so it is not idle in between
+REMOTE_HEARTBEAT_INTERVAL = 1.  # [s], interval of heartbeats sent by remote worker processes
+
+_worker_queues, _result_queue = dict(), None  # owned by the `RemoteExecutor` server process
+
+
+def _get_worker_queue(worker_id: str) -> queue.Queue:
+    if worker_id not in _worker_queues:
+        _worker_queues[worker_id] = queue.Queue()
+    return _worker_queues[worker_id]
+
+
+def _get_result_queue() -> queue.Queue:
+    global _result_queue
+    if _result_queue is None:
+        _result_queue = queue.Queue()
+    return _result_queue
+
+
+class _RemoteManager(BaseManager):
+    pass
+
+
+_RemoteManager.register('get_worker_queue', callable=_get_worker_queue)
+_RemoteManager.register('get_result_queue', callable=_get_result_queue)
+
+
+def _parse_address(address: Union[str, tuple]) -> tuple:
+    if isinstance(address, str):
+        host, port = address.rsplit(':', 1)
+        return host, int(port)
+    return tuple(address)
+
+
+def _is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == 'localhost'
+
+
+class RemoteExecutor(MCSExecutor):
+    """Distributes tasks to worker processes on any host over TCP, using `multiprocessing.managers`. The executor serves
+    a queue per worker process and a result queue at `address`, workers are started separately with `remote_worker` (or
+    `sfeprapy worker`) and connect to it. Tasks are pickled, workers need the same version of `sfeprapy` installed.
+
+    Each worker process is sent up to `REMOTE_TASKS_PER_WORKER` tasks at a time and sends a heartbeat every
+    `REMOTE_HEARTBEAT_INTERVAL`. Tasks of a worker not heard from within `worker_timeout` (e.g. killed or disconnected)
+    are sent to other workers, a task lost more than `max_retries` times fails. Outstanding tasks are waited for upon
+    `RemoteExecutor.close` and fail if no worker is heard from within `worker_timeout`, e.g. no worker ever connected.
+
+    Anything connecting with the `authkey` can run code on the executor and the workers, as tasks and results are
+    unpickled. It is required to serve at any address other than a loopback address, at which a random one is generated
+    and logged if undefined.
+
+    :param n_threads: number of worker processes expected to connect, used to size tasks.
+    :param address: (host, port) or 'host:port' to serve at, port 0 for an arbitrary free port.
+    :param authkey: shared secret of the executor and the workers.
+    :param worker_timeout: [s], time without heartbeat after which a worker is considered lost.
+    :param max_retries: number of times a task is sent again after its worker is lost.
+    """
+
+    def __init__(
+            self, n_threads: int = 1, address: Union[str, tuple] = ('127.0.0.1', 0), authkey: Union[str, bytes] = None,
+            worker_timeout: float = 60., max_retries: int = 2,
+    ):
+        super().__init__(n_threads=n_threads)
+        self.__address = _parse_address(address)
+        self.__is_authkey_generated = not authkey
+        if not authkey:
+            if not _is_loopback(self.__address[0]):
+                raise ValueError(f'`authkey` is required to serve at {self.__address[0]}, anything connecting with it '
+                                 f'can run code on the executor and the workers')
+            authkey = secrets.token_hex(16)
+        self.__authkey = authkey.encode() if isinstance(authkey, str) else authkey
+        self.__worker_timeout = float(worker_timeout)
+        self.__max_retries = int(max_retries)
+        self.__manager = None
+        self.__task_id = 0
+        self.__tasks = dict()  # {task id: [future, func, args, number of times lost]}, tasks not yet returned
+        self.__pending = collections.deque()  # ids of tasks not yet sent to a worker
+        self.__workers = dict()  # {worker id: dict(queue, last_seen, tasks)}, `tasks` being ids of tasks sent to it
+        self.__last_seen = None  # time any worker was last heard from, or opened
+        self.__lock = threading.Lock()
+        self.__collector = None
+
+    @property
+    def address(self) -> tuple:
+        """Address served at, the actual port if opened with port 0."""
+        return self.__manager.address if self.__manager is not None else self.__address
+
+    @property
+    def authkey(self) -> bytes:
+        """Shared secret of the executor and the workers, generated if undefined."""
+        return self.__authkey
+
+    @property
+    def is_open(self) -> bool:
+        return self.__manager is not None
+
+    def open(self):
+        if self.__manager is None:
+            self.__manager = _RemoteManager(address=self.__address, authkey=self.__authkey)
+            self.__manager.start()
+            self.__last_seen = time.monotonic()
+            # one thread per executor collects results and heartbeats of the workers, resolves the futures and sends
+            # tasks to the workers
+            self.__collector = threading.Thread(target=self.__collect, args=(self.__manager,), daemon=True)
+            self.__collector.start()
+            if self.__is_authkey_generated:
+                logger.warning(f'Serving MCS tasks at {self.address}, authkey {self.__authkey.decode()}')
+            else:
+                logger.info(f'Serving MCS tasks at {self.address}')
+        return self
+
+    def close(self, terminate: bool = False):
+        # workers lose connection and stop once the server is shut down
+        if self.__manager is None:
+            return
+        if not terminate:
+            while True:
+                with self.__lock:
+                    futures = [task[0] for task in self.__tasks.values()]
+                    is_lost = time.monotonic() - self.__last_seen > self.__worker_timeout
+                if not futures:
+                    break
+                if is_lost:
+                    logger.warning(f'No worker heard from within {self.__worker_timeout:g} s, {len(futures)} '
+                                   f'outstanding tasks failed')
+                    for future in futures:
+                        try:
+                            future.set_exception(RuntimeError(
+                                f'No remote worker heard from within {self.__worker_timeout:g} s to solve the task'))
+                        except concurrent.futures.InvalidStateError:
+                            pass  # i.e. returned or cancelled meanwhile
+                    break
+                concurrent.futures.wait(futures, timeout=REMOTE_HEARTBEAT_INTERVAL)
+        manager, self.__manager = self.__manager, None
+        self.__collector.join()
+        manager.shutdown()
+        self.__collector = None
+        with self.__lock:
+            tasks, self.__tasks = self.__tasks, dict()
+            self.__pending.clear()
+            self.__workers.clear()
+        for task in tasks.values():
+            task[0].cancel()
+
+    def __collect(self, manager: _RemoteManager):
+        result_queue = manager.get_result_queue()
+        while self.__manager is not None:
+            try:
+                message = result_queue.get(timeout=0.1)
+            except queue.Empty:
+                message = None
+            except (EOFError, ConnectionError):
+                break
+            try:
+                with self.__lock:
+                    resolved = self.__receive(manager, message) if message is not None else list()
+                    resolved.extend(self.__check_workers())
+                    self.__dispatch()
+            except (EOFError, ConnectionError):
+                break  # i.e. server shut down
+            for future, is_success, res in resolved:
+                try:
+                    if is_success:
+                        future.set_result(res)
+                    else:
+                        future.set_exception(res)
+                except concurrent.futures.InvalidStateError:
+                    pass  # i.e. cancelled
+
+    def __receive(self, manager: _RemoteManager, message: tuple) -> list:
+        """Registers a heartbeat or result of a worker, returns [(future, is_success, result)] of the tasks returned."""
+        kind, worker_id, res = message
+        worker = self.__workers.get(worker_id)
+        if worker is None:
+            # i.e. connected, or heard from again after considered lost
+            worker = self.__workers[worker_id] = dict(queue=manager.get_worker_queue(worker_id), tasks=set())
+            logger.info(f'Worker {worker_id} connected')
+        worker['last_seen'] = self.__last_seen = time.monotonic()
+        if kind != 'result':
+            return list()
+        task_id, is_success, res = res
+        worker['tasks'].discard(task_id)
+        task = self.__tasks.pop(task_id, None)
+        if task is None:
+            return list()  # i.e. cancelled, or returned by another worker after this worker was considered lost
+        if not is_success:
+            res = RuntimeError(f'Task failed in remote worker\n{res}')
+        return [(task[0], is_success, res)]
+
+    def __check_workers(self) -> list:
+        """Sends tasks of lost workers to other workers, returns [(future, is_success, result)] of the tasks failed."""
+        resolved = list()
+        t = time.monotonic()
+        for worker_id, worker in list(self.__workers.items()):
+            if t - worker['last_seen'] <= self.__worker_timeout:
+                continue
+            del self.__workers[worker_id]
+            logger.warning(f'Worker {worker_id} lost, {len(worker["tasks"])} tasks are sent to other workers')
+            for task_id in sorted(worker['tasks'], reverse=True):
+                task = self.__tasks.get(task_id)
+                if task is None:
+                    continue
+                task[3] += 1
+                if task[3] > self.__max_retries:
+                    del self.__tasks[task_id]
+                    resolved.append((task[0], False, RuntimeError(
+                        f'Task lost with remote worker {worker_id}, {task[3]} times')))
+                else:
+                    self.__pending.appendleft(task_id)
+        return resolved
+
+    def __dispatch(self):
+        """Sends pending tasks to workers with less than `REMOTE_TASKS_PER_WORKER` tasks."""
+        for worker in self.__workers.values():
+            while self.__pending and len(worker['tasks']) < REMOTE_TASKS_PER_WORKER:
+                task_id = self.__pending.popleft()
+                task = self.__tasks.get(task_id)
+                if task is None or task[0].cancelled():
+                    self.__tasks.pop(task_id, None)
+                    continue
+                worker['queue'].put((task_id, task[1], task[2]))
+                worker['tasks'].add(task_id)
+
+    def submit(self, func: Callable, args) -> concurrent.futures.Future:
+        if self.__manager is None:
+            raise RuntimeError(f'{type(self).__name__} is not open')
+        future = concurrent.futures.Future()
+        with self.__lock:
+            self.__task_id += 1
+            self.__tasks[self.__task_id] = [future, func, args, 0]
+            self.__pending.append(self.__task_id)
+            self.__dispatch()
+        return future
+
+
+def _remote_heartbeat(result_queue, worker_id: str, stop: threading.Event):
+    while not stop.wait(REMOTE_HEARTBEAT_INTERVAL):
+        try:
+            result_queue.put(('heartbeat', worker_id, None))
+        except (EOFError, ConnectionError, OSError):
+            break
+
+
+def _remote_worker_loop(address: tuple, authkey: bytes, connect_timeout: float):
+    manager = _RemoteManager(address=address, authkey=authkey)
+    t0 = time.time()
+    while True:
+        try:
+            manager.connect()
+            break
+        except ConnectionError:
+            if time.time() - t0 > connect_timeout:
+                raise
+            time.sleep(0.5)
+
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    task_queue, result_queue = manager.get_worker_queue(worker_id), manager.get_result_queue()
+    try:
+        result_queue.put(('heartbeat', worker_id, None))
+    except (EOFError, ConnectionError):
+        return  # executor closed
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_remote_heartbeat, args=(result_queue, worker_id, stop), daemon=True)
+    heartbeat.start()
+    while True:
+        try:
+            task_id, func, args = task_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+        except (EOFError, ConnectionError):
+            break  # executor closed
+
+        try:
+            res = (task_id, True, func(args))
+        except Exception:
+            res = (task_id, False, traceback.format_exc())
+        try:
+            result_queue.put(('result', worker_id, res))
+        except (EOFError, ConnectionError):
+            break
+    stop.set()
+
+
+def remote_worker(
+        address: Union[str, tuple], authkey: Union[str, bytes], n_processes: int = 1, connect_timeout: float = 60.,
+):
+    """Runs worker processes for a `RemoteExecutor` served at `address`, returns once the executor is closed.
+
+    :param address: (host, port) or 'host:port' of the `RemoteExecutor`.
+    :param authkey: shared secret, same as the `RemoteExecutor`.
+    :param n_processes: number of worker processes on this host.
+    :param connect_timeout: [s], time to wait for the executor to be available.
+    """
+    address = _parse_address(address)
+    authkey = authkey.encode() if isinstance(authkey, str) else authkey
+    processes = [
+        mp.Process(target=_remote_worker_loop, args=(address, authkey, connect_timeout)) for _ in range(n_processes)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+
+EXECUTORS = dict(
+    serial=SerialExecutor,
+    process=ProcessExecutor,
+    futures=FuturesExecutor,
+    remote=RemoteExecutor,
+)
+
+
+def make_executor(name: str, n_threads: int = 1, **kwargs) -> MCSExecutor:
+    """Instantiates an executor by its name in `EXECUTORS`, `kwargs` are passed to the executor."""
+    try:
+        cls = EXECUTORS[name]
+    except KeyError:
+        raise ValueError(f'Unknown executor {name}, available executors are {list(EXECUTORS.keys())}')
+    return cls(n_threads, **kwargs)
+
+
+def _getpid(*_) -> int:
+    return os.getpid()
+
+
+def _raise(*_):
+    raise ValueError('expected failure')
+
+
+def _sleep_getpid(t: float) -> int:
+    time.sleep(t)
+    return os.getpid()
+
+
+def _test_process_executor():
+    with ProcessExecutor(n_threads=2, preload=['numpy']) as executor:
+        pid_1 = set(executor.map(_getpid, range(8)))
+        pid_2 = set(executor.map(_getpid, range(8)))
+        assert executor.is_open
+    assert not executor.is_open
+    # the same worker processes are reused between calls
+    assert len(pid_1 | pid_2) <= 2
+
+
+def _test_executors():
+    for executor in [
+        SerialExecutor(),
+        FuturesExecutor(2, kind='thread'),
+        FuturesExecutor(2, kind='process', preload=['numpy']),
+        make_executor('process', 2),
+    ]:
+        with executor:
+            assert list(executor.imap(abs, range(-10, 0))) == list(range(10, 0, -1))
+        assert not executor.is_open
+
+    # outstanding tasks are discarded if terminated
+    executor = FuturesExecutor(1, kind='thread').open()
+    futures = [executor.submit(_sleep_getpid, 0.1) for _ in range(10)]
+    executor.close(terminate=True)
+    assert futures[0].result() == os.getpid() and futures[-1].cancelled()
+
+    # remote executor with two worker processes on localhost
+    with RemoteExecutor(n_threads=2, address=('127.0.0.1', 0), authkey=b'test') as executor:
+        worker = mp.Process(target=remote_worker, args=(executor.address, b'test', 2, 10))
+        worker.start()
+        assert list(executor.imap(abs, range(-100, 0))) == list(range(100, 0, -1))
+        assert os.getpid() not in set(executor.imap(_getpid, range(100)))
+        try:
+            list(executor.imap(_raise, range(2)))
+            raise AssertionError('remote exception is not raised')
+        except RuntimeError:
+            pass
+    worker.join(timeout=30)
+    assert not worker.is_alive()
+
+    # no default authkey, required to serve at other than a loopback address and generated otherwise
+    try:
+        RemoteExecutor(n_threads=1, address=('0.0.0.0', 0))
+        raise AssertionError('`authkey` is not required')
+    except ValueError:
+        pass
+    authkey_1, authkey_2 = RemoteExecutor(address='localhost:0').authkey, RemoteExecutor().authkey
+    assert len(authkey_1) >= 32 and authkey_1 != authkey_2
+    assert RemoteExecutor(address=('0.0.0.0', 0), authkey='test').authkey == b'test'
+
+
+def _test_remote_executor_worker_lost():
+    # tasks of a killed worker are solved by the other worker
+    executor = RemoteExecutor(n_threads=2, authkey=b'test', worker_timeout=2.).open()
+    workers = [mp.Process(target=_remote_worker_loop, args=(executor.address, b'test', 10)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    futures = [executor.submit(_sleep_getpid, 0.05) for _ in range(60)]
+    while not any(future.done() for future in futures):
+        time.sleep(0.01)
+    workers[0].kill()
+    workers[0].join()
+    assert all(future.result(timeout=60) in (workers[0].pid, workers[1].pid) for future in futures)
+    assert futures[-1].result() == workers[1].pid
+
+    # closed after outstanding tasks are completed
+    futures = [executor.submit(_sleep_getpid, 0.05) for _ in range(10)]
+    executor.close()
+    assert all(future.done() and not future.cancelled() for future in futures)
+    workers[1].join(timeout=30)
+    assert not workers[1].is_alive()
+
+    # a task failing its workers fails once retried `max_retries` times, outstanding tasks are discarded if terminated
+    executor = RemoteExecutor(n_threads=1, authkey=b'test', worker_timeout=1., max_retries=0).open()
+    worker = mp.Process(target=_remote_worker_loop, args=(executor.address, b'test', 10))
+    worker.start()
+    futures = [executor.submit(_sleep_getpid, 60) for _ in range(3)]
+    time.sleep(1)
+    worker.kill()
+    worker.join()
+    try:
+        futures[0].result(timeout=30)
+        raise AssertionError('lost task is not failed')
+    except RuntimeError:
+        pass
+    executor.close(terminate=True)
+    assert futures[-1].cancelled()
+
+    # outstanding tasks fail upon closing if no worker is heard from within `worker_timeout`
+    executor = RemoteExecutor(n_threads=1, authkey=b'test', worker_timeout=1.).open()
+    futures = [executor.submit(_sleep_getpid, 0) for _ in range(3)]
+    t0 = time.monotonic()
+    executor.close()
+    assert time.monotonic() - t0 < 10 and not executor.is_open
+    assert all(isinstance(future.exception(timeout=0), RuntimeError) for future in futures)
+
+
+if __name__ == '__main__':
+    _test_process_executor()
+    _test_executors()
+    _test_remote_executor_worker_lost()
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
+import warnings
+import zlib
 from io import StringIO
+from typing import Union
 
 import numpy as np
 import pandas as pd
@@ -56,7 +59,32 @@ def uniform_(ubound: float, lbound: float, **_):
     return dict(loc=loc, scale=scale)
 
 
-def random_variable_generator(dict_in: dict, num_samples: int):
+def case_seed_sequence(seed: Union[int, np.random.SeedSequence], case_name: str) -> np.random.SeedSequence:
+    """Independent random stream of a case, derived from the master `seed`. Equivalent to `SeedSequence.spawn` with the
+    child counter being a stable hash of `case_name` rather than the position of the case, so streams of a case are not
+    affected by other cases being added, removed or reordered.
+
+    :param seed: master seed, or a `SeedSequence` of it.
+    :param case_name: name of the case.
+    :return: `SeedSequence` of the case, see `sampler_rng` and `chunk_seed_sequence`.
+    """
+    entropy = seed.entropy if isinstance(seed, np.random.SeedSequence) else seed
+    return np.random.SeedSequence(entropy, spawn_key=(zlib.crc32(str(case_name).encode('utf-8')),))
+
+
+def sampler_rng(case_ss: np.random.SeedSequence) -> np.random.Generator:
+    """Random generator to sample the stochastic inputs of a case, see `main`."""
+    return np.random.default_rng(np.random.SeedSequence(case_ss.entropy, spawn_key=case_ss.spawn_key + (0,)))
+
+
+def chunk_seed_sequence(case_ss: np.random.SeedSequence, start: int) -> np.random.SeedSequence:
+    """Random stream of the deterministic calculation of the sample at row `start` of a case, or of a chunk of samples
+    from row `start` for batch calculation. Counter based, i.e. the stream depends only on the row, so a sample (or
+    chunk) is solved with the same stream in any order, in any process or when resumed."""
+    return np.random.SeedSequence(case_ss.entropy, spawn_key=case_ss.spawn_key + (1, int(start)))
+
+
+def random_variable_generator(dict_in: dict, num_samples: int, rng: np.random.Generator = None):
     """Generates samples of defined distribution. This is build upon scipy.stats library.
 
     :param dict_in:     distribution inputs, required keys are distribution dependent, should be align with inputs
@@ -64,11 +92,66 @@ def random_variable_generator(dict_in: dict, num_samples: int):
                             `dist`: str, distribution type;
                             `ubound`: float, upper bound of the sampled values; and
                             `lbound`: float, lower bound of the sampled values.
+                        Optional key:
+                            `bias`: float, importance sampling, CDF points are concentrated towards the upper (positive)
+                            or the lower (negative) tail, see `stratified_weights` for the likelihood ratio of samples.
     :param num_samples: number of samples to be generated.
+    :param rng:         random generator to shuffle the samples, the global `np.random` state is used if undefined.
     :return samples:    sampled values based upon `dist` in the range [`lbound`, `ubound`] with `num_samples` number of
                         values.
     """
 
+    samples = stratified_samples(dict_in, num_samples, np.arange(num_samples))
+
+    (np.random if rng is None else rng).shuffle(samples)
+
+    return samples
+
+
+def stratified_samples(dict_in: dict, num_samples: int, strata: np.ndarray) -> np.ndarray:
+    """Values of `strata` out of `num_samples` equally spaced CDF points between `lbound` and `ubound`, i.e. the values
+    sampled by `random_variable_generator` before being shuffled, so any subset of them can be evaluated alone.
+
+    :param dict_in:     distribution inputs, see `random_variable_generator`.
+    :param num_samples: total number of samples.
+    :param strata:      int array, strata to be evaluated, each in the range [0, `num_samples`).
+    :return samples:    values of `strata`.
+    """
+
+    # importance sampling, exponential tilt of the CDF points
+    bias = dict_in.get("bias") or 0
+
+    # sample CDF points (y-axis value), same arithmetic as `np.linspace`
+    def cfd_q(cfd_q_l, cfd_q_u):
+        if num_samples > 1 and bias:
+            v_ = np.asarray(strata, dtype=float) / (num_samples - 1)
+            cfd_q_ = (cfd_q_u - cfd_q_l) * _tilt(v_, bias) + cfd_q_l
+        elif num_samples > 1:
+            cfd_q_ = np.asarray(strata, dtype=float) * ((cfd_q_u - cfd_q_l) / (num_samples - 1)) + cfd_q_l
+            cfd_q_[np.asarray(strata) == num_samples - 1] = cfd_q_u
+        else:
+            cfd_q_ = np.full((len(strata),), cfd_q_l, dtype=float)
+        return cfd_q_
+
+    return _truncated_ppf(dict_in, len(strata), cfd_q)
+
+
+def ppf_samples(dict_in: dict, u: np.ndarray) -> np.ndarray:
+    """Values at fractions `u` of the CDF range between `lbound` and `ubound`, i.e. the inverse transform of uniform
+    points in [0, 1), e.g. a column of `qmc_points`. `bias` is applied the same way as `stratified_samples`.
+
+    :param dict_in:     distribution inputs, see `random_variable_generator`.
+    :param u:           float array, each in the range [0, 1].
+    :return samples:    values of `u`.
+    """
+    bias = dict_in.get("bias") or 0
+    u = _tilt(np.asarray(u, dtype=float), bias) if bias else np.asarray(u, dtype=float)
+    return _truncated_ppf(dict_in, len(u), lambda cfd_q_l, cfd_q_u: (cfd_q_u - cfd_q_l) * u + cfd_q_l)
+
+
+def _truncated_ppf(dict_in: dict, num_points: int, cfd_q) -> np.ndarray:
+    """Values of `num_points` CDF points produced by `cfd_q(cdf of lbound, cdf of ubound)`, see `stratified_samples`."""
+
     # assign distribution type
     dist_0 = dict_in["dist"]
     dist = dict_in["dist"]
@@ -77,14 +160,10 @@ def random_variable_generator(dict_in: dict, num_samples: int):
     ubound = dict_in["ubound"]
     lbound = dict_in["lbound"]
 
-    # sample CDF points (y-axis value)
     def generate_cfd_q(dist_, dist_kw_, lbound_, ubound_):
-        cfd_q_ = np.linspace(
-            getattr(stats, dist_).cdf(x=lbound_, **dist_kw_),
-            getattr(stats, dist_).cdf(x=ubound_, **dist_kw_),
-            num_samples,
-        )
-        samples_ = getattr(stats, dist_).ppf(q=cfd_q_, **dist_kw_)
+        cfd_q_l = getattr(stats, dist_).cdf(x=lbound_, **dist_kw_)
+        cfd_q_u = getattr(stats, dist_).cdf(x=ubound_, **dist_kw_)
+        samples_ = getattr(stats, dist_).ppf(q=cfd_q(cfd_q_l, cfd_q_u), **dist_kw_)
         return samples_
 
     # convert human distribution parameters to scipy distribution parameters
@@ -125,15 +204,13 @@ def random_variable_generator(dict_in: dict, num_samples: int):
 
     elif dist_0 == "constant_":
         # print(num_samples, lbound, ubound, np.average(lbound))
-        samples = np.full((num_samples,), np.average([lbound, ubound]))
+        samples = np.full((num_points,), np.average([lbound, ubound]))
 
     else:
         try:
-            dict_in.pop("dist")
-            dict_in.pop("ubound")
-            dict_in.pop("lbound")
+            dist_kw = {k: v for k, v in dict_in.items() if k not in ("dist", "ubound", "lbound", "bias")}
             samples = generate_cfd_q(
-                dist_=dist, dist_kw_=dict_in, lbound_=lbound, ubound_=ubound
+                dist_=dist, dist_kw_=dist_kw, lbound_=lbound, ubound_=ubound
             )
         except AttributeError:
             raise ValueError("Unknown distribution type {}.".format(dist))
@@ -144,8 +221,6 @@ def random_variable_generator(dict_in: dict, num_samples: int):
     if "permanent" in dict_in:
         samples += dict_in["permanent"]
 
-    np.random.shuffle(samples)
-
     return samples
 
 
@@ -190,61 +265,324 @@ def _test_dict_flatten():
     assert y == y_expected
 
 
-def main(x: dict, num_samples: int) -> pd.DataFrame:
+def main(
+        x: dict, num_samples: int, rng: np.random.Generator = None, sampler: str = "random", n_replicates: int = 1,
+        scramble: bool = True,
+) -> pd.DataFrame:
     """Generates samples based upon prescribed distribution types.
 
     :param x: description of distribution function.
     :param num_samples: number of samples to be produced.
-    :return df_out:
+    :param rng: random generator, samples are reproducible with a seeded generator, see `sampler_rng`. The global
+        `np.random` state is used if undefined.
+    :param sampler: 'random' to stratify each input on its own and shuffle them independently (see
+        `random_variable_generator`), or 'lhs', 'sobol' or 'halton' to sample all stochastic inputs from one joint point
+        set, see `qmc_points`.
+    :param n_replicates: number of independently scrambled point sets interleaved by row, see `qmc_points`, not
+        applicable to 'random'.
+    :param scramble: to scramble (randomise) the point sets, not applicable to 'random'.
+    :return df_out: one column per input and `index`, and `sample_weight` (product of `stratified_weights` of all
+        inputs) if any input is importance sampled, see `bias` in `random_variable_generator`.
     """
 
+    if sampler != "random":
+        _check_qmc_sampler(sampler)
+        return _qmc_main(x, num_samples, np.arange(num_samples), qmc_seeds(rng, n_replicates), sampler, scramble)
+
     dict_out = dict()
+    sample_weight = None
 
     for k, v in x.items():
+        if isinstance(v, dict) and "dist" in v and v.get("bias"):
+            # importance sampling, weights are shuffled together with the samples
+            strata = (np.random if rng is None else rng).permutation(num_samples)
+            dict_out[k] = stratified_samples(v, num_samples, strata)
+            sample_weight = stratified_weights(v, num_samples, strata) * (1 if sample_weight is None else sample_weight)
+        elif isinstance(v, dict) and "dist" in v:
+            try:
+                dict_out[k] = random_variable_generator(v, num_samples, rng=rng)
+            except KeyError:
+                raise ("Missing parameters in input variable {}.".format(k))
+        else:
+            dict_out[k] = _deterministic_variable(k, v, num_samples)
 
-        if isinstance(v, float) or isinstance(v, int) or isinstance(v, np.float):
-            dict_out[k] = np.full((num_samples,), v, dtype=float)
+    if sample_weight is not None:
+        dict_out["sample_weight"] = sample_weight
+    dict_out["index"] = np.arange(0, num_samples, 1)
 
-        elif isinstance(v, str):
-            dict_out[k] = np.full(
-                (num_samples,), v, dtype=np.dtype("U{:d}".format(len(v)))
+    df_out = pd.DataFrame.from_dict(dict_out, orient="columns")
+
+    return df_out
+
+
+QMC_SAMPLERS = ("lhs", "sobol", "halton")
+QMC_SCIPY_VERSION = (1, 10)  # `scramble` of `scipy.stats.qmc.LatinHypercube`, see `qmc_points`
+
+
+def _check_qmc_sampler(sampler: str):
+    """Raises ValueError if `sampler` is not one of `QMC_SAMPLERS`, or ImportError if the installed scipy predates
+    `QMC_SCIPY_VERSION`, which requires Python 3.8 or later."""
+    if sampler not in QMC_SAMPLERS:
+        raise ValueError("Unknown sampler {}, one of {}.".format(sampler, ("random",) + QMC_SAMPLERS))
+    import scipy
+    version = tuple(int(v) for v in scipy.__version__.split(".")[:2])
+    if version < QMC_SCIPY_VERSION:
+        raise ImportError("Sampler {} requires scipy {} or later, scipy {} is installed.".format(
+            sampler, ".".join(str(v) for v in QMC_SCIPY_VERSION), scipy.__version__))
+
+
+def qmc_seeds(rng: np.random.Generator = None, n_replicates: int = 1) -> list:
+    """Seeds of the `n_replicates` point sets of `qmc_points`, drawn from `rng` or the global `np.random` state."""
+    if rng is None:
+        return [int(v) for v in np.random.randint(0, 2 ** 31 - 1, size=int(n_replicates))]
+    return [int(v) for v in rng.integers(0, 2 ** 63 - 1, size=int(n_replicates))]
+
+
+def qmc_points(
+        sampler: str, d: int, num_samples: int, rows: np.ndarray, seeds: list, scramble: bool = True
+) -> np.ndarray:
+    """Rows of a joint point set in the unit hypercube [0, 1)^`d`, one dimension per stochastic input, see
+    `scipy.stats.qmc` (scipy 1.10 or later, see `QMC_SCIPY_VERSION`).
+
+    `len(seeds)` point sets (replicates) are interleaved by row, i.e. row `i` is point `i // len(seeds)` of replicate
+    `i % len(seeds)`. Every replicate is scrambled independently, so the spread of a statistic between replicates
+    estimates its error (randomised QMC), see `replicate_fractile_interval`. Any prefix of rows holds an equal share
+    of every replicate. Rows of 'sobol' and 'halton' are evaluated alone by skipping the preceding points, 'lhs'
+    samples the entire replicate.
+
+    :param sampler: 'lhs' (Latin hypercube), 'sobol' or 'halton'.
+    :param d: number of dimensions.
+    :param num_samples: total number of rows.
+    :param rows: int array, contiguous rows to be evaluated, each in the range [0, `num_samples`).
+    :param seeds: seeds of the replicates, see `qmc_seeds`.
+    :param scramble: to scramble the point sets, otherwise they are deterministic (centred strata for 'lhs').
+    :return: float array of shape (len(rows), d).
+    """
+    _check_qmc_sampler(sampler)
+    from scipy.stats import qmc
+
+    rows = np.asarray(rows, dtype=np.int64)
+    n_replicates = len(seeds)
+    points = np.empty((len(rows), d), dtype=float)
+    if d == 0 or len(rows) == 0:
+        return points
+    for r, seed in enumerate(seeds):
+        is_r = rows % n_replicates == r
+        if not np.any(is_r):
+            continue
+        i = rows[is_r] // n_replicates
+        i_0, i_1 = int(np.min(i)), int(np.max(i)) + 1
+        if sampler == "lhs":
+            engine = qmc.LatinHypercube(d, scramble=scramble, seed=np.random.default_rng(seed))
+            points_r = engine.random(len(range(r, num_samples, n_replicates)))[i_0:i_1]
+        else:
+            engine = getattr(qmc, sampler.capitalize())(d, scramble=scramble, seed=np.random.default_rng(seed))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)  # i.e. Sobol' balance requires powers of 2
+                if i_0 > 0:
+                    engine.fast_forward(i_0)
+                points_r = engine.random(i_1 - i_0)
+        points[is_r] = points_r[i - i_0]
+    return points
+
+
+def _qmc_main(x: dict, num_samples: int, rows: np.ndarray, seeds: list, sampler: str, scramble: bool) -> pd.DataFrame:
+    """Rows of `main` with a joint point set, see `qmc_points`."""
+    stochastic = [k for k, v in x.items() if isinstance(v, dict) and "dist" in v and v["dist"] != "constant_"]
+    points = qmc_points(sampler, len(stochastic), num_samples, rows, seeds, scramble=scramble)
+
+    dict_out = dict()
+    sample_weight = None
+    for k, v in x.items():
+        if k in stochastic:
+            u = points[:, stochastic.index(k)]
+            try:
+                dict_out[k] = ppf_samples(v, u)
+            except KeyError:
+                raise ValueError("Missing parameters in input variable {}.".format(k))
+            if v.get("bias"):
+                sample_weight = _tilt_weights(u, v["bias"]) * (1 if sample_weight is None else sample_weight)
+        elif isinstance(v, dict) and "dist" in v:
+            dict_out[k] = stratified_samples(v, num_samples, np.zeros((len(rows),), dtype=np.int64))
+        else:
+            dict_out[k] = _deterministic_variable(k, v, len(rows))
+
+    if sample_weight is not None:
+        dict_out["sample_weight"] = sample_weight
+    dict_out["index"] = rows
+
+    return pd.DataFrame(dict_out, index=rows)
+
+
+def stratified_weights(dict_in: dict, num_samples: int, strata: np.ndarray) -> np.ndarray:
+    """Likelihood ratio (i.e. importance sampling weight) of `strata` sampled by `stratified_samples`, 1 if `bias` is
+    undefined.
+
+    With `bias` b, the fraction v in [0, 1] of a stratum is mapped to the CDF fraction u = ln(1 + v (e^b - 1)) / b, i.e.
+    u is sampled from the density g(u) = b e^(b u) / (e^b - 1) instead of uniform, and the weight is 1 / g(u). Weights
+    average to 1 and are bounded by e^(-b) (e^b - 1) / b and (e^b - 1) / b.
+
+    :param dict_in:     distribution inputs, see `random_variable_generator`.
+    :param num_samples: total number of samples.
+    :param strata:      int array, strata to be evaluated, each in the range [0, `num_samples`).
+    :return weights:    weights of `strata`.
+    """
+    bias = (dict_in.get("bias") or 0) if isinstance(dict_in, dict) and "dist" in dict_in else 0
+    if not bias or num_samples <= 1 or dict_in["dist"] == "constant_":
+        return np.ones((len(strata),), dtype=float)
+    return _tilt_weights(np.asarray(strata, dtype=float) / (num_samples - 1), bias)
+
+
+def _tilt(v: np.ndarray, bias: float) -> np.ndarray:
+    """Tilted CDF fraction of `v`, see `stratified_weights`."""
+    return np.log1p(v * np.expm1(bias)) / bias
+
+
+def _tilt_weights(v: np.ndarray, bias: float) -> np.ndarray:
+    """Likelihood ratio of the tilted CDF fraction of `v`, see `stratified_weights`."""
+    return np.expm1(bias) / (bias * (1 + v * np.expm1(bias)))
+
+
+def _deterministic_variable(k: str, v, num_samples: int):
+    """Values of a non-stochastic input, i.e. any input other than a distribution, see `main`."""
+    if isinstance(v, float) or isinstance(v, int):
+        return np.full((num_samples,), v, dtype=float)
+
+    elif isinstance(v, str):
+        return np.full(
+            (num_samples,), v, dtype=np.dtype("U{:d}".format(len(v)))
+        )
+
+    elif isinstance(v, np.ndarray) or isinstance(v, list):
+        return list(np.full((num_samples, len(v)), v, dtype=float))
+
+    elif isinstance(v, dict):
+        if "ramp" in v:
+            s_ = StringIO(v["ramp"])
+            d_ = pd.read_csv(
+                s_,
+                names=["x", "y"],
+                dtype=float,
+                skip_blank_lines=True,
+                skipinitialspace=True,
             )
+            t_ = d_.iloc[:, 0]
+            v_ = d_.iloc[:, 1]
+            if all(v_ == v_[0]):
+                f_interp = v_[0]
+            else:
+                f_interp = interp1d(t_, v_, bounds_error=False, fill_value=0)
+            return np.full((num_samples,), f_interp)
+        else:
+            raise ValueError("Unknown input data type for {}.".format(k))
+    else:
+        raise TypeError("Unknown input data type for {}.".format(k))
+
+
+def _permutation(i: np.ndarray, n: int, keys: np.ndarray) -> np.ndarray:
+    """Keyed pseudo-random permutation of range(`n`) evaluated at `i`, i.e. the position of `i` in a shuffled
+    range(`n`), computed without materialising the permutation. A balanced Feistel network on the smallest even number
+    of bits covering `n`, values out of range are walked through the cycle until they are within `n`.
 
-        elif isinstance(v, np.ndarray) or isinstance(v, list):
-            dict_out[k] = list(np.full((num_samples, len(v)), v, dtype=float))
+    :param i: int array, each in the range [0, `n`).
+    :param n: size of the permutation.
+    :param keys: uint64 array, one key per round.
+    :return: permuted `i`.
+    """
+    half = max(1, (int(n - 1).bit_length() + 1) // 2)
+    mask, half = np.uint64((1 << half) - 1), np.uint64(half)
+    y = np.asarray(i, dtype=np.uint64).copy()
+    todo = np.ones(y.shape, dtype=bool)
+    with np.errstate(over='ignore'):
+        while np.any(todo):
+            left, right = y[todo] >> half, y[todo] & mask
+            for key in keys:
+                f = (right ^ key) * np.uint64(0x9E3779B97F4A7C15)
+                f ^= f >> np.uint64(29)
+                left, right = right, left ^ (f & mask)
+            y[todo] = (left << half) | right
+            todo = y >= n
+    return y.astype(np.int64)
+
+
+class StratifiedSampler:
+    """Random access to samples of `main`, rows of any range are produced on their own without sampling the other rows,
+    so samples can be generated chunk by chunk (i.e. where they are solved) with memory independent of `num_samples`.
+
+    Every stochastic input is stratified the same way as `random_variable_generator` (i.e. each of the `num_samples`
+    CDF points is sampled once), the shuffle is replaced by a keyed permutation (see `_permutation`) of which row `i` is
+    evaluated alone. Samples only depend on `x`, `num_samples` and `seed`, not on the chunk size or the order of chunks.
+    Objects are small and picklable, to be sent to worker processes in place of the samples.
+
+    Example:
+
+        >>> sampler = StratifiedSampler(x, 10_000_000, seed=case_seed_sequence(0, 'case_1'))
+        >>> for df in sampler.chunks(100_000):
+        >>>     solve(df)
+
+    With `sampler` other than 'random', rows are those of `main` with the same `sampler`, `n_replicates` and `scramble`
+    and `rng=sampler_rng(seed)`, see `qmc_points`.
+
+    :param x: description of distribution function, see `main`.
+    :param num_samples: number of samples.
+    :param seed: optional, `SeedSequence` of the case (see `case_seed_sequence`) or int, drawn from OS entropy if
+        undefined.
+    :param sampler: see `main`.
+    :param n_replicates: see `main`.
+    :param scramble: see `main`.
+    """
 
-        elif isinstance(v, dict):
-            if "dist" in v:
+    N_ROUNDS = 4
+
+    def __init__(
+            self, x: dict, num_samples: int, seed: Union[int, np.random.SeedSequence] = None, sampler: str = "random",
+            n_replicates: int = 1, scramble: bool = True,
+    ):
+        self.x = x
+        self.num_samples = int(num_samples)
+        self.sampler, self.scramble = sampler, scramble
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        # one independent key set per input, the stream is separated from `sampler_rng` and `chunk_seed_sequence`
+        ss = np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (2,))
+        self.keys = ss.generate_state(len(x) * self.N_ROUNDS, dtype=np.uint64).reshape((len(x), self.N_ROUNDS))
+        if sampler != "random":
+            _check_qmc_sampler(sampler)
+        self.seeds = qmc_seeds(sampler_rng(seed), n_replicates) if sampler != "random" else None
+
+    def __len__(self):
+        return self.num_samples
+
+    def rows(self, start: int, stop: int) -> pd.DataFrame:
+        """Samples of rows [`start`, `stop`), same columns as `main` and indexed by row."""
+        start, stop = max(0, int(start)), min(self.num_samples, int(stop))
+        rows = np.arange(start, max(start, stop), dtype=np.int64)
+        if self.sampler != "random":
+            return _qmc_main(self.x, self.num_samples, rows, self.seeds, self.sampler, self.scramble)
+        dict_out = dict()
+        sample_weight = None
+        for (k, v), keys in zip(self.x.items(), self.keys):
+            if isinstance(v, dict) and "dist" in v:
+                strata = _permutation(rows, self.num_samples, keys)
                 try:
-                    dict_out[k] = random_variable_generator(v, num_samples)
+                    dict_out[k] = stratified_samples(v, self.num_samples, strata)
                 except KeyError:
-                    raise ("Missing parameters in input variable {}.".format(k))
-            elif "ramp" in v:
-                s_ = StringIO(v["ramp"])
-                d_ = pd.read_csv(
-                    s_,
-                    names=["x", "y"],
-                    dtype=float,
-                    skip_blank_lines=True,
-                    skipinitialspace=True,
-                )
-                t_ = d_.iloc[:, 0]
-                v_ = d_.iloc[:, 1]
-                if all(v_ == v_[0]):
-                    f_interp = v_[0]
-                else:
-                    f_interp = interp1d(t_, v_, bounds_error=False, fill_value=0)
-                dict_out[k] = np.full((num_samples,), f_interp)
+                    raise ValueError("Missing parameters in input variable {}.".format(k))
+                if v.get("bias"):
+                    sample_weight = stratified_weights(v, self.num_samples, strata) * (
+                        1 if sample_weight is None else sample_weight)
             else:
-                raise ValueError("Unknown input data type for {}.".format(k))
-        else:
-            raise TypeError("Unknown input data type for {}.".format(k))
+                dict_out[k] = _deterministic_variable(k, v, len(rows))
+        if sample_weight is not None:
+            dict_out["sample_weight"] = sample_weight
+        dict_out["index"] = rows
 
-    dict_out["index"] = np.arange(0, num_samples, 1)
+        return pd.DataFrame(dict_out, index=rows)
 
-    df_out = pd.DataFrame.from_dict(dict_out, orient="columns")
-
-    return df_out
+    def chunks(self, chunk_size: int):
+        """Generator of `StratifiedSampler.rows` of `chunk_size` rows each."""
+        for start in range(0, self.num_samples, int(chunk_size)):
+            yield self.rows(start, start + int(chunk_size))
 
 
 def _test_random_variable_generator():
@@ -285,6 +623,158 @@ def _test_random_variable_generator():
     assert abs(np.mean(y["v"].values) - 420) <= 1
 
 
+def _test_seed_sequence():
+    x = dict(
+        a=dict(dist="gumbel_r_", lbound=10, ubound=1500, mean=420, sd=126),
+        b=dict(dist="uniform_", lbound=0, ubound=1),
+    )
+
+    # reproducible with the same seed and case, independent otherwise
+    case_ss = case_seed_sequence(0, "case_1")
+    y_1, y_2 = main(x, 100, rng=sampler_rng(case_ss)), main(x, 100, rng=sampler_rng(case_seed_sequence(0, "case_1")))
+    assert np.array_equal(y_1["a"].values, y_2["a"].values) and np.array_equal(y_1["b"].values, y_2["b"].values)
+    for case_ss_ in [case_seed_sequence(1, "case_1"), case_seed_sequence(0, "case_2")]:
+        assert not np.array_equal(y_1["a"].values, main(x, 100, rng=sampler_rng(case_ss_))["a"].values)
+    # shuffled, the same stratified values are sampled
+    assert not np.array_equal(y_1["a"].values, np.sort(y_1["a"].values))
+    assert np.allclose(np.sort(y_1["a"].values), np.sort(main(x, 100)["a"].values))
+
+    # chunk streams only depend on the case and the first row of the chunk
+    state = chunk_seed_sequence(case_ss, 100).generate_state(4)
+    assert np.array_equal(state, chunk_seed_sequence(case_seed_sequence(0, "case_1"), 100).generate_state(4))
+    assert not np.array_equal(state, chunk_seed_sequence(case_ss, 0).generate_state(4))
+    assert not np.array_equal(
+        sampler_rng(case_ss).integers(2 ** 32, size=4), np.random.default_rng(case_ss).integers(2 ** 32, size=4)
+    )
+
+
+def _test_stratified_sampler():
+    x = dict(
+        case_name="case_1",
+        a=dict(dist="gumbel_r_", lbound=10, ubound=1500, mean=420, sd=126),
+        b=dict(dist="uniform_", lbound=0, ubound=1),
+        c=1.,
+    )
+
+    # any size, the permutation is a bijection
+    for n in [1, 2, 3, 17, 1000, 4097]:
+        y = _permutation(np.arange(n), n, np.arange(4, dtype=np.uint64))
+        assert np.array_equal(np.sort(y), np.arange(n))
+    assert not np.array_equal(_permutation(np.arange(1000), 1000, np.arange(4, dtype=np.uint64)), np.arange(1000))
+
+    # the same stratified values as `main`, in a different order
+    case_ss = case_seed_sequence(0, "case_1")
+    sampler = StratifiedSampler(x, 1000, seed=case_ss)
+    y = sampler.rows(0, 1000)
+    y_ = main(x, 1000, rng=sampler_rng(case_ss))
+    assert list(y.columns) == list(y_.columns) and len(sampler) == 1000
+    for k in ["a", "b"]:
+        assert np.array_equal(np.sort(y[k].values), np.sort(y_[k].values))
+        assert not np.array_equal(y[k].values, np.sort(y[k].values))
+    assert not np.array_equal(np.argsort(y["a"].values), np.argsort(y["b"].values))  # independent inputs
+    assert all(y["c"] == 1.) and all(y["case_name"] == "case_1") and np.array_equal(y["index"], np.arange(1000))
+
+    # independent of chunk size, reproducible with the same seed, picklable
+    import pickle
+    y_chunks = pd.concat(list(pickle.loads(pickle.dumps(sampler)).chunks(300)))
+    assert y_chunks.equals(y)
+    assert StratifiedSampler(x, 1000, seed=case_seed_sequence(0, "case_1")).rows(990, 2000).equals(y.iloc[990:])
+    assert not np.array_equal(StratifiedSampler(x, 1000, seed=1).rows(0, 10)["a"].values, y["a"].values[:10])
+
+
+def _test_importance_sampling():
+    from sfeprapy.func.mcs_convergence import fractile_confidence_interval
+
+    x = dict(
+        a=dict(dist="norm_", lbound=-6, ubound=6, mean=0, sd=1, bias=5),
+        b=dict(dist="uniform_", lbound=0, ubound=1, bias=-1),
+        c=dict(dist="uniform_", lbound=0, ubound=1),
+    )
+    n = 2000
+    y = main(x, n, rng=np.random.default_rng(0))
+    w = y["sample_weight"].values
+
+    # samples are concentrated in the upper tail of `a` (4% rather than 1% above CDF 0.99), weights restore the
+    # distribution
+    assert np.sum(y["a"].values > stats.norm.ppf(0.99)) > 0.03 * n
+    assert abs(np.mean(w) - 1) < 0.03 and np.all(w > 0)
+    for q in [0.5, 0.99, 0.999]:
+        estimate, lower, upper = fractile_confidence_interval(y["a"].values, q, w=w)
+        assert abs(estimate - stats.norm.ppf(q)) < 0.05 and lower <= stats.norm.ppf(q) <= upper
+    assert abs(np.average(y["b"].values, weights=w) - 0.5) < 0.01
+    # weights are shuffled together with samples, i.e. independent of unbiased inputs
+    assert abs(np.corrcoef(w, y["c"].values)[0, 1]) < 0.1
+    assert "sample_weight" not in main(dict(c=x["c"]), n)
+
+    # same samples by `StratifiedSampler`, weights of the strata of each row
+    y_ = StratifiedSampler(x, n, seed=0).rows(0, n)
+    for k in ["a", "b"]:
+        assert np.allclose(np.sort(y[k].values), np.sort(y_[k].values))
+    assert np.allclose(y_["sample_weight"].values, stratified_weights(x["a"], n, np.searchsorted(
+        np.sort(y_["a"].values), y_["a"].values)) * stratified_weights(x["b"], n, np.searchsorted(
+        np.sort(y_["b"].values), y_["b"].values)))
+
+
+def _test_qmc_sampler():
+    x = dict(
+        a=dict(dist="norm_", lbound=-6, ubound=6, mean=0, sd=1),
+        b=dict(dist="uniform_", lbound=0, ubound=1, bias=2),
+        c=dict(dist="constant_", lbound=1, ubound=1),
+        d=np.pi,
+    )
+    n = 1024
+
+    for sampler in QMC_SAMPLERS:
+        y = main(x, n, rng=sampler_rng(np.random.SeedSequence(0)), sampler=sampler, n_replicates=4)
+        assert list(y.columns) == ["a", "b", "c", "d", "sample_weight", "index"] and len(y.index) == n
+        assert np.all(y["c"].values == 1) and np.all(y["d"].values == np.pi)
+        assert abs(np.mean(y["a"].values)) < 0.01 and abs(np.std(y["a"].values) - 1) < 0.02
+        assert abs(np.average(y["b"].values, weights=y["sample_weight"].values) - 0.5) < 0.01
+
+        # rows of any chunk by `StratifiedSampler`, the same as sampled at once
+        y_ = pd.concat(list(StratifiedSampler(x, n, seed=0, sampler=sampler, n_replicates=4).chunks(100)))
+        for k in ["a", "b", "sample_weight", "index"]:
+            assert np.allclose(y[k].values, y_[k].values)
+
+        # every replicate a balanced point set on its own
+        for r in range(4):
+            a = y["a"].values[r::4]
+            assert abs(np.mean(a)) < 0.05 and np.sum(a <= 0) == n // 8
+
+    # joint point set, the 2D projection of Sobol' points is more uniform than random pairing
+    def discrepancy(df: pd.DataFrame) -> float:
+        u = np.column_stack([stats.norm.cdf(df["a"].values), stats.uniform.cdf(df["b"].values)])
+        return stats.qmc.discrepancy(u)
+
+    x["b"].pop("bias")
+    assert discrepancy(main(x, n, rng=np.random.default_rng(0), sampler="sobol")) < discrepancy(
+        main(x, n, rng=np.random.default_rng(0)))
+
+    # deterministic without scrambling
+    assert main(x, n, sampler="sobol", scramble=False).equals(main(x, n, sampler="sobol", scramble=False))
+    try:
+        main(x, n, sampler="unknown")
+        raise AssertionError("`ValueError` is expected")
+    except ValueError:
+        pass
+
+    # a clear error rather than a `TypeError` of `scipy.stats.qmc` on scipy predating `QMC_SCIPY_VERSION`
+    import scipy
+    version = scipy.__version__
+    try:
+        scipy.__version__ = "1.9.3"
+        main(x, n, sampler="lhs")
+        raise AssertionError("`ImportError` is expected")
+    except ImportError:
+        pass
+    finally:
+        scipy.__version__ = version
+
+
 if __name__ == "__main__":
     _test_random_variable_generator()
     _test_dict_flatten()
+    _test_seed_sequence()
+    _test_stratified_sampler()
+    _test_importance_sampling()
+    _test_qmc_sampler()
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+TOTAL = 'total'  # stage name of the entire evaluation, see `profiling`
+_local = threading.local()  # profiling state of the current thread, see `profiling`
+
+
+class _Stage:
+    """Times the enclosed block under `name` if profiling is enabled in the current thread, see `profile_stage`."""
+    __slots__ = ('name', 'n_samples', 'index', 'stats', 't0')
+
+    def __init__(self, name: str, n_samples: int, index):
+        self.name, self.n_samples, self.index = name, n_samples, index
+        self.stats = getattr(_local, 'stats', None)
+
+    def __enter__(self):
+        if self.stats is not None:
+            self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        if self.stats is not None:
+            record(self.stats, self.name, time.perf_counter() - self.t0, self.n_samples, self.index)
+
+
+def profile_stage(name: str, n_samples: int = 1, index=None) -> _Stage:
+    """Context manager recording wall time and call count of a stage of a calculation routine, i.e. a hot path, no
+    effect unless within `profiling`.
+
+    Example:
+
+        >>> with profile_stage('solve_protection_thickness', index=index):
+        >>>     res = solve_protection_thickness(**inputs)
+
+    :param name: name of the stage.
+    :param n_samples: number of samples solved by the call, i.e. more than 1 for columnar routines.
+    :param index: optional, index of the sample being solved, the index of the slowest call is kept.
+    """
+    return _Stage(name, n_samples, index)
+
+
+def profile_record(name: str, t: float, n_samples: int = 1, index=None, n_calls: int = 1):
+    """Records `t` seconds spent in stage `name` if profiling is enabled in the current thread, for stages not suited
+    to `profile_stage`, e.g. an iterative solver where `n_calls` is the number of iterations."""
+    stats = getattr(_local, 'stats', None)
+    if stats is not None:
+        record(stats, name, t, n_samples, index, n_calls)
+
+
+def record(stats: dict, name: str, t: float, n_samples: int = 1, index=None, n_calls: int = 1):
+    """Adds `t` seconds of `n_calls` calls to stage `name` in `stats`, see `profiling` for the structure."""
+    stage = stats.get(name)
+    if stage is None:
+        stats[name] = dict(n_calls=n_calls, n_samples=n_samples, time=t, time_max=t, index_max=index)
+        return
+    stage['n_calls'] += n_calls
+    stage['n_samples'] += n_samples
+    stage['time'] += t
+    if t > stage['time_max']:
+        stage['time_max'], stage['index_max'] = t, index
+
+
+def merge(stats: dict, other: dict) -> dict:
+    """Merges `other` into `stats`, e.g. timings of tasks evaluated by different workers, returns `stats`."""
+    for name, v in other.items():
+        stage = stats.get(name)
+        if stage is None:
+            stats[name] = dict(v)
+            continue
+        for k in ('n_calls', 'n_samples', 'time'):
+            stage[k] += v[k]
+        if v['time_max'] > stage['time_max']:
+            stage['time_max'], stage['index_max'] = v['time_max'], v['index_max']
+    return stats
+
+
+@contextlib.contextmanager
+def profiling(enabled: bool = True, n_samples: int = 1):
+    """Enables `profile_stage` in the current thread within the context, the yielded dict is filled with the recorded
+    timings on exit:
+
+        {stage name: dict(n_calls, n_samples, time, time_max, index_max)}
+
+    `time` and `time_max` [s] being the total and the slowest call, `index_max` the sample index of the slowest call.
+    The context itself is recorded as stage `TOTAL`. Nothing is recorded if `enabled` is False.
+
+    :param enabled: to record timings.
+    :param n_samples: number of samples solved within the context.
+    """
+    stats = dict()
+    if not enabled:
+        yield stats
+        return
+    stats_ = getattr(_local, 'stats', None)
+    _local.stats = stats
+    t0 = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        _local.stats = stats_
+        record(stats, TOTAL, time.perf_counter() - t0, n_samples)
+
+
+def profile_report(profiles: dict) -> pd.DataFrame:
+    """Tabulates timings of all cases.
+
+    :param profiles: {case name: timings}, timings being the dict yielded by `profiling`.
+    :return: one row per case and stage, with `time_per_sample` [s] and `time_fraction`, the share of the `TOTAL`
+        time of the case. Stages may be nested, e.g. an iterative solver and the stages within, so fractions do not
+        necessarily sum up to 1.
+    """
+    rows = list()
+    for case_name, stats in profiles.items():
+        for name, v in stats.items():
+            rows.append(dict(case_name=case_name, stage=name, **v))
+    df = pd.DataFrame(
+        rows, columns=['case_name', 'stage', 'n_calls', 'n_samples', 'time', 'time_max', 'index_max'],
+    )
+    df['time_per_sample'] = df['time'] / df['n_samples']
+    df['time_fraction'] = df['time'] / df['case_name'].map(
+        {case_name: stats[TOTAL]['time'] if TOTAL in stats else np.nan for case_name, stats in profiles.items()}
+    )
+    return df
+
+
+def _test_mcs_profile():
+    def solve(index):
+        with profile_stage('a', index=index):
+            time.sleep(0.002 * (index + 1))
+        with profile_stage('b', n_samples=2):
+            pass
+        profile_record('c', 0.1, index=index, n_calls=3)
+
+    with profiling(False) as stats_disabled:
+        solve(0)
+    assert stats_disabled == dict()
+
+    with profiling(n_samples=2) as stats_0:
+        solve(0)
+        solve(2)
+    with profiling() as stats_1:
+        solve(1)
+    solve(3)  # not within `profiling`, not recorded
+
+    assert stats_0['a']['n_calls'] == 2 and stats_0['a']['index_max'] == 2
+    assert stats_0['b']['n_calls'] == 2 and stats_0['b']['n_samples'] == 4
+    assert stats_0['c']['n_calls'] == 6 and abs(stats_0['c']['time'] - 0.2) < 1e-12
+    assert stats_0[TOTAL]['n_samples'] == 2 and stats_0[TOTAL]['time'] >= stats_0['a']['time']
+
+    total = merge(dict(), stats_0)
+    merge(total, stats_1)
+    assert total['a']['n_calls'] == 3 and total['a']['n_samples'] == 3
+    assert abs(total['a']['time'] - stats_0['a']['time'] - stats_1['a']['time']) < 1e-12
+    assert total['a']['time_max'] == stats_0['a']['time_max'] and total['a']['index_max'] == 2
+
+    df = profile_report(dict(case_1=total, case_2=stats_1))
+    assert len(df.index) == 8
+    assert df[(df['case_name'] == 'case_1') & (df['stage'] == TOTAL)]['time_fraction'].iloc[0] == 1
+    assert 0 < df[(df['case_name'] == 'case_2') & (df['stage'] == 'a')]['time_fraction'].iloc[0] < 1
+
+
+if __name__ == '__main__':
+    _test_mcs_profile()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import mmap
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+# memory backed file system is used where available so published constants do not touch the disk
+_SHARED_DIR = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+_CACHE_SIZE = 8
+_cache = OrderedDict()  # worker side cache of published constants, {file path: dict}
+
+
+def _is_constant(values: np.ndarray) -> bool:
+    if len(values) == 0:
+        return False
+    v0 = values[0]
+    if isinstance(v0, np.ndarray):
+        return all(isinstance(v, np.ndarray) and np.array_equal(v, v0) for v in values)
+    if values.dtype.kind in 'fc':
+        return bool(np.all((values == v0) | (np.isnan(values) & np.isnan(v0))))
+    if values.dtype.kind in 'iubUSM':
+        return bool(np.all(values == v0))
+    # objects, e.g. interpolation functions produced by `mcs_gen.main` are the same instance in every row
+    return all(v is v0 or (np.isscalar(v) and np.isscalar(v0) and v == v0) for v in values)
+
+
+def split_constant_columns(x: pd.DataFrame) -> tuple:
+    """Splits samples of a case into case-invariant columns and varying columns.
+
+    :param x: sampled parameters, one row per sample.
+    :return constants: dict, {'columns': all column names in order, 'values': {column name: value}}.
+    :return x_varying: DataFrame, `x` with the case-invariant columns dropped.
+    """
+    values = {k: x[k].values[0] for k in x.columns if k != 'index' and _is_constant(x[k].values)}
+    return dict(columns=list(x.columns), values=values), x.drop(columns=list(values.keys()))
+
+
+def join_constant_columns(x: Union[pd.DataFrame, list], constants: dict) -> Union[pd.DataFrame, list]:
+    """Reverse of `split_constant_columns`, `x` is either a DataFrame or a list of dict (one per sample)."""
+    if isinstance(x, pd.DataFrame):
+        x = x.copy()
+        for k, v in constants['values'].items():
+            x[k] = pd.Series([v] * len(x.index), index=x.index, dtype=object if not np.isscalar(v) else None)
+        return x[constants['columns']]
+    return [dict(constants['values'], **kwargs) for kwargs in x]
+
+
+class SharedConstants:
+    """Publishes case-invariant parameters once per case in a memory-mapped file, tasks only carry
+    `SharedConstants.handle` and workers resolve it with `get_shared_constants`. When shared memory is not wanted (i.e.
+    processes do not share the same host), the handle is the constants itself and they are sent with every task.
+
+    :param constants: see `split_constant_columns`.
+    :param use_shared_memory: publish `constants` in shared memory if True, otherwise inline.
+    """
+
+    def __init__(self, constants: dict, use_shared_memory: bool = True):
+        self.__fp = None
+        if use_shared_memory:
+            fd, self.__fp = tempfile.mkstemp(prefix='sfeprapy_', suffix='.pkl', dir=_SHARED_DIR)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(constants, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self.__handle = (self.__fp,)
+        else:
+            self.__handle = constants
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.unlink()
+
+    @property
+    def handle(self) -> Union[tuple, dict]:
+        return self.__handle
+
+    def unlink(self):
+        if self.__fp is not None:
+            try:
+                os.remove(self.__fp)
+            except FileNotFoundError:
+                pass
+            self.__fp = None
+
+
+def get_shared_constants(handle: Union[tuple, dict]) -> dict:
+    """Worker side, resolves `SharedConstants.handle`. Published constants are loaded once per process."""
+    if isinstance(handle, dict):
+        return handle
+
+    fp, = handle
+    if fp not in _cache:
+        with open(fp, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            _cache[fp] = pickle.loads(m)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return _cache[fp]
+
+
+def _test_shared_constants():
+    from sfeprapy.func.mcs_gen import main as mcs_gen_main
+
+    x = mcs_gen_main(
+        dict(
+            case_name='case_1', a=1., b=dict(dist='uniform_', lbound=0., ubound=1.), c=[1., 2., 3.],
+            d=dict(ramp='0, 0\n10, 1'),
+        ),
+        10,
+    )
+    constants, x_varying = split_constant_columns(x)
+    assert set(constants['values'].keys()) == {'case_name', 'a', 'c', 'd'}
+    assert list(x_varying.columns) == ['b', 'index']
+
+    for use_shared_memory in [True, False]:
+        with SharedConstants(constants, use_shared_memory) as shared:
+            constants_ = get_shared_constants(shared.handle)
+            fp = shared.handle[0] if use_shared_memory else None
+        assert fp is None or not os.path.exists(fp)
+        x_ = join_constant_columns(x_varying, constants_)
+        assert list(x_.columns) == list(x.columns)
+        assert np.allclose(x_['b'], x['b'])
+        assert all(x_['case_name'] == 'case_1')
+        assert x_['d'].iloc[-1](5) == 0.5
+
+        records = join_constant_columns(x_varying.to_dict(orient='records'), constants_)
+        assert records[3]['a'] == 1. and records[3]['b'] == x['b'].iloc[3]
+
+
+if __name__ == '__main__':
+    _test_shared_constants()
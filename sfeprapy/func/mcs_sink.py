@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import pickle
+import shutil
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from sfeprapy.func.mcs_gen import StratifiedSampler
+
+_NPY_MAGIC = b'\x93NUMPY\x01\x00'
+_NPY_HEADER_SIZE = 128  # fixed header size so the array length can be rewritten in place
+
+
+def _npy_header(dtype: np.dtype, n: int) -> bytes:
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': ({:d},), }}".format(
+        np.lib.format.dtype_to_descr(dtype), n
+    )
+    header = header.ljust(_NPY_HEADER_SIZE - len(_NPY_MAGIC) - 2 - 1) + '\n'
+    return _NPY_MAGIC + len(header).to_bytes(2, 'little') + header.encode('latin1')
+
+
+class _NpyColumn:
+    """One dimensional `.npy` file which can be appended, the header is rewritten with the new length upon every append
+    so the file is a valid `.npy` at any time."""
+
+    def __init__(self, fp: str, dtype: np.dtype, n: int = 0):
+        self.fp = fp
+        self.dtype = np.dtype(dtype)
+        self.n = n
+        if n == 0:
+            with open(fp, 'wb') as f:
+                f.write(_npy_header(self.dtype, 0))
+
+    def append(self, values: np.ndarray):
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        with open(self.fp, 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            f.write(values.tobytes())
+            self.n += len(values)
+            f.seek(0)
+            f.write(_npy_header(self.dtype, self.n))
+
+    def promote(self, dtype: np.dtype):
+        """Rewrites existing values in a wider `dtype`, i.e. integer column receives nan."""
+        values = self.read().astype(dtype)
+        self.dtype, self.n = np.dtype(dtype), 0
+        with open(self.fp, 'wb') as f:
+            f.write(_npy_header(self.dtype, 0))
+        self.append(values)
+
+    def read(self, mmap_mode: str = None) -> np.ndarray:
+        return np.load(self.fp, mmap_mode=mmap_mode, allow_pickle=False)
+
+
+class ColumnarSink:
+    """Appends results to a directory of `.npy` files, one file per column, so results are written to disk in chunks as
+    they complete rather than being kept in memory.
+
+    Numeric and boolean columns are stored as is, integer columns are promoted to float if they later receive non
+    integer values (e.g. nan). Any other column (i.e. strings) is stored as categorical codes and the categories are
+    kept in `meta.json`. Columns of other objects are stored as their string representation.
+
+    `meta.json` is rewritten after every append and also records the rows completed so far (see `ColumnarSink.completed`),
+    together with the sampled inputs saved by `ColumnarSink.save_inputs`, it serves as a checkpoint to resume from.
+
+    :param dir_path: directory for the column files.
+    :param resume: to continue appending to existing files in `dir_path`, otherwise existing content is removed.
+    """
+    META_FILE_NAME = 'meta.json'
+    INPUTS_FILE_NAME = 'inputs.pkl'
+
+    def __init__(self, dir_path: str, resume: bool = False):
+        self.dir_path = dir_path
+        self.__columns = None  # {column name: _NpyColumn}
+        self.__categories = dict()  # {column name: {category: code}}
+        self.__completed = list()  # [[start, stop], ...], completed rows of the sampled inputs
+
+        if resume and os.path.isfile(os.path.join(dir_path, self.META_FILE_NAME)):
+            self.__reopen()
+        else:
+            if os.path.exists(dir_path):
+                shutil.rmtree(dir_path)
+            os.makedirs(dir_path)
+
+    def __reopen(self):
+        with open(os.path.join(self.dir_path, self.META_FILE_NAME), 'r') as f:
+            meta = json.load(f)
+
+        self.__completed = [list(v) for v in meta.get('completed', list())]
+        if not meta['columns']:
+            return
+        self.__columns = dict()
+        for column in meta['columns']:
+            fp = os.path.join(self.dir_path, column['file'])
+            dtype = np.dtype(column['dtype'])
+            # values appended after the last meta update (i.e. interrupted) are discarded
+            os.truncate(fp, _NPY_HEADER_SIZE + meta['n_rows'] * dtype.itemsize)
+            with open(fp, 'r+b') as f:
+                f.write(_npy_header(dtype, meta['n_rows']))
+            self.__columns[column['name']] = _NpyColumn(fp, dtype, n=meta['n_rows'])
+            if column['categories'] is not None:
+                self.__categories[column['name']] = {v: i for i, v in enumerate(column['categories'])}
+
+    @property
+    def completed(self) -> list:
+        """Completed rows of the sampled inputs, list of [start, stop]."""
+        return self.__completed
+
+    def pending(self, n_rows: int) -> list:
+        """Rows of the sampled inputs yet to be completed, list of [start, stop]."""
+        pending, start = list(), 0
+        for start_, stop_ in sorted(self.__completed):
+            if start_ > start:
+                pending.append([start, start_])
+            start = max(start, stop_)
+        if start < n_rows:
+            pending.append([start, n_rows])
+        return pending
+
+    def save_inputs(self, x: Union[pd.DataFrame, StratifiedSampler], x_raw: dict = None):
+        """Saves the sampled inputs `x` (or the `StratifiedSampler` producing them) and the stochastic definition `x_raw`
+        they are sampled from."""
+        with open(os.path.join(self.dir_path, self.INPUTS_FILE_NAME), 'wb') as f:
+            pickle.dump(dict(x=x, x_raw=x_raw), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load_inputs(cls, dir_path: str, x_raw: dict = None) -> Union[pd.DataFrame, StratifiedSampler]:
+        """Loads sampled inputs saved by `ColumnarSink.save_inputs`, returns None if not available or they were sampled
+        from a stochastic definition other than `x_raw`."""
+        try:
+            with open(os.path.join(dir_path, cls.INPUTS_FILE_NAME), 'rb') as f:
+                inputs = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        if x_raw is not None and inputs['x_raw'] != x_raw:
+            return None
+        return inputs['x']
+
+    def __len__(self):
+        return 0 if not self.__columns else next(iter(self.__columns.values())).n
+
+    def __column_fp(self, i: int) -> str:
+        return os.path.join(self.dir_path, f'{i:03d}.npy')
+
+    def append(self, df: pd.DataFrame, rows: tuple = None):
+        """Appends `df`, `rows` is (start, stop) of the sampled inputs which `df` is produced from."""
+        if self.__columns is None:
+            self.__columns = dict()
+            for i, k in enumerate(df.columns):
+                values = self.__to_array(k, df[k].values)
+                self.__columns[k] = _NpyColumn(self.__column_fp(i), values.dtype)
+        elif list(df.columns) != list(self.__columns.keys()):
+            raise ValueError(f'Columns do not match previously appended, {list(df.columns)}')
+
+        for k, column in self.__columns.items():
+            values = self.__to_array(k, df[k].values)
+            if column.dtype.kind in 'iub' and values.dtype.kind == 'f' and not np.all(np.mod(values, 1) == 0):
+                column.promote(np.float64)
+            column.append(values)
+
+        if rows is not None:
+            if self.__completed and self.__completed[-1][1] == rows[0]:
+                self.__completed[-1][1] = int(rows[1])
+            else:
+                self.__completed.append([int(rows[0]), int(rows[1])])
+        self.__write_meta()
+
+    def __to_array(self, column: str, values: np.ndarray) -> np.ndarray:
+        if values.dtype.kind in 'iufb':
+            return values
+        if column not in self.__categories:
+            try:
+                return np.asarray(values, dtype=float)  # e.g. mixture of bool, int, float and nan
+            except (TypeError, ValueError):
+                self.__categories[column] = dict()
+        categories = self.__categories[column]
+        codes = np.empty((len(values),), dtype=np.int32)
+        for i, v in enumerate(values):
+            v = v if isinstance(v, str) else str(v)
+            if v not in categories:
+                categories[v] = len(categories)
+            codes[i] = categories[v]
+        return codes
+
+    def __write_meta(self):
+        meta = dict(
+            n_rows=len(self),
+            completed=self.__completed,
+            columns=[
+                dict(
+                    name=k, file=os.path.basename(v.fp), dtype=v.dtype.str,
+                    categories=list(self.__categories[k].keys()) if k in self.__categories else None,
+                ) for k, v in self.__columns.items()
+            ]
+        )
+        fp = os.path.join(self.dir_path, self.META_FILE_NAME)
+        with open(fp + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(fp + '.tmp', fp)
+
+    def read(self, columns: list = None) -> pd.DataFrame:
+        return read_columnar(self.dir_path, columns=columns)
+
+
+def read_columnar(dir_path: str, columns: list = None, mmap_mode: str = 'r') -> pd.DataFrame:
+    """Loads results written by `ColumnarSink`.
+
+    :param dir_path: directory of the column files.
+    :param columns: column names to be loaded, all columns if undefined.
+    :param mmap_mode: see `numpy.load`, numeric columns are memory-mapped by default.
+    :return: DataFrame
+    """
+    with open(os.path.join(dir_path, ColumnarSink.META_FILE_NAME), 'r') as f:
+        meta = json.load(f)
+
+    data = dict()
+    for column in meta['columns']:
+        if columns is not None and column['name'] not in columns:
+            continue
+        values = np.load(os.path.join(dir_path, column['file']), mmap_mode=mmap_mode, allow_pickle=False)
+        values = values[:meta['n_rows']]  # rows appended after meta was written are ignored
+        if column['categories'] is not None:
+            values = pd.Categorical.from_codes(values, categories=column['categories'])
+        data[column['name']] = values
+
+    return pd.DataFrame(data)
+
+
+def _test_columnar_sink():
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        sink = ColumnarSink(os.path.join(dir_work, 'case_1'))
+        sink.append(pd.DataFrame(dict(case_name=['case_1'] * 3, index=[0, 1, 2], a=[0.1, 0.2, 0.3], b=[True, np.nan, 1])))
+        sink.append(pd.DataFrame(dict(case_name=['case_1', 'x'], index=[3., np.nan], a=[0.4, 0.5], b=[False, 1])))
+        assert len(sink) == 5
+
+        # every column file is a valid `.npy` during appending
+        assert np.allclose(np.load(os.path.join(dir_work, 'case_1', '002.npy')), [0.1, 0.2, 0.3, 0.4, 0.5])
+
+        df = sink.read()
+        assert list(df.columns) == ['case_name', 'index', 'a', 'b']
+        assert list(df['case_name']) == ['case_1', 'case_1', 'case_1', 'case_1', 'x']
+        assert np.allclose(df['index'].values[:4], [0, 1, 2, 3]) and np.isnan(df['index'].values[4])
+        assert np.allclose(df['b'].values, [1, np.nan, 1, 0, 1], equal_nan=True)
+        assert list(read_columnar(sink.dir_path, columns=['a']).columns) == ['a']
+
+        # resume, rows completed before are recorded and an interrupted append is discarded
+        sink = ColumnarSink(os.path.join(dir_work, 'case_2'))
+        x = pd.DataFrame(dict(a=np.arange(10, dtype=float)))
+        sink.save_inputs(x, x_raw=dict(a=1))
+        sink.append(x.iloc[0:4], rows=(0, 4))
+        sink.append(x.iloc[4:6], rows=(4, 6))
+        with open(os.path.join(dir_work, 'case_2', '000.npy'), 'ab') as f:
+            f.write(np.zeros((3,)).tobytes())
+        assert ColumnarSink.load_inputs(sink.dir_path, x_raw=dict(a=2)) is None
+        assert ColumnarSink.load_inputs(sink.dir_path, x_raw=dict(a=1)).equals(x)
+        sink = ColumnarSink(sink.dir_path, resume=True)
+        assert sink.completed == [[0, 6]] and sink.pending(10) == [[6, 10]]
+        sink.append(x.iloc[6:10], rows=(6, 10))
+        assert np.allclose(sink.read()['a'].values, x['a'].values)
+        assert ColumnarSink(sink.dir_path).pending(10) == [[0, 10]]
+
+
+if __name__ == '__main__':
+    _test_columnar_sink()
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+import numpy as np
+import pandas as pd
+from scipy import linalg
+from scipy.spatial import cKDTree
+
+EXCLUDED_FEATURES = ('index', 'sample_weight')  # numeric columns of samples which are not inputs of the model
+
+
+def legendre_basis(x: np.ndarray, multi_indices: np.ndarray) -> np.ndarray:
+    """Products of Legendre polynomials, i.e. the polynomial chaos basis of uniform inputs.
+
+    :param x: float array of shape (n, d), scaled to [-1, 1].
+    :param multi_indices: int array of shape (m, d), degree of each input in each of the m terms.
+    :return: float array of shape (n, m).
+    """
+    n, d = x.shape
+    degree = int(np.max(multi_indices)) if multi_indices.size else 0
+    p = np.empty((degree + 1, n, d), dtype=float)  # p[k] = P_k(x), by Bonnet's recursion
+    p[0] = 1
+    if degree > 0:
+        p[1] = x
+    for k in range(1, degree):
+        p[k + 1] = ((2 * k + 1) * x * p[k] - k * p[k - 1]) / (k + 1)
+    basis = np.ones((n, len(multi_indices)), dtype=float)
+    for j in range(d):
+        basis *= p[multi_indices[:, j], :, j].T
+    return basis
+
+
+def total_degree_multi_indices(d: int, degree: int) -> np.ndarray:
+    """Multi-indices of all terms of `d` inputs with total degree up to `degree`, constant term first."""
+    multi_indices = [np.zeros((d,), dtype=int)]
+    for degree_ in range(1, degree + 1):
+        for inputs in itertools.combinations_with_replacement(range(d), degree_):
+            multi_indices.append(np.bincount(inputs, minlength=d))
+    return np.asarray(multi_indices, dtype=int).reshape((len(multi_indices), d))
+
+
+class PolynomialChaosSurrogate:
+    """Emulator of a calculation routine, i.e. `teq_main`, trained on a few thousand true evaluations to answer the
+    remaining samples of a case. Only numpy and scipy are used.
+
+    The output is expanded in Legendre polynomials (polynomial chaos) of the numeric inputs varying between samples, of
+    total degree up to `degree` and fitted by least squares. Every input is mapped to [-1, 1] by its empirical CDF of
+    the training samples, i.e. to a uniform variable which Legendre polynomials are orthogonal for, so heavy tailed
+    inputs (e.g. fire load density) do not dominate the fit. One expansion is fitted per `labels` value (e.g.
+    `fire_type`, where the output is discontinuous between fire models).
+
+    The error is estimated by `n_folds` fold cross validation. A prediction is only confident if all of below are met,
+    otherwise the sample is to be solved by the true calculation routine:
+
+        1. within the training range of every input (the training hull);
+        2. the `n_neighbours` nearest training samples share the same label and have finite outputs, i.e. away from
+           regime boundaries and samples without solution (e.g. time equivalence of inf);
+        3. the cross validated RMSE of the label, and the jackknife standard error of the prediction from the models
+           fitted without each fold, are within `tolerance`.
+
+    Example:
+
+        >>> model = PolynomialChaosSurrogate(tolerance=180).fit(x_train, y_train, labels=fire_type_train)
+        >>> y, labels, is_confident = model.predict(x)
+
+    :param degree: maximum total degree of the expansion, the degree of the least cross validated RMSE is used for each
+        label, provided at least two training samples per term.
+    :param n_folds: number of cross validation folds.
+    :param tolerance: maximum error of a confident prediction, in the unit of the output.
+    :param n_neighbours: number of nearest training samples checked for regime boundaries.
+    """
+    N_KNOTS = 257  # number of quantiles of the empirical CDF of each input
+
+    def __init__(self, degree: int = 3, n_folds: int = 5, tolerance: float = 180., n_neighbours: int = 8):
+        self.degree = int(degree)
+        self.n_folds = int(n_folds)
+        self.tolerance = float(tolerance)
+        self.n_neighbours = int(n_neighbours)
+
+        self.features: list = None  # input columns of the model
+        self.__knots = None  # training quantiles of the features, see `PolynomialChaosSurrogate.__transform`
+        self.__tree, self.__labels_train, self.__is_finite_train = None, None, None
+        self.__models = dict()  # {label: (multi_indices, coefficients, coefficients of each fold)}
+        self.cv_rmse = dict()  # {label: cross validated RMSE}
+        self.n_train = 0
+        self.n_predicted, self.n_confident = 0, 0
+
+    @property
+    def status(self) -> dict:
+        return dict(
+            n_train=self.n_train, features=self.features, cv_rmse=dict(self.cv_rmse), tolerance=self.tolerance,
+            n_predicted=self.n_predicted, n_confident=self.n_confident,
+        )
+
+    def __transform(self, x: pd.DataFrame) -> tuple:
+        """Features mapped to [-1, 1] by the empirical CDF of the training samples, and whether each sample is within
+        the training range of every feature."""
+        u = np.empty((len(x.index), len(self.features)), dtype=float)
+        is_inside = np.ones((len(x.index),), dtype=bool)
+        for j, (k, knots) in enumerate(zip(self.features, self.__knots)):
+            v = x[k].to_numpy(dtype=float)
+            u[:, j] = np.interp(v, knots, np.linspace(-1, 1, len(knots)))
+            is_inside &= (v >= knots[0]) & (v <= knots[-1])
+        return u, is_inside
+
+    def fit(self, x: pd.DataFrame, y: np.ndarray, labels: np.ndarray = None) -> 'PolynomialChaosSurrogate':
+        """:param x: sampled inputs of the training samples, one row per sample.
+        :param y: output of the training samples, non-finite values are not emulated.
+        :param labels: optional, regime of each training sample, one expansion is fitted per label.
+        :return: self.
+        """
+        y = np.asarray(y, dtype=float)
+        labels = np.zeros(y.shape, dtype=int) if labels is None else np.asarray(labels)
+        self.n_train = len(y)
+        self.features = [
+            k for k in x.columns if k not in EXCLUDED_FEATURES and x[k].dtype.kind in 'iuf' and
+            np.nanmax(x[k].values) > np.nanmin(x[k].values)
+        ]
+        self.__knots = [
+            np.quantile(x[k].to_numpy(dtype=float), np.linspace(0, 1, min(len(y), self.N_KNOTS)))
+            for k in self.features
+        ]
+        u, _ = self.__transform(x)
+
+        self.__tree = cKDTree(u) if self.features else None
+        self.__labels_train, self.__is_finite_train = labels, np.isfinite(y)
+
+        self.__models, self.cv_rmse = dict(), dict()
+        folds = np.arange(len(y)) % self.n_folds
+        for label in np.unique(labels):
+            is_label = (labels == label) & np.isfinite(y)
+            u_, y_, folds_ = u[is_label], y[is_label], folds[is_label]
+            # the degree of the least cross validated RMSE, higher degrees are prone to overfit noisy outputs
+            for degree in range(self.degree + 1):
+                multi_indices = total_degree_multi_indices(len(self.features), degree)
+                if len(y_) * (self.n_folds - 1) / self.n_folds < 2 * len(multi_indices):
+                    break  # too few samples
+                basis = legendre_basis(u_, multi_indices)
+                coefficients_folds, residuals = list(), np.empty_like(y_)
+                for fold in range(self.n_folds):
+                    is_fold = folds_ == fold
+                    coefficients_ = linalg.lstsq(basis[~is_fold], y_[~is_fold])[0]
+                    residuals[is_fold] = y_[is_fold] - basis[is_fold] @ coefficients_
+                    coefficients_folds.append(coefficients_)
+                cv_rmse = float(np.sqrt(np.mean(residuals ** 2)))
+                if label not in self.cv_rmse or cv_rmse < self.cv_rmse[label]:
+                    coefficients = linalg.lstsq(basis, y_)[0]
+                    self.__models[label] = (multi_indices, coefficients, np.asarray(coefficients_folds))
+                    self.cv_rmse[label] = cv_rmse
+        return self
+
+    def predict(self, x: pd.DataFrame) -> tuple:
+        """:param x: sampled inputs, same columns as trained with.
+        :return y: predicted output, nan if not predicted.
+        :return labels: predicted label, i.e. of the nearest training sample.
+        :return is_confident: bool array, see `PolynomialChaosSurrogate`.
+        """
+        n = len(x.index)
+        y, is_confident = np.full((n,), np.nan), np.zeros((n,), dtype=bool)
+        if self.__labels_train is None or len(self.__labels_train) == 0:
+            return y, np.zeros((n,), dtype=int), is_confident
+        # 1. training hull
+        u, is_inside = self.__transform(x)
+        # 2. regime of the nearest training samples
+        if self.__tree is not None:
+            k = min(self.n_neighbours, len(self.__labels_train))
+            _, i = self.__tree.query(u, k=k)
+            i = i.reshape((n, k))
+        else:
+            i = np.zeros((n, 1), dtype=int)
+        labels = self.__labels_train[i[:, 0]]
+        is_regular = np.all(self.__labels_train[i] == labels[:, None], axis=1) & np.all(
+            self.__is_finite_train[i], axis=1)
+
+        # 3. error of the expansion
+        for label, (multi_indices, coefficients, coefficients_folds) in self.__models.items():
+            is_label = labels == label
+            if not np.any(is_label):
+                continue
+            basis = legendre_basis(u[is_label], multi_indices)
+            y[is_label] = basis @ coefficients
+            y_folds = basis @ coefficients_folds.T
+            se = np.sqrt((self.n_folds - 1) / self.n_folds * np.sum(
+                (y_folds - np.mean(y_folds, axis=1, keepdims=True)) ** 2, axis=1))
+            is_confident[is_label] = (se <= self.tolerance) & (self.cv_rmse[label] <= self.tolerance)
+
+        is_confident &= is_inside & is_regular & np.isfinite(y)
+        self.n_predicted += n
+        self.n_confident += int(np.sum(is_confident))
+        return y, labels, is_confident
+
+
+def _test_polynomial_chaos_surrogate():
+    rng = np.random.default_rng(0)
+
+    def func(x: pd.DataFrame) -> tuple:
+        a, b = x['a'].values, x['b'].values
+        labels = (a > 0.8).astype(int)  # discontinuous regime
+        y = np.where(labels == 1, 100 + 10 * b, np.sin(3 * a) * 20 + b ** 2 * 5)
+        y[(a < -0.9) & (b < -0.9)] = np.inf  # i.e. no solution
+        return y, labels
+
+    def samples(n: int, scale: float = 1.) -> pd.DataFrame:
+        return pd.DataFrame(dict(
+            a=rng.uniform(-scale, scale, n), b=rng.uniform(-scale, scale, n), c=np.full((n,), 2.),
+            index=np.arange(n), case_name=['case_1'] * n,
+        ))
+
+    x_train = samples(2000)
+    y_train, labels_train = func(x_train)
+    model = PolynomialChaosSurrogate(degree=6, tolerance=0.5).fit(x_train, y_train, labels=labels_train)
+    assert model.features == ['a', 'b']
+    assert model.cv_rmse[0] < 0.5 and model.cv_rmse[1] < 0.5
+
+    x = samples(5000, scale=1.1)
+    y, labels = func(x)
+    y_, labels_, is_confident = model.predict(x)
+    assert 0.6 < np.mean(is_confident) < 1
+    # confident predictions are within tolerance and of the right regime (bar a few right at the regime boundary),
+    # samples beyond the training hull and next to samples without solution are not confident
+    assert np.mean(np.abs(y_[is_confident] - y[is_confident]) < 2) > 0.999
+    assert np.mean(labels_[is_confident] == labels[is_confident]) > 0.999
+    assert not np.any(is_confident[(np.abs(x['a'].values) > 1) | (np.abs(x['b'].values) > 1)])
+    assert not np.any(is_confident[~np.isfinite(y)])
+    assert model.status['n_predicted'] == 5000 and model.status['n_confident'] == np.sum(is_confident)
+
+    # tolerance not met by the expansion, nothing emulated
+    model = PolynomialChaosSurrogate(degree=1, tolerance=0.5).fit(x_train, y_train, labels=labels_train)
+    assert not np.any(model.predict(x)[2][labels == 0])
+
+    # too few training samples
+    model = PolynomialChaosSurrogate().fit(x_train.iloc[:1], y_train[:1])
+    assert not np.any(model.predict(x)[2])
+
+
+if __name__ == '__main__':
+    _test_polynomial_chaos_surrogate()
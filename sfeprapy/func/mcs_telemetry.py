@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import os
+import socket
+import threading
+import time
+from typing import Callable
+
+from sfeprapy import logger
+
+
+def worker_name() -> str:
+    """Identifies the worker evaluating a task, i.e. host and process, and thread if not the main thread."""
+    name = f'{socket.gethostname()}:{os.getpid()}'
+    thread = threading.current_thread()
+    if thread is not threading.main_thread():
+        name = f'{name}:{thread.name}'
+    return name
+
+
+class MCSTelemetry:
+    """Progress and throughput of a MCS run, updated with every completed task (i.e. chunk) by the parent process so
+    nothing is shared with the workers other than the task results.
+
+    `MCSTelemetry.status` returns a dict:
+
+        `elapsed`           [s], since the start of the run.
+        `n_completed`       number of samples solved in this run.
+        `n_total`           number of samples to be solved in this run, excluding cached and resumed samples. An upper
+                            bound if adaptive sample size, reduced as cases converge.
+        `samples_per_second` overall throughput.
+        `eta`               [s], estimated time to completion, None before the first completed task.
+        `queue_depth`       number of tasks submitted and not yet completed.
+        `workers`           {worker name: dict(n_tasks, n_samples, busy, samples_per_second)}, `busy` [s] being the
+                            total evaluation time of the tasks by the worker.
+
+    :param n_total: number of samples to be solved.
+    :param callback: optional, called with `MCSTelemetry.status` upon every update.
+    :param queue_depth: optional, callable returning the number of outstanding tasks.
+    :param log_interval: [s], minimum interval between progress records in the `sfeprapy` logger.
+    """
+
+    def __init__(
+            self, n_total: int, callback: Callable = None, queue_depth: Callable = None, log_interval: float = 10.,
+    ):
+        self.n_total = n_total
+        self.n_completed = 0
+        self.workers = dict()
+        self.__callback = callback
+        self.__queue_depth = queue_depth
+        self.__log_interval = log_interval
+        self.__t0 = time.perf_counter()
+        self.__t_log = self.__t0
+
+    def update(self, n_samples: int, worker: str = None, busy: float = None):
+        """Records a completed task.
+
+        :param n_samples: number of samples solved by the task.
+        :param worker: name of the worker, see `worker_name`.
+        :param busy: [s], evaluation time of the task by the worker.
+        """
+        self.n_completed += n_samples
+        if worker is not None:
+            worker_ = self.workers.setdefault(worker, dict(n_tasks=0, n_samples=0, busy=0.))
+            worker_['n_tasks'] += 1
+            worker_['n_samples'] += n_samples
+            worker_['busy'] += busy or 0.
+
+        if self.__callback is not None:
+            self.__callback(self.status)
+
+        t = time.perf_counter()
+        if t - self.__t_log >= self.__log_interval:
+            self.__t_log = t
+            status = self.status
+            logger.info(
+                f'MCS progress {status["n_completed"]}/{status["n_total"]} samples, '
+                f'{status["samples_per_second"]:.1f} samples/s with {len(status["workers"])} workers, '
+                f'ETA {status["eta"]:.0f} s, {status["queue_depth"]} tasks queued'
+            )
+
+    def discount(self, n_samples: int):
+        """Removes samples not to be solved from the total, i.e. case converged before all samples are solved."""
+        if n_samples:
+            self.n_total -= n_samples
+            if self.__callback is not None:
+                self.__callback(self.status)
+
+    @property
+    def status(self) -> dict:
+        elapsed = time.perf_counter() - self.__t0
+        samples_per_second = self.n_completed / elapsed if elapsed > 0 else 0.
+        return dict(
+            elapsed=elapsed,
+            n_completed=self.n_completed,
+            n_total=self.n_total,
+            samples_per_second=samples_per_second,
+            eta=(self.n_total - self.n_completed) / samples_per_second if samples_per_second > 0 else None,
+            queue_depth=self.__queue_depth() if self.__queue_depth is not None else None,
+            workers={
+                k: dict(v, samples_per_second=v['n_samples'] / v['busy'] if v['busy'] > 0 else None)
+                for k, v in self.workers.items()
+            },
+        )
+
+
+def _test_mcs_telemetry():
+    statuses = list()
+    telemetry = MCSTelemetry(n_total=100, callback=statuses.append, queue_depth=lambda: 3, log_interval=0)
+    assert telemetry.status['eta'] is None
+
+    time.sleep(0.01)
+    telemetry.update(10, worker='host:1', busy=0.5)
+    telemetry.update(20, worker='host:2', busy=0.5)
+    telemetry.update(10, worker='host:1', busy=0.5)
+    status = statuses[-1]
+    assert len(statuses) == 3
+    assert status['n_completed'] == 40 and status['queue_depth'] == 3
+    assert status['workers']['host:1'] == dict(n_tasks=2, n_samples=20, busy=1., samples_per_second=20.)
+    assert status['workers']['host:2']['samples_per_second'] == 40.
+    assert status['eta'] > 0
+
+    telemetry.discount(60)
+    assert statuses[-1]['eta'] == 0 and len(statuses) == 4
+
+    assert worker_name().endswith(str(os.getpid()))
+
+
+if __name__ == '__main__':
+    _test_mcs_telemetry()
@@ -19,6 +19,8 @@ def annex_b_equivalent_time_of_fire_exposure(
     :param delta_h: Height factor
     :return: Equivalent time exposure
 
+    All parameters can be arrays of the same shape (or broadcastable), i.e. many samples at once.
+
     SUPPLEMENT INFO:
     Table A.4 - Design fire growth rates (from PD 7974-1:2003, Table 3)
     | BUILDING                                                         | USE        |
@@ -57,19 +59,16 @@ def annex_b_equivalent_time_of_fire_exposure(
 
     # B.2
     # Vertical opening factor
-    alpha_v = min([max([A_vv / A_f, 0.025]), 0.25])
+    alpha_v = np.clip(np.divide(A_vv, A_f), 0.025, 0.25)
     # horizontal opening factor
-    alpha_h = A_vh / A_f
+    alpha_h = np.divide(A_vh, A_f)
     # just a factor
-    b_v = (
-        12.5 * (1 + 10 * alpha_v - alpha_v ** 2)
-        if (12.5 * (1 + 10 * alpha_v - alpha_v ** 2)) >= 10
-        else np.nan
-    )
+    b_v = 12.5 * (1 + 10 * alpha_v - alpha_v ** 2)
+    b_v = np.where(b_v >= 10, b_v, np.nan)
     # total ventilation factor
     w_f = ((6 / H) ** 0.3) * ((0.62 + 90 * (0.4 - alpha_v) ** 4) / (1 + b_v * alpha_h))
 
-    w_f = w_f if A_f >= 100 else np.nan
+    w_f = np.where(np.asarray(A_f) >= 100, w_f, np.nan)
 
     return q_fd * k_b * w_f * delta_h
 
@@ -6,7 +6,10 @@ from sfeprapy.mcs0.mcs0_calc import MCS0
 warnings.filterwarnings("ignore")
 
 
-def main(fp_mcs_in: str, n_threads: int = None):
+def main(
+        fp_mcs_in: str, n_threads: int = None, resume: bool = False, cache: str = None, remote: str = None,
+        authkey: str = None, iso834_table: bool = False, table_cache: str = None, seed: int = None,
+):
     fp_mcs_in = os.path.realpath(fp_mcs_in)
 
     mcs = MCS0()
@@ -25,7 +28,23 @@ def main(fp_mcs_in: str, n_threads: int = None):
     except KeyError:
         pass
 
-    mcs.run_mcs()
+    if seed is not None:
+        mcs.mcs_config = dict(mcs.mcs_config, seed=seed)
+
+    if cache:
+        mcs.mcs_config = dict(mcs.mcs_config, cache_dir=cache)
+
+    if iso834_table or table_cache:
+        # ISO 834 steel temperature tables, kept at `table_cache` shared by worker processes and runs if defined
+        mcs.mcs_config = dict(mcs.mcs_config, iso834_table=True, iso834_table_cache_dir=table_cache)
+
+    if remote:
+        # tasks are served at `remote` address to workers started by `sfeprapy worker`
+        mcs.mcs_config = dict(
+            mcs.mcs_config, executor='remote', executor_kwargs=dict(address=remote, authkey=authkey)
+        )
+
+    mcs.run_mcs(resume=resume)
 
 
 if __name__ == "__main__":
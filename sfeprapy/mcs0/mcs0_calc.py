@@ -2,13 +2,13 @@
 import copy
 import os
 import threading
+import time
 import warnings
 from typing import Union, Callable
 
 import numpy as np
 import pandas as pd
 from fsetools.lib.fse_bs_en_1991_1_2_parametric_fire import temperature as _fire_param
-from fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c import protection_thickness as _protection_thickness
 from fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c import temperature as _steel_temperature
 from fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c import temperature_max as _steel_temperature_max
 from fsetools.lib.fse_din_en_1991_1_2_parametric_fire import temperature as _fire_param_ger
@@ -16,7 +16,15 @@ from fsetools.lib.fse_travelling_fire import temperature as fire_travelling
 from scipy.interpolate import interp1d
 
 from sfeprapy.func.asciiplot import AsciiPlot
+from sfeprapy.func.fire_parametric import temperature_din as _fire_param_ger_batch
+from sfeprapy.func.fire_parametric import temperature_ec as _fire_param_batch
+from sfeprapy.func.fire_travelling import worst_case_beam_location
+from sfeprapy.func.heat_transfer_protected_steel_ec import temperature_max as _steel_temperature_max_batch
+from sfeprapy.func.heat_transfer_protected_steel_ec import time_to_temperature as _steel_time_to_temperature
+from sfeprapy.func.iso834_steel_table import iso834_steel_table
 from sfeprapy.func.mcs import MCS
+from sfeprapy.func.mcs_profile import profile_record, profile_stage
+from sfeprapy.func.pd_6688_1_2_2007 import annex_b_equivalent_time_of_fire_exposure
 
 
 def _fire_travelling(**kwargs):
@@ -183,7 +191,8 @@ def evaluate_fire_temperature(
     :param beam_position_vertical:
     :param fire_hrr_density: [MW m-2], fire maximum release rate per unit area
     :param fire_spread_speed: [m s-1], TRAVELLING FIRE, fire spread speed
-    :param beam_position_horizontal: [s], beam location, will be solved for the worst case if less than 0.
+    :param beam_position_horizontal: [m], beam location, will be solved for the worst case if less than 0, see
+        `sfeprapy.func.fire_travelling.worst_case_beam_location`.
     :param fire_nft_limit: [K], TRAVELLING FIRE, maximum temperature of near field temperature
     :return:
     EXAMPLE:
@@ -217,9 +226,6 @@ def evaluate_fire_temperature(
         fire_temperature = _fire_param(**kwargs_fire_0_paramec)
 
     elif fire_type == 1:
-        if beam_position_horizontal < 0:
-            beam_position_horizontal = np.linspace(0.5 * room_depth, room_depth, 7)[1:-1]
-
         kwargs_fire_1_travel = dict(
             t=fire_time,
             fire_load_density_MJm2=fire_load_density_deducted,
@@ -234,7 +240,11 @@ def evaluate_fire_temperature(
             opening_height_m=window_height,
             opening_fraction=window_open_fraction,
         )
-        fire_temperature, beam_position_horizontal = _fire_travelling(**kwargs_fire_1_travel)
+        if beam_position_horizontal < 0:
+            fire_temperature, beam_position_horizontal, _ = worst_case_beam_location(**kwargs_fire_1_travel)
+            fire_temperature, beam_position_horizontal = fire_temperature[0] + 273.15, beam_position_horizontal[0]
+        else:
+            fire_temperature, beam_position_horizontal = _fire_travelling(**kwargs_fire_1_travel)
 
         if beam_position_horizontal <= 0:
             raise ValueError("Beam position less or equal to 0.")
@@ -274,6 +284,11 @@ def solve_time_equivalence_iso834(
         solver_temperature_goal: float,
         solver_protection_thickness: float,
         phi_teq: float,
+        solver_thickness_lbound: float = None,
+        solver_thickness_ubound: float = None,
+        iso834_table: bool = False,
+        iso834_table_cache_dir: str = None,
+        iso834_table_cache_max_size: int = None,
         *_,
         **__,
 ) -> dict:
@@ -295,8 +310,12 @@ def solve_time_equivalence_iso834(
     :param fire_temperature_iso834: [K], the temperature (array) component of ISO 834 fire curve
     :param solver_temperature_goal: [K], steel beam element expected failure temperature
     :param solver_max_iter: Maximum allowable iteration counts for seeking solution for time equivalence
-    :param solver_thickness_ubound: [m], protection layer thickness upper bound initial condition for solving time equivalence
-    :param solver_thickness_lbound: [m], protection layer thickness lower bound initial condition for solving time equivalence
+    :param solver_thickness_ubound: [m], optional, protection layer thickness upper bound, bounds of the ISO 834 steel
+        temperature table of the case, see `sfeprapy.func.iso834_steel_table.iso834_steel_table`
+    :param solver_thickness_lbound: [m], optional, protection layer thickness lower bound, see `solver_thickness_ubound`
+    :param iso834_table: interpolate from the ISO 834 steel temperature table of the case if True, see `teq_main`
+    :param iso834_table_cache_dir: optional, on-disk cache of the ISO 834 steel temperature tables, see `teq_main`
+    :param iso834_table_cache_max_size: [byte], optional, maximum size of `iso834_table_cache_dir`
     :param solver_tol: [K], tolerance for solving time equivalence
     :param phi_teq: [-], model uncertainty factor
     :return results: dict
@@ -312,7 +331,24 @@ def solve_time_equivalence_iso834(
     # Solve equivalent time exposure in ISO 834
     solver_d_p = solver_protection_thickness
 
-    if -np.inf < solver_d_p < np.inf:
+    table = None
+    if iso834_table and -np.inf < solver_d_p < np.inf and (
+            solver_thickness_lbound is not None and solver_thickness_ubound is not None):
+        table = iso834_steel_table(
+            fire_time_iso834, fire_temperature_iso834, d_p_1=solver_thickness_lbound, d_p_2=solver_thickness_ubound,
+            beam_rho=beam_rho, beam_cross_section_area=beam_cross_section_area, protection_k=protection_k,
+            protection_rho=protection_rho, protection_c=protection_c,
+            protection_protected_perimeter=protection_protected_perimeter,
+            cache_dir=iso834_table_cache_dir, cache_max_size=iso834_table_cache_max_size,
+        )
+
+    if table is not None and table.is_within(solver_d_p):
+        solver_time_equivalence_solved = table.time_to_temperature(solver_temperature_goal, solver_d_p)[0]
+        if np.isnan(solver_time_equivalence_solved):
+            solver_time_equivalence_solved = -1  # same as the `fill_value` below
+        solver_time_equivalence_solved = solver_time_equivalence_solved * phi_teq
+
+    elif -np.inf < solver_d_p < np.inf:
         steel_temperature = _steel_temperature(
             fire_time=fire_time_iso834,
             fire_temperature=fire_temperature_iso834,
@@ -343,6 +379,158 @@ def solve_time_equivalence_iso834(
     return dict(solver_time_equivalence_solved=solver_time_equivalence_solved)
 
 
+def _protection_thickness(
+        fire_time: np.ndarray,
+        fire_temperature: np.ndarray,
+        beam_rho: float,
+        beam_cross_section_area: float,
+        protection_k: float,
+        protection_rho: float,
+        protection_c: float,
+        protection_protected_perimeter: float,
+        solver_temperature_goal: float,
+        solver_temperature_goal_tol: float,
+        solver_max_iter: int,
+        d_p_1: float,
+        d_p_2: float,
+) -> tuple:
+    """Protection thickness at which the peak steel temperature is `solver_temperature_goal`. Counterpart of
+    `protection_thickness` in `fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c`, same parameters, bounds checks and
+    outputs, but solved by regula falsi (Illinois variant) within [`d_p_1`, `d_p_2`] in place of bisection from a
+    random initial guess, which takes about half the steel heat transfer solves to converge.
+
+    :return d_p: [m], protection thickness, -inf if the goal is not reached at `d_p_1`, inf if exceeded at `d_p_2`, nan
+        if not converged within `solver_max_iter` iterations.
+    :return T_max: [K], peak steel temperature at `d_p`.
+    :return t: [s], time of the peak steel temperature.
+    :return iter_count: number of iterations.
+    """
+    fire_time = np.ascontiguousarray(fire_time, dtype=float)
+    fire_temperature = np.ascontiguousarray(fire_temperature, dtype=float)
+
+    def f(d_p: float) -> tuple:
+        T_max_, t_ = _steel_temperature_max(
+            fire_time=fire_time, fire_temperature=fire_temperature, beam_rho=beam_rho,
+            beam_cross_section_area=beam_cross_section_area, protection_k=protection_k, protection_rho=protection_rho,
+            protection_c=protection_c, protection_thickness=d_p,
+            protection_protected_perimeter=protection_protected_perimeter,
+        )
+        return T_max_ - solver_temperature_goal, T_max_, t_
+
+    f_1, T_max_1, _ = f(d_p_1)
+    f_2, T_max_2, t = f(d_p_2)
+    if f_1 < solver_temperature_goal_tol:
+        return -np.inf, T_max_1, t, 0  # too cool at the lower bound
+    if f_2 > -solver_temperature_goal_tol:
+        return np.inf, T_max_2, t, 0  # too hot at the upper bound
+
+    # peak steel temperature decreases with thickness, i.e. f_1 > 0 > f_2
+    side, iter_count = 0, 0  # bound moved in the last iteration, 1 for `d_p_1` and -1 for `d_p_2`
+    while iter_count <= solver_max_iter:
+        d_p = d_p_2 - f_2 * (d_p_2 - d_p_1) / (f_2 - f_1)
+        f_, T_max, t = f(d_p)
+        if abs(f_) < solver_temperature_goal_tol:
+            return d_p, T_max, t, iter_count
+        # the bound which did not move twice in a row is halved (Illinois)
+        if f_ > 0:  # steel temperature is too high, increase thickness
+            if side == 1:
+                f_2 /= 2
+            d_p_1, f_1, side = d_p, f_, 1
+        else:  # steel temperature is too low, decrease thickness
+            if side == -1:
+                f_1 /= 2
+            d_p_2, f_2, side = d_p, f_, -1
+        iter_count += 1
+
+    return np.nan, np.nan, np.nan, np.nan
+
+
+def _protection_thickness_batch(
+        fire_time: np.ndarray,
+        fire_temperature: np.ndarray,
+        beam_rho: np.ndarray,
+        beam_cross_section_area: np.ndarray,
+        protection_k: np.ndarray,
+        protection_rho: np.ndarray,
+        protection_c: np.ndarray,
+        protection_protected_perimeter: np.ndarray,
+        solver_temperature_goal: np.ndarray,
+        solver_temperature_goal_tol: np.ndarray,
+        solver_max_iter: np.ndarray,
+        d_p_1: np.ndarray,
+        d_p_2: np.ndarray,
+) -> tuple:
+    """Vectorised version of `_protection_thickness`, all samples are iterated in lockstep. Each iteration solves the
+    peak steel temperature of all samples not yet converged by one numpy integration over (samples x time), see
+    `sfeprapy.func.heat_transfer_protected_steel_ec.temperature_max`, samples are masked out once converged or out of
+    iterations.
+
+    :param fire_time: [s], (n_t,) time array shared by all samples.
+    :param fire_temperature: [K], (n_s, n_t) fire temperature.
+    :param: all other parameters are (n_s,) arrays, see `_protection_thickness`.
+    :return: d_p, T_max, t, iter_count, (n_s,) arrays each, see `_protection_thickness`.
+    """
+    fire_time = np.asarray(fire_time, dtype=float)
+    fire_temperature = np.atleast_2d(np.asarray(fire_temperature, dtype=float))
+    n_s = fire_temperature.shape[0]
+    rho_a, V, k_p, rho_p, c_p, A_p, T_goal, tol, n_max, d_p_1, d_p_2 = [
+        np.array(np.broadcast_to(np.asarray(v, dtype=float), (n_s,))) for v in (
+            beam_rho, beam_cross_section_area, protection_k, protection_rho, protection_c,
+            protection_protected_perimeter, solver_temperature_goal, solver_temperature_goal_tol, solver_max_iter,
+            d_p_1, d_p_2,
+        )
+    ]
+
+    def f(d_p: np.ndarray, i: np.ndarray) -> tuple:
+        T_max_, t_ = _steel_temperature_max_batch(
+            fire_time=fire_time, fire_temperature=fire_temperature[i], beam_rho=rho_a[i],
+            beam_cross_section_area=V[i], protection_k=k_p[i], protection_rho=rho_p[i], protection_c=c_p[i],
+            protection_thickness=d_p, protection_protected_perimeter=A_p[i],
+        )
+        return T_max_ - T_goal[i], T_max_, t_
+
+    d_p, T_max, t, iter_count = [np.full((n_s,), np.nan) for _ in range(4)]
+
+    # both bounds of all samples in one integration
+    i_s = np.arange(n_s)
+    f_, T_max_, t_ = f(np.concatenate([d_p_1, d_p_2]), np.concatenate([i_s, i_s]))
+    f_1, f_2, T_max_1, T_max_2 = f_[:n_s], f_[n_s:], T_max_[:n_s], T_max_[n_s:]
+    is_thin = f_1 < tol  # too cool at the lower bound
+    is_thick = ~is_thin & (f_2 > -tol)  # too hot at the upper bound
+    d_p[is_thin], T_max[is_thin] = -np.inf, T_max_1[is_thin]
+    d_p[is_thick], T_max[is_thick] = np.inf, T_max_2[is_thick]
+    i = np.flatnonzero(is_thin | is_thick)
+    t[i], iter_count[i] = t_[n_s:][i], 0  # time of the peak at the upper bound, same as `_protection_thickness`
+
+    # peak steel temperature decreases with thickness, i.e. f_1 > 0 > f_2
+    side = np.zeros((n_s,), dtype=int)  # bound moved in the last iteration, 1 for `d_p_1` and -1 for `d_p_2`
+    n_iter = np.zeros((n_s,), dtype=int)
+    live = np.flatnonzero(~(is_thin | is_thick) & (n_max >= 0))
+    while len(live) > 0:
+        d_p_ = d_p_2[live] - f_2[live] * (d_p_2[live] - d_p_1[live]) / (f_2[live] - f_1[live])
+        f_, T_max_, t_ = f(d_p_, live)
+
+        is_converged = np.abs(f_) < tol[live]
+        i = live[is_converged]
+        d_p[i], T_max[i], t[i], iter_count[i] = d_p_[is_converged], T_max_[is_converged], t_[is_converged], n_iter[i]
+
+        # the bound which did not move twice in a row is halved (Illinois)
+        is_hot = ~is_converged & (f_ > 0)  # steel temperature is too high, increase thickness
+        i = live[is_hot]
+        f_2[i[side[i] == 1]] /= 2
+        d_p_1[i], f_1[i], side[i] = d_p_[is_hot], f_[is_hot], 1
+        is_cool = ~is_converged & ~is_hot  # steel temperature is too low, decrease thickness
+        i = live[is_cool]
+        f_1[i[side[i] == -1]] /= 2
+        d_p_2[i], f_2[i], side[i] = d_p_[is_cool], f_[is_cool], -1
+
+        live = live[~is_converged]
+        n_iter[live] += 1
+        live = live[n_iter[live] <= n_max[live]]
+
+    return d_p, T_max, t, iter_count
+
+
 def solve_protection_thickness(
         fire_time: Union[list, np.ndarray],
         fire_temperature: Union[list, np.ndarray],
@@ -417,6 +605,9 @@ def solve_protection_thickness(
     )
 
 
+_post_per_case_threads = list()  # writers of `mcs_out_post_per_case`, joined by `mcs_out_post_all_cases`
+
+
 def mcs_out_post_per_case(df: pd.DataFrame, fp: str) -> pd.DataFrame:
     # save outputs if work direction is provided per iteration
     if fp:
@@ -428,10 +619,15 @@ def mcs_out_post_per_case(df: pd.DataFrame, fp: str) -> pd.DataFrame:
                 print(e)
             df.to_csv(os.path.join(fp_), index=False)
 
-        threading.Thread(target=_save_, kwargs=dict(fp_=fp)).start()
+        thread = threading.Thread(target=_save_, kwargs=dict(fp_=fp))
+        thread.start()
+        _post_per_case_threads.append(thread)
 
     df_res = copy.copy(df)
     df_res = df_res.replace(to_replace=[np.inf, -np.inf], value=np.nan)
+    if 'surrogate' in df_res and np.any(df_res['surrogate'].values):
+        # results not emulated are undefined for emulated samples
+        df_res = df_res[[k for k in df_res.columns if not df_res[k][df_res['surrogate'].values].isna().all()]]
     df_res = df_res.dropna(axis=0, how="any")
 
     dict_ = dict()
@@ -468,7 +664,12 @@ def mcs_out_post_per_case(df: pd.DataFrame, fp: str) -> pd.DataFrame:
         x = np.array(df_res['solver_time_equivalence_solved'].values / 60, dtype=float)
         x[x == -np.inf] = 0
         x[x == np.inf] = np.amax(x[x != np.inf])
-        y = np.linspace(0, 1, len(x), dtype=float)
+        if 'sample_weight' in df_res and np.any(df_res['sample_weight'].values != 1):
+            # importance sampled, weighted CDF
+            i = np.argsort(x)
+            x, y = x[i], np.cumsum(df_res['sample_weight'].values[i]) / np.sum(df_res['sample_weight'].values)
+        else:
+            y = np.linspace(0, 1, len(x), dtype=float)
         aplot = AsciiPlot(size=(55, 15))
         aplot.plot(x=x, y=y, xlim=(20, min([180, np.amax(x)])))
         aplot.show()
@@ -530,9 +731,27 @@ def teq_main(
         timber_exposed_area: float = None,
         timber_solver_tol: float = None,
         timber_solver_ilim: float = None,
+        sample_weight: float = 1.,
+        iso834_table: bool = False,
+        iso834_table_cache_dir: str = None,
+        iso834_table_cache_max_size: int = None,
         *_,
         **__,
 ) -> dict:
+    """Solves time equivalence of one sample.
+
+    :param iso834_table: solve time equivalence in ISO 834 fire by interpolating the steel temperature table of the
+        case between `solver_thickness_lbound` and `solver_thickness_ubound` if True, otherwise by solving the heat
+        transfer. Decided per case (see `iso834_table` of `MCS.mcs_config`), so results are the same however the
+        samples are distributed. See `sfeprapy.func.iso834_steel_table.iso834_steel_table`.
+    :param iso834_table_cache_dir: optional, directory to keep the ISO 834 steel temperature tables, shared by worker
+        processes and runs, tables are kept in memory of each process only if undefined. See
+        `sfeprapy.func.iso834_steel_table.table_cache`.
+    :param iso834_table_cache_max_size: [byte], optional, the least recently used tables in `iso834_table_cache_dir`
+        are evicted beyond this size, unlimited by default.
+    :param: all other parameters are columns of the output of `sfeprapy.func.mcs_gen.main`.
+    :return: results of the sample.
+    """
     # Make the longest dimension between (room_depth, room_breadth) as room_depth
     if room_depth < room_breadth:
         room_depth += room_breadth
@@ -560,6 +779,7 @@ def teq_main(
     timber_exposed_duration = 0  # initial condition, timber exposed duration
     _fire_load_density_ = inputs.pop('fire_load_density')  # preserve original fire load density
 
+    t0 = time.perf_counter()
     while True:
         timber_solver_iter_count += 1
         if isinstance(timber_charring_rate, (float, int)):
@@ -579,13 +799,16 @@ def teq_main(
         inputs['fire_load_density'] = _fire_load_density_ + timber_fire_load_density
 
         # To check what design fire to use
-        inputs.update(decide_fire(**inputs))
+        with profile_stage('decide_fire', index=index):
+            inputs.update(decide_fire(**inputs))
 
         # To calculate design fire temperature
-        inputs.update(evaluate_fire_temperature(**inputs))
+        with profile_stage('evaluate_fire_temperature', index=index):
+            inputs.update(evaluate_fire_temperature(**inputs))
 
         # To solve protection thickness at critical temperature
-        inputs.update(solve_protection_thickness(**inputs))
+        with profile_stage('solve_protection_thickness', index=index):
+            inputs.update(solve_protection_thickness(**inputs))
 
         # additional fuel contribution from timber
         if timber_exposed_area <= 0 or timber_exposed_area is None:  # no timber exposed
@@ -610,8 +833,13 @@ def teq_main(
             break
         else:
             timber_exposed_duration = inputs["solver_time_solved"]
+    # the timber fuel contribution loop as a whole, one call per iteration
+    profile_record(
+        'timber_iteration', time.perf_counter() - t0, index=index, n_calls=timber_solver_iter_count + 1
+    )
 
-    inputs.update(solve_time_equivalence_iso834(**inputs))
+    with profile_stage('solve_time_equivalence_iso834', index=index):
+        inputs.update(solve_time_equivalence_iso834(**inputs))
 
     inputs.update(
         dict(
@@ -632,15 +860,501 @@ def teq_main(
         ['phi_teq', 'fire_spread_speed', 'fire_nft_limit', 'fire_mode', 'fire_load_density', 'fire_hrr_density', 'fire_combustion_efficiency', 'beam_position_horizontal',
          # 'beam_position_vertical', 'index', 'probability_weight', 'case_name', 'fire_type', 'solver_convergence_status', 'solver_time_equivalence_solved',
          'beam_position_vertical', 'index', 'case_name', 'fire_type', 'solver_convergence_status', 'solver_time_equivalence_solved',
-         'solver_steel_temperature_solved', 'solver_protection_thickness', 'solver_iter_count', 'window_open_fraction', 'timber_solver_iter_count', 'timber_charred_depth']
+         'solver_steel_temperature_solved', 'solver_protection_thickness', 'solver_iter_count', 'window_open_fraction', 'timber_solver_iter_count', 'timber_charred_depth',
+         'sample_weight']
     }
 
     return outputs
 
 
-def mcs_out_post_all_cases(df: pd.DataFrame, fp: str):
+def decide_fire_batch(
+        window_height: np.ndarray,
+        window_width: np.ndarray,
+        window_open_fraction: np.ndarray,
+        room_breadth: np.ndarray,
+        room_depth: np.ndarray,
+        room_height: np.ndarray,
+        fire_mode: np.ndarray,
+        fire_load_density: np.ndarray,
+        fire_combustion_efficiency: np.ndarray,
+        fire_hrr_density: np.ndarray,
+        fire_spread_speed: np.ndarray,
+        *_,
+        **__,
+) -> dict:
+    """Vectorised version of `decide_fire`, all parameters are arrays of the same length (one item per sample).
+
+    :return: dict(fire_type=np.ndarray)
+    """
+
+    fire_mode = np.asarray(fire_mode)
+
+    fire_load_density_deducted = fire_load_density * fire_combustion_efficiency
+    window_area = window_height * window_width * window_open_fraction
+    room_floor_area = room_breadth * room_depth
+    room_total_area = (2 * room_floor_area) + ((room_breadth + room_depth) * 2 * room_height)
+    fire_load_density_total = fire_load_density_deducted * room_floor_area / room_total_area
+    opening_factor = window_area * np.sqrt(window_height) / room_total_area
+    fire_spread_entire_room_time = room_depth / fire_spread_speed
+    burn_out_time = np.maximum(fire_load_density_deducted / fire_hrr_density, 900.0)
+
+    is_param_ec = (
+            (fire_spread_entire_room_time < burn_out_time)
+            & (0.01 < opening_factor) & (opening_factor <= 0.2)
+            & (50 <= fire_load_density_total) & (fire_load_density_total <= 1000)
+    )
+    is_param_din = (
+            (fire_spread_entire_room_time < burn_out_time)
+            & (0.125 <= (window_area / room_floor_area)) & ((window_area / room_floor_area) <= 0.5)
+    )
+
+    if not np.all(np.isin(fire_mode, (0, 1, 2, 3, 4))):
+        raise ValueError(f"Unknown fire mode {fire_mode[~np.isin(fire_mode, (0, 1, 2, 3, 4))][0]}.")
+
+    fire_type = np.select(
+        [fire_mode <= 2, fire_mode == 3, fire_mode == 4],
+        [fire_mode, np.where(is_param_ec, 0, 1), np.where(is_param_din, 2, 1)],
+    ).astype(int)
+
+    return dict(fire_type=fire_type)
+
+
+def evaluate_fire_temperature_batch(fire_time: np.ndarray, fire_type: np.ndarray, **kwargs) -> dict:
+    """Batch version of `evaluate_fire_temperature`, returns fire temperature of all samples as a (samples x time)
+    array.
+
+    :param fire_time: [s], (n_t,) time array shared by all samples.
+    :param fire_type: [-], (n_s,) fire type of each sample, see `decide_fire`.
+    :param kwargs: all other parameters of `evaluate_fire_temperature`, each an (n_s,) array.
+    :return: dict(fire_temperature=(n_s, n_t) array, beam_position_horizontal=(n_s,) array)
+    """
+
+    n_s = len(fire_type)
+    fire_temperature = np.full((n_s, len(fire_time)), np.nan, dtype=float)
+    beam_position_horizontal = np.array(kwargs.pop('beam_position_horizontal'), dtype=float)
+
+    # travelling fire worst case beam location, searched for all samples at once in blocks of bounded memory
+    is_search = (fire_type == 1) & (beam_position_horizontal < 0)
+    i_search = np.flatnonzero(is_search)
+    for i_0 in range(0, len(i_search), 256):
+        i = i_search[i_0:i_0 + 256]
+        fire_temperature[i], beam_position_horizontal[i], _ = worst_case_beam_location(
+            t=fire_time,
+            fire_load_density_MJm2=kwargs['fire_load_density'][i] * kwargs['fire_combustion_efficiency'][i],
+            fire_hrr_density_MWm2=kwargs['fire_hrr_density'][i],
+            room_length_m=kwargs['room_depth'][i],
+            room_width_m=kwargs['room_breadth'][i],
+            fire_spread_rate_ms=kwargs['fire_spread_speed'][i],
+            beam_location_height_m=kwargs['beam_position_vertical'][i],
+            fire_nft_limit_c=kwargs['fire_nft_limit'][i] - 273.15,
+        )
+        fire_temperature[i] += 273.15
+
+    # parametric fires, solved for all samples at once in blocks of bounded memory
+    fire_load_density_deducted = kwargs['fire_load_density'] * kwargs['fire_combustion_efficiency']
+    window_area = kwargs['window_height'] * kwargs['window_width'] * kwargs['window_open_fraction']
+    room_floor_area = kwargs['room_breadth'] * kwargs['room_depth']
+    room_total_area = 2 * room_floor_area + (kwargs['room_breadth'] + kwargs['room_depth']) * 2 * kwargs['room_height']
+    is_param_ec, is_param_din = fire_type == 0, fire_type == 2
+    i_param_ec, i_param_din = np.flatnonzero(is_param_ec), np.flatnonzero(is_param_din)
+    for i_0 in range(0, len(i_param_ec), 1024):
+        i = i_param_ec[i_0:i_0 + 1024]
+        fire_temperature[i] = _fire_param_batch(
+            t=fire_time,
+            A_t=room_total_area[i],
+            A_f=room_floor_area[i],
+            A_v=window_area[i],
+            h_eq=kwargs['window_height'][i],
+            q_fd=fire_load_density_deducted[i] * 1e6,
+            lambda_=kwargs['room_wall_thermal_inertia'][i] ** 2,
+            rho=1,
+            c=1,
+            t_lim=kwargs['fire_tlim'][i],
+            temperature_initial=20 + 273.15,
+        )
+    for i_0 in range(0, len(i_param_din), 1024):
+        i = i_param_din[i_0:i_0 + 1024]
+        fire_temperature[i] = _fire_param_ger_batch(
+            t_array_s=fire_time,
+            A_w_m2=window_area[i],
+            h_w_m2=kwargs['window_height'][i],
+            A_t_m2=room_total_area[i],
+            A_f_m2=room_floor_area[i],
+            t_alpha_s=kwargs['fire_t_alpha'][i],
+            b_Jm2s05K=kwargs['room_wall_thermal_inertia'][i],
+            q_x_d_MJm2=fire_load_density_deducted[i],
+            gamma_fi_Q=kwargs['fire_gamma_fi_q'][i],
+        )
+
+    for i in np.flatnonzero(~(is_search | is_param_ec | is_param_din)):
+        res = evaluate_fire_temperature(
+            fire_time=fire_time,
+            fire_type=fire_type[i],
+            beam_position_horizontal=beam_position_horizontal[i],
+            **{k: v[i] for k, v in kwargs.items()}
+        )
+        if res['fire_temperature'] is not None:
+            fire_temperature[i, :] = res['fire_temperature']
+        beam_position_horizontal[i] = res['beam_position_horizontal']
+
+    return dict(fire_temperature=fire_temperature, beam_position_horizontal=beam_position_horizontal)
+
+
+def solve_protection_thickness_batch(fire_time: np.ndarray, fire_temperature: np.ndarray, **kwargs) -> dict:
+    """Batch version of `solve_protection_thickness`, all samples are solved at once by `_protection_thickness_batch`.
+
+    :param fire_time: [s], (n_t,) time array shared by all samples.
+    :param fire_temperature: [K], (n_s, n_t) fire temperature of all samples.
+    :param kwargs: all other parameters of `solve_protection_thickness`, each an (n_s,) array.
+    :return: dict of (n_s,) arrays, same keys as `solve_protection_thickness`.
+    """
+
+    d_p, T_max, t, iter_count = _protection_thickness_batch(
+        fire_time=fire_time,
+        fire_temperature=fire_temperature,
+        beam_rho=kwargs['beam_rho'],
+        beam_cross_section_area=kwargs['beam_cross_section_area'],
+        protection_k=kwargs['protection_k'],
+        protection_rho=kwargs['protection_rho'],
+        protection_c=kwargs['protection_c'],
+        protection_protected_perimeter=kwargs['protection_protected_perimeter'],
+        solver_temperature_goal=kwargs['solver_temperature_goal'],
+        solver_temperature_goal_tol=kwargs['solver_tol'],
+        solver_max_iter=kwargs['solver_max_iter'],
+        d_p_1=kwargs['solver_thickness_lbound'],
+        d_p_2=kwargs['solver_thickness_ubound'],
+    )
+
+    return dict(
+        solver_convergence_status=(-np.inf < d_p) & (d_p < np.inf),
+        solver_steel_temperature_solved=T_max,
+        solver_time_solved=t,
+        solver_protection_thickness=d_p,
+        solver_iter_count=iter_count,
+    )
+
+
+def solve_time_equivalence_iso834_batch(
+        fire_time_iso834: np.ndarray,
+        fire_temperature_iso834: np.ndarray,
+        solver_temperature_goal: np.ndarray,
+        solver_protection_thickness: np.ndarray,
+        phi_teq: np.ndarray,
+        beam_cross_section_area: np.ndarray,
+        beam_rho: np.ndarray,
+        protection_k: np.ndarray,
+        protection_rho: np.ndarray,
+        protection_c: np.ndarray,
+        protection_protected_perimeter: np.ndarray,
+        solver_thickness_lbound: np.ndarray = None,
+        solver_thickness_ubound: np.ndarray = None,
+        iso834_table: bool = False,
+        iso834_table_cache_dir: str = None,
+        iso834_table_cache_max_size: int = None,
+        *_,
+        **__,
+) -> dict:
+    """Vectorised version of `solve_time_equivalence_iso834`, the steel heating in ISO 834 fire is solved for all
+    samples at once.
+
+    :param fire_time_iso834: [s], (n_t,) time array.
+    :param fire_temperature_iso834: [K], (n_t,) ISO 834 fire temperature.
+    :param solver_protection_thickness: [m], (n_s,) solved protection thickness, can be inf, -inf or nan.
+    :param solver_thickness_lbound: [m], optional, (n_s,) bounds of the ISO 834 steel temperature table of the samples
+        sharing the same steel and protection properties, see `sfeprapy.func.iso834_steel_table.iso834_steel_table`.
+    :param solver_thickness_ubound: [m], optional, (n_s,) see `solver_thickness_lbound`.
+    :param iso834_table: interpolate from the ISO 834 steel temperature tables if True, see `teq_main`.
+    :param iso834_table_cache_dir: optional, see `teq_main`.
+    :param iso834_table_cache_max_size: optional, see `teq_main`.
+    :param: all other parameters are (n_s,) arrays, see `solve_time_equivalence_iso834`.
+    :return: dict(solver_time_equivalence_solved=(n_s,) array)
+    """
+
+    solver_d_p = np.asarray(solver_protection_thickness, dtype=float)
+    teq = np.array(solver_d_p, dtype=float)  # inf, -inf and nan are carried over
+    t = np.full(solver_d_p.shape, np.nan)
+
+    finite = np.isfinite(solver_d_p)
+    if iso834_table and np.any(finite) and (
+            solver_thickness_lbound is not None and solver_thickness_ubound is not None):
+        # samples of the same properties share one table
+        properties = np.stack([np.broadcast_to(np.asarray(v, dtype=float), solver_d_p.shape)[finite] for v in [
+            solver_thickness_lbound, solver_thickness_ubound, beam_rho, beam_cross_section_area, protection_k,
+            protection_rho, protection_c, protection_protected_perimeter,
+        ]], axis=1)
+        properties_unique, group = np.unique(properties, axis=0, return_inverse=True)
+        group = group.ravel()
+        i_finite = np.flatnonzero(finite)
+        for i_group, (d_p_1, d_p_2, *properties_) in enumerate(properties_unique):
+            i = i_finite[group == i_group]
+            table = iso834_steel_table(
+                fire_time_iso834, fire_temperature_iso834, d_p_1, d_p_2, *properties_,
+                cache_dir=iso834_table_cache_dir, cache_max_size=iso834_table_cache_max_size,
+            )
+            if table is None:
+                continue
+            i = i[table.is_within(solver_d_p[i])]
+            t[i] = table.time_to_temperature(solver_temperature_goal[i], solver_d_p[i])
+            finite[i] = False  # solved
+
+    if np.any(finite):
+        t[finite] = _steel_time_to_temperature(
+            fire_time=fire_time_iso834,
+            fire_temperature=fire_temperature_iso834,
+            temperature_goal=solver_temperature_goal[finite],
+            beam_rho=beam_rho[finite],
+            beam_cross_section_area=beam_cross_section_area[finite],
+            protection_k=protection_k[finite],
+            protection_rho=protection_rho[finite],
+            protection_c=protection_c[finite],
+            protection_thickness=solver_d_p[finite],
+            protection_protected_perimeter=protection_protected_perimeter[finite],
+        )
+
+    solved = np.isfinite(solver_d_p)
+    t[np.isnan(t)] = -1  # same as the `fill_value` in `solve_time_equivalence_iso834`
+    teq[solved] = t[solved] * phi_teq[solved]
+
+    return dict(solver_time_equivalence_solved=teq)
+
+
+def teq_main_batch(
+        df: pd.DataFrame,
+        iso834_table: bool = False,
+        iso834_table_cache_dir: str = None,
+        iso834_table_cache_max_size: int = None,
+) -> pd.DataFrame:
+    """Columnar version of `teq_main`, solves all samples in `df` at once.
+
+    :param df: sampled input parameters, one row per sample, i.e. the output of `sfeprapy.func.mcs_gen.main`. Columns
+        are the same as the parameters of `teq_main`. `fire_time_duration` and `fire_time_step` must be the same for
+        all samples.
+    :param iso834_table: see `teq_main`.
+    :param iso834_table_cache_dir: see `teq_main`.
+    :param iso834_table_cache_max_size: see `teq_main`.
+    :return: results, one row per sample, same columns as the dict returned by `teq_main`.
+    """
+
+    n_s = len(df.index)
+
+    def col(k: str, default=None, dtype=float) -> np.ndarray:
+        if k in df:
+            return df[k].to_numpy(dtype=dtype)
+        return np.full((n_s,), default, dtype=dtype)
+
+    inputs = {k: col(k) for k in [
+        'beam_cross_section_area', 'beam_position_vertical', 'beam_position_horizontal', 'beam_rho',
+        'fire_combustion_efficiency', 'fire_gamma_fi_q', 'fire_hrr_density', 'fire_load_density', 'fire_nft_limit',
+        'fire_spread_speed', 'fire_t_alpha', 'fire_tlim', 'protection_c', 'protection_k',
+        'protection_protected_perimeter', 'protection_rho', 'room_height', 'room_wall_thermal_inertia',
+        'solver_temperature_goal', 'solver_thickness_lbound', 'solver_thickness_ubound', 'solver_tol',
+        'window_width', 'window_open_fraction_permanent',
+    ]}
+    inputs['fire_mode'] = col('fire_mode', dtype=int)
+    inputs['solver_max_iter'] = col('solver_max_iter', dtype=int)
+    inputs['phi_teq'] = col('phi_teq', 1.0)
+    inputs['sample_weight'] = col('sample_weight', 1.)
+    timber_exposed_area = col('timber_exposed_area', 0.)
+    timber_hc, timber_density = col('timber_hc'), col('timber_density')
+    timber_solver_tol, timber_solver_ilim = col('timber_solver_tol'), col('timber_solver_ilim')
+    timber_charring_rate = df['timber_charring_rate'].to_numpy(dtype=object)
+
+    # Make the longest dimension between (room_depth, room_breadth) as room_depth
+    room_breadth, room_depth = col('room_breadth'), col('room_depth')
+    inputs['room_depth'] = np.maximum(room_depth, room_breadth)
+    inputs['room_breadth'] = np.minimum(room_depth, room_breadth)
+
+    window_open_fraction_permanent = inputs['window_open_fraction_permanent']
+    inputs['window_open_fraction'] = (
+            col('window_open_fraction') * (1 - window_open_fraction_permanent) + window_open_fraction_permanent)
+
+    # Fix ventilation opening size so it doesn't exceed wall area
+    inputs['window_height'] = np.minimum(col('window_height'), inputs['room_height'])
+
+    # Calculate fire time, this is used for all fire curves in the calculation
+    fire_time_duration, fire_time_step = np.unique(col('fire_time_duration')), np.unique(col('fire_time_step'))
+    if len(fire_time_duration) > 1 or len(fire_time_step) > 1:
+        raise ValueError('`fire_time_duration` and `fire_time_step` must be the same for all samples in a batch')
+    fire_time = np.arange(0, fire_time_duration[0] + fire_time_step[0], fire_time_step[0])
+
+    # Calculate ISO 834 fire temperature
+    fire_time_iso834 = fire_time
+    fire_temperature_iso834 = (345.0 * np.log10((fire_time / 60.0) * 8.0 + 1.0) + 20.0) + 273.15  # in [K]
+
+    # initialise solver iteration count for timber fuel contribution
+    _fire_load_density_ = inputs.pop('fire_load_density')  # preserve original fire load density
+    timber_solver_iter_count = np.full((n_s,), -1, dtype=int)
+    timber_exposed_duration = np.zeros((n_s,), dtype=float)  # initial condition, timber exposed duration
+    timber_charring_rate_i, timber_charred_depth, timber_fire_load = [np.zeros((n_s,), dtype=float) for _ in range(3)]
+    timber_charred_volume, timber_charred_mass = [np.zeros((n_s,), dtype=float) for _ in range(2)]
+    outputs = dict(
+        fire_load_density=np.zeros((n_s,), dtype=float),
+        fire_type=np.zeros((n_s,), dtype=int),
+        solver_convergence_status=np.zeros((n_s,), dtype=object),
+        solver_steel_temperature_solved=np.zeros((n_s,), dtype=float),
+        solver_time_solved=np.zeros((n_s,), dtype=float),
+        solver_protection_thickness=np.zeros((n_s,), dtype=float),
+        solver_iter_count=np.zeros((n_s,), dtype=float),
+    )
+
+    live = np.arange(n_s)  # samples still iterating for timber fuel contribution
+    t0, n_iter = time.perf_counter(), 0
+    while len(live) > 0:
+        n_iter += 1
+        timber_solver_iter_count[live] += 1
+
+        # timber charring rate, numerical or Callable (e.g. a `ramp` input)
+        for i in live:
+            if isinstance(timber_charring_rate[i], (float, int)):
+                timber_charring_rate_i[i] = timber_charring_rate[i]
+            elif isinstance(timber_charring_rate[i], Callable):
+                timber_charring_rate_i[i] = timber_charring_rate[i](timber_exposed_duration[i])
+            else:
+                raise TypeError('`timber_charring_rate_i` is not numerical nor Callable type')
+        timber_charring_rate_i[live] *= 1 / 1000  # [mm/min] -> [m/min]
+        timber_charring_rate_i[live] *= 1 / 60  # [m/min] -> [m/s]
+        timber_charred_depth[live] = timber_charring_rate_i[live] * timber_exposed_duration[live]
+        timber_charred_volume[live] = timber_charred_depth[live] * timber_exposed_area[live]
+        timber_charred_mass[live] = timber_density[live] * timber_charred_volume[live]
+        timber_fire_load[live] = timber_charred_mass[live] * timber_hc[live]
+        timber_fire_load_density = timber_fire_load[live] / (inputs['room_breadth'][live] * inputs['room_depth'][live])
+
+        inputs_ = {k: v[live] for k, v in inputs.items()}
+        inputs_['fire_load_density'] = _fire_load_density_[live] + timber_fire_load_density
+
+        # To check what design fire to use
+        with profile_stage('decide_fire', n_samples=len(live)):
+            inputs_.update(decide_fire_batch(**inputs_))
+
+        # To calculate design fire temperature
+        with profile_stage('evaluate_fire_temperature', n_samples=len(live)):
+            inputs_.update(evaluate_fire_temperature_batch(
+                fire_time=fire_time,
+                **{k: inputs_[k] for k in [
+                    'window_height', 'window_width', 'window_open_fraction', 'room_breadth', 'room_depth',
+                    'room_height', 'room_wall_thermal_inertia', 'fire_tlim', 'fire_type', 'fire_nft_limit',
+                    'fire_load_density', 'fire_combustion_efficiency', 'fire_hrr_density', 'fire_spread_speed',
+                    'fire_t_alpha', 'fire_gamma_fi_q', 'beam_position_vertical', 'beam_position_horizontal',
+                ]}
+            ))
+        inputs['beam_position_horizontal'][live] = inputs_['beam_position_horizontal']
+
+        # To solve protection thickness at critical temperature
+        with profile_stage('solve_protection_thickness', n_samples=len(live)):
+            inputs_.update(solve_protection_thickness_batch(
+                fire_time=fire_time,
+                fire_temperature=inputs_['fire_temperature'],
+                **{k: inputs_[k] for k in [
+                    'beam_cross_section_area', 'beam_rho', 'protection_k', 'protection_rho', 'protection_c',
+                    'protection_protected_perimeter', 'solver_temperature_goal', 'solver_max_iter',
+                    'solver_thickness_ubound', 'solver_thickness_lbound', 'solver_tol',
+                ]}
+            ))
+        for k in outputs.keys():
+            outputs[k][live] = inputs_[k]
+
+        # additional fuel contribution from timber, same exit conditions as `teq_main`
+        d_p = inputs_['solver_protection_thickness']
+        is_no_timber = timber_exposed_area[live] <= 0
+        is_ilim = ~is_no_timber & (timber_solver_iter_count[live] >= timber_solver_ilim[live])
+        is_no_solution = ~is_no_timber & ~is_ilim & ~np.isfinite(d_p)
+        is_remaining = ~(is_no_timber | is_ilim | is_no_solution)
+        is_converged = is_remaining & (
+                np.abs(timber_exposed_duration[live] - inputs_['solver_time_solved']) <= timber_solver_tol[live])
+        is_next = is_remaining & ~is_converged
+
+        for k in ['solver_convergence_status', 'solver_steel_temperature_solved', 'solver_time_solved',
+                  'solver_protection_thickness', 'solver_iter_count']:
+            outputs[k][live[is_ilim]] = np.nan
+        timber_exposed_duration[live[is_ilim]] = np.nan
+        timber_exposed_duration[live[is_no_solution]] = d_p[is_no_solution]
+        timber_exposed_duration[live[is_next]] = inputs_['solver_time_solved'][is_next]
+
+        live = live[is_next]
+    profile_record('timber_iteration', time.perf_counter() - t0, n_samples=n_s, n_calls=n_iter)
+
+    inputs.update(outputs)
+    with profile_stage('solve_time_equivalence_iso834', n_samples=n_s):
+        inputs.update(solve_time_equivalence_iso834_batch(
+            fire_time_iso834=fire_time_iso834, fire_temperature_iso834=fire_temperature_iso834,
+            iso834_table=iso834_table, iso834_table_cache_dir=iso834_table_cache_dir,
+            iso834_table_cache_max_size=iso834_table_cache_max_size, **inputs
+        ))
+
+    inputs.update(
+        dict(
+            case_name=df['case_name'].to_numpy(),
+            index=df['index'].to_numpy(),
+            timber_charring_rate=timber_charring_rate_i,
+            timber_exposed_duration=timber_exposed_duration,
+            timber_solver_iter_count=timber_solver_iter_count,
+            timber_fire_load=timber_fire_load,
+            timber_charred_depth=timber_charred_depth,
+            timber_charred_mass=timber_charred_mass,
+            timber_charred_volume=timber_charred_volume,
+        )
+    )
+
+    # same items as `teq_main`
+    return pd.DataFrame({
+        i: inputs[i] for i in
+        ['phi_teq', 'fire_spread_speed', 'fire_nft_limit', 'fire_mode', 'fire_load_density', 'fire_hrr_density',
+         'fire_combustion_efficiency', 'beam_position_horizontal', 'beam_position_vertical', 'index', 'case_name',
+         'fire_type', 'solver_convergence_status', 'solver_time_equivalence_solved', 'solver_steel_temperature_solved',
+         'solver_protection_thickness', 'solver_iter_count', 'window_open_fraction', 'timber_solver_iter_count',
+         'timber_charred_depth', 'sample_weight']
+    }, index=df.index)
+
+
+def teq_annex_b_batch(df: pd.DataFrame) -> np.ndarray:
+    """Time equivalence of PD 6688-1-2 Annex B for all samples in `df`, a closed form counterpart of `teq_main_batch`
+    which is correlated with its `solver_time_equivalence_solved` and used as the control variate of it, see
+    `MCS.mcs_deterministic_calc_control`.
+
+    :param df: sampled input parameters, same as `teq_main_batch`.
+    :return: [s], time equivalence of each sample, nan if not applicable (i.e. floor area below 100 m2).
+    """
+    n_s = len(df.index)
+
+    def col(k: str, default=None) -> np.ndarray:
+        if k in df:
+            return df[k].to_numpy(dtype=float)
+        return np.full((n_s,), default, dtype=float)
+
+    window_open_fraction_permanent = col('window_open_fraction_permanent', 0.)
+    window_open_fraction = col('window_open_fraction') * (1 - window_open_fraction_permanent) + \
+        window_open_fraction_permanent
+    room_height = col('room_height')
+    return annex_b_equivalent_time_of_fire_exposure(
+        q_fk=col('fire_load_density'),
+        delta_1=col('fire_gamma_fi_q', 1.),
+        m=col('fire_combustion_efficiency'),
+        k_b=0.09,
+        A_f=col('room_breadth') * col('room_depth'),
+        H=room_height,
+        A_vh=0,
+        A_vv=col('window_width') * np.minimum(col('window_height'), room_height) * window_open_fraction,
+        delta_h=1,
+    ) * 60 * col('phi_teq', 1.)
+
+
+def mcs_out_post_all_cases(df: Union[pd.DataFrame, Callable], fp: str):
+    """Saves time equivalence of all samples to `fp`.
+
+    :param df: results of all cases, or a function returning the results of each case in turn with the given columns,
+        e.g. `MCS.mcs_out_per_case` for streamed results which are then written one case at a time.
+    :param fp: file path, nothing is saved if undefined.
+    """
+    # files of every case are complete once the run returns
+    while _post_per_case_threads:
+        _post_per_case_threads.pop().join()
     if fp:
-        df[['case_name', 'index', 'solver_time_equivalence_solved']].to_csv(fp, index=False)
+        read = (lambda columns_: [df[[k for k in columns_ if k in df]]]) if isinstance(df, pd.DataFrame) else df
+        columns = ['case_name', 'index', 'solver_time_equivalence_solved']
+        if any('sample_weight' in df_ and np.any(df_['sample_weight'].values != 1) for df_ in read(['sample_weight'])):
+            columns.append('sample_weight')  # importance sampled, fractiles are to be read from the weighted CDF
+        for i, df_ in enumerate(read(columns)):
+            df_.to_csv(fp, index=False, mode='w' if i == 0 else 'a', header=i == 0)
 
 
 class MCS0(MCS):
@@ -648,11 +1362,25 @@ class MCS0(MCS):
         super().__init__()
 
     def mcs_deterministic_calc(self, *args, **kwargs) -> dict:
-        return teq_main(*args, **kwargs)
+        return teq_main(*args, **kwargs, **self._iso834_table_kwargs())
 
     def mcs_deterministic_calc_mp(self, *args, **kwargs) -> dict:
         return teq_main_wrapper(*args, **kwargs)
 
+    def mcs_deterministic_calc_batch(self, *args, **kwargs) -> pd.DataFrame:
+        return teq_main_batch(*args, **kwargs, **self._iso834_table_kwargs())
+
+    def mcs_deterministic_calc_control(self, *args, **kwargs) -> np.ndarray:
+        return teq_annex_b_batch(*args, **kwargs)
+
+    def _iso834_table_kwargs(self) -> dict:
+        """`iso834_table` items of `MCS.mcs_config`, keyword arguments of `teq_main` and `teq_main_batch`."""
+        return dict(
+            iso834_table=bool(self.mcs_config.get('iso834_table')),
+            iso834_table_cache_dir=self.mcs_config.get('iso834_table_cache_dir'),
+            iso834_table_cache_max_size=self.mcs_config.get('iso834_table_cache_max_size'),
+        )
+
     def mcs_post_per_case(self, df: pd.DataFrame):
 
         case_name = df['case_name'].to_numpy()
@@ -666,13 +1394,14 @@ class MCS0(MCS):
 
         return mcs_out_post_per_case(df=df, fp=fp)
 
-    def mcs_post_all_cases(self, df: pd.DataFrame):
+    def mcs_post_all_cases(self, df: pd.DataFrame = None):
         try:
             fp = os.path.join(self.cwd, self.DEFAULT_MCS_OUTPUT_FILE_NAME)
         except TypeError:
             fp = None
 
-        return mcs_out_post_all_cases(df=df, fp=fp)
+        # streamed results are not loaded at once, i.e. `df` is None
+        return mcs_out_post_all_cases(df=df if df is not None else self.mcs_out_per_case, fp=fp)
 
 
 def _test_teq_phi():
@@ -746,48 +1475,847 @@ def _test_teq_phi():
     assert abs(teq_10 / teq_01 - 10) < 0.01
 
 
-def _test_standard_case():
+def _test_protection_thickness():
+    from fsetools.lib.fse_bs_en_1993_1_2_heat_transfer_c import protection_thickness as _protection_thickness_bisection
+
+    fire_time = np.arange(0, 18000 + 10, 10, dtype=float)
+    kwargs = dict(
+        beam_rho=7850., beam_cross_section_area=0.017, protection_k=0.2, protection_rho=800., protection_c=1700.,
+        protection_protected_perimeter=2.14, solver_temperature_goal=893.15, solver_temperature_goal_tol=1.,
+        solver_max_iter=20, d_p_1=0.0001, d_p_2=0.03,
+    )
+    def fire(T_peak: float) -> np.ndarray:  # heating to `T_peak` at 60 min then cooling
+        fire_temperature_ = np.minimum(293.15 + (T_peak - 293.15) * fire_time / 3600., T_peak)
+        return np.maximum(fire_temperature_ - np.maximum(fire_time - 3600., 0.) * 0.2, 293.15)
+
+    np.random.seed(0)  # initial guess of the fsetools bisection is random
+    n_iter, n_iter_bisection = list(), list()
+    for T_peak in [600., 900., 1000., 1100., 1200., 1300., 1500., 2500.]:
+        fire_temperature = fire(T_peak)
+        d_p, T_max, t, iter_count = _protection_thickness(fire_time, fire_temperature, **kwargs)
+        d_p_, T_max_, t_, iter_count_ = _protection_thickness_bisection(
+            fire_time=fire_time, fire_temperature=fire_temperature, **kwargs)
+        if np.isinf(d_p_):
+            assert d_p == d_p_ and T_max == T_max_ and t == t_ and iter_count == 0
+        else:
+            assert abs(T_max - 893.15) < 1 and abs(d_p - d_p_) < 1e-4
+            n_iter.append(iter_count), n_iter_bisection.append(iter_count_)
+    assert len(n_iter) > 3 and sum(n_iter) < 0.7 * sum(n_iter_bisection)
+
+    # not converged within `solver_max_iter` iterations
+    kwargs.update(solver_temperature_goal_tol=1e-9, solver_max_iter=2)
+    assert all(np.isnan(_protection_thickness(fire_time, fire(1200.), **kwargs)))
+
+    # all samples in lockstep, same as one by one
+    T_peak = np.array([600., 900., 1000., 1100., 1200., 1300., 1500., 2500.])
+    fire_temperature = np.stack([fire(T_peak_) for T_peak_ in T_peak])
+    # with the 1200 [C] sample not converged within `solver_max_iter` iterations
+    kwargs.update(solver_temperature_goal_tol=np.array([1.] * 4 + [1e-9] + [1.] * 3),
+                  solver_max_iter=np.array([20] * 4 + [2] + [20] * 3))
+    d_p, T_max, t, iter_count = _protection_thickness_batch(fire_time, fire_temperature, **kwargs)
+    for i in range(len(T_peak)):
+        res = _protection_thickness(fire_time, fire_temperature[i], **{
+            k: v[i] if isinstance(v, np.ndarray) else v for k, v in kwargs.items()})
+        assert np.allclose([d_p[i], T_max[i], t[i], iter_count[i]], res, rtol=1e-9, equal_nan=True)
+    assert np.isneginf(d_p[0]) and np.isnan(d_p[4]) and np.isposinf(d_p[-1])
+    assert np.all(np.isfinite(d_p[[1, 2, 3, 5, 6]]))
+
+
+def _test_teq_main_batch():
+    import copy
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT
+    from sfeprapy.func.mcs_gen import case_seed_sequence, main as mcs_gen_main, sampler_rng
+
+    for case_name, mcs_input in EXAMPLE_INPUT_DICT.items():
+        mcs_input = copy.deepcopy(mcs_input)
+        mcs_input['beam_position_horizontal'] = -1  # to include travelling fire worst case beam location
+        df_in = mcs_gen_main(mcs_input, 50)
+
+        # same results as `teq_main`, including the timber fuel contribution iterations
+        df_res = pd.DataFrame([teq_main(**kwargs) for kwargs in df_in.to_dict(orient='records')])
+        df_res_batch = teq_main_batch(df_in)
+
+        assert list(df_res.columns) == list(df_res_batch.columns)
+        assert (df_res['fire_type'].values == df_res_batch['fire_type'].values).all()
+        teq = df_res['solver_time_equivalence_solved'].to_numpy(dtype=float)
+        teq_batch = df_res_batch['solver_time_equivalence_solved'].to_numpy(dtype=float)
+        assert (np.isfinite(teq) == np.isfinite(teq_batch)).all()
+        is_finite = np.isfinite(teq)
+        assert np.allclose(teq[is_finite], teq_batch[is_finite], rtol=1e-9)
+        assert np.array_equal(
+            df_res['timber_solver_iter_count'].to_numpy(dtype=float),
+            df_res_batch['timber_solver_iter_count'].to_numpy(dtype=float), equal_nan=True,
+        )
+
+
+def _test_mcs_chunk_size():
     import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+        for v in mcs_input.values():
+            v['n_simulations'] = 50
+
+        for config in [dict(n_threads=2, chunk_size=16), dict(n_threads=2, chunk_size=16, batch=True)]:
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(config)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.run_mcs()
+            mcs_out = mcs.mcs_out
+            for case_name in mcs_input.keys():
+                index = mcs_out.loc[mcs_out['case_name'] == case_name, 'index'].to_numpy()
+                assert sorted(index) == list(range(50))
+
+
+def _test_mcs_executor():
+    import copy
+    import tempfile
+    from sfeprapy.func.mcs_executor import ProcessExecutor
     from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
-    from scipy.interpolate import interp1d
 
-    # increase the number of simulations so it gives sensible results
-    mcs_input = copy.deepcopy(EXAMPLE_INPUT_DICT)
-    mcs_config = copy.deepcopy(EXAMPLE_CONFIG_DICT)
-    mcs_config["n_threads"] = 1
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+        for v in mcs_input.values():
+            v['n_simulations'] = 50
+
+        # one process pool shared by multiple `run_mcs` calls, including the default chunk size
+        with ProcessExecutor(n_threads=2, preload=['sfeprapy.mcs0.mcs0_calc']) as executor:
+            for config in [dict(n_threads=2, chunk_size=16, batch=True), dict(n_threads=2)]:
+                mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+                mcs_config.update(config)
+                mcs = MCS0()
+                mcs.mcs_inputs = copy.deepcopy(mcs_input)
+                mcs.mcs_config = mcs_config
+                mcs.executor = executor
+                mcs.run_mcs()
+                assert executor.is_open
+                assert len(mcs.mcs_out.index) == 100
+        assert not executor.is_open
+
+        # executors defined in `mcs_config`
+        for config in [
+            dict(n_threads=2, chunk_size=16, executor='serial'),
+            dict(n_threads=2, chunk_size=16, batch=True, executor='futures', executor_kwargs=dict(kind='thread')),
+            dict(n_threads=2, executor='futures'),
+        ]:
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(config)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.run_mcs()
+            assert len(mcs.mcs_out.index) == 100
+
+
+def _test_mcs_remote_executor():
+    import copy
+    import multiprocessing as mp
+    import tempfile
+    from sfeprapy.func.mcs_executor import RemoteExecutor, remote_worker
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
 
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+        for v in mcs_input.values():
+            v['n_simulations'] = 50
+
+        # two worker processes on localhost
+        with RemoteExecutor(n_threads=2, address=('127.0.0.1', 0), authkey=b'test') as executor:
+            worker = mp.Process(target=remote_worker, args=(executor.address, b'test', 2, 10))
+            worker.start()
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(dict(n_threads=2, chunk_size=10, batch=True))
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.executor = executor
+            mcs.run_mcs()
+            assert len(mcs.mcs_out.index) == 100
+        worker.join(timeout=30)
+        assert not worker.is_alive()
+
+
+def _test_mcs_stream_out():
+    import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+    for v in mcs_input.values():
+        v['n_simulations'] = 50
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_config = copy.deepcopy(EXAMPLE_CONFIG_DICT)
+        mcs_config.update(dict(n_threads=2, chunk_size=16, batch=True, stream_out=True, cwd=dir_work))
+        mcs = MCS0()
+        mcs.mcs_inputs = copy.deepcopy(mcs_input)
+        mcs.mcs_config = mcs_config
+        mcs.run_mcs()
+
+        mcs_out = mcs.mcs_out
+        assert len(mcs_out.index) == 100
+        for case_name in mcs_input.keys():
+            assert os.path.isfile(os.path.join(dir_work, MCS0.DEFAULT_TEMP_FOLDER_NAME, case_name, 'meta.json'))
+            index = mcs_out.loc[mcs_out['case_name'] == case_name, 'index'].to_numpy()
+            assert sorted(index) == list(range(50))
+
+        # results of all cases are post processed one case at a time, the same as if not streamed
+        df = pd.read_csv(os.path.join(dir_work, MCS0.DEFAULT_MCS_OUTPUT_FILE_NAME))
+        assert list(df.columns) == ['case_name', 'index', 'solver_time_equivalence_solved']
+        assert list(df['case_name']) == list(mcs_out['case_name'])
+        assert np.allclose(df['solver_time_equivalence_solved'].values,
+                           mcs_out['solver_time_equivalence_solved'].values, equal_nan=True)
+        assert [len(df_.index) for df_ in mcs.mcs_out_per_case(columns=['index', 'x'])] == [50, 50]
+
+    # not streamed into the current directory of the process unless `cwd` is defined
     mcs = MCS0()
+    mcs.mcs_inputs = copy.deepcopy(mcs_input)
+    mcs.mcs_config = dict(n_threads=1, stream_out=True)
+    try:
+        mcs.run_mcs()
+        raise AssertionError('`cwd` is required')
+    except ValueError:
+        pass
+
+
+def _test_mcs_resume():
+    import copy
+    import shutil
+    import tempfile
+    from sfeprapy.func.mcs_sink import ColumnarSink
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+        for v in mcs_input.values():
+            v['n_simulations'] = 50
+        mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+        mcs_config.update(dict(n_threads=2, chunk_size=10, batch=True, seed=0))
+
+        mcs = MCS0()
+        mcs.mcs_inputs = copy.deepcopy(mcs_input)
+        mcs.mcs_config = mcs_config
+        mcs.run_mcs(resume=True)
+        mcs_out_1 = mcs.mcs_out
+
+        # mimic an interrupted run, results of the second case are lost after its first 20 samples
+        case_name = list(mcs_input.keys())[1]
+        dir_case = os.path.join(dir_work, MCS0.DEFAULT_TEMP_FOLDER_NAME, case_name)
+        x = ColumnarSink.load_inputs(dir_case)
+        df = ColumnarSink(dir_case, resume=True).read()
+        df = df.set_index('index').loc[x['index'].iloc[:20]].reset_index()[list(df.columns)]
+        shutil.rmtree(dir_case)
+        sink = ColumnarSink(dir_case)
+        sink.save_inputs(x, x_raw=mcs.mcs_inputs[case_name])
+        sink.append(df, rows=(0, 20))
+
+        mcs = MCS0()
+        mcs.mcs_inputs = copy.deepcopy(mcs_input)
+        mcs.mcs_config = mcs_config
+        mcs.run_mcs(resume=True)
+        mcs_out_2 = mcs.mcs_out
+
+        # sampled inputs are reused and resumed chunks are solved with the same random streams
+        key = ['case_name', 'index']
+        mcs_out_1, mcs_out_2 = mcs_out_1.sort_values(key), mcs_out_2.sort_values(key)
+        assert len(mcs_out_2.index) == 100
+        assert np.array_equal(
+            mcs_out_1['solver_time_equivalence_solved'].values, mcs_out_2['solver_time_equivalence_solved'].values,
+            equal_nan=True,
+        )
+
+
+def _test_mcs_stream_in():
+    import copy
+    import tempfile
+    from sfeprapy.func.mcs_gen import StratifiedSampler
+    from sfeprapy.func.mcs_sink import ColumnarSink
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+        for v in mcs_input.values():
+            v['n_simulations'] = 60
+
+        def run(**kwargs) -> pd.DataFrame:
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(kwargs)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.run_mcs()
+            return mcs.mcs_out.sort_values(['case_name', 'index'])
+
+        # samples are produced by workers, independent of chunk size and executor
+        mcs_out_1 = run(n_threads=2, stream_in=True, chunk_size=7, seed=0)
+        assert len(mcs_out_1.index) == 120
+        mcs_out_2 = run(n_threads=1, stream_in=True, chunk_size=13, seed=0)
+        for k in ['fire_load_density', 'solver_time_equivalence_solved']:
+            assert np.array_equal(mcs_out_1[k].values, mcs_out_2[k].values, equal_nan=True)
+        mcs_out_3 = run(n_threads=2, stream_in=True, batch=True, seed=0)
+        assert np.allclose(mcs_out_1['fire_load_density'].values, mcs_out_3['fire_load_density'].values)
+
+        # the same stratified values as sampled at once
+        mcs_out_4 = run(n_threads=2, seed=0)
+        for case_name in mcs_input.keys():
+            assert np.allclose(
+                np.sort(mcs_out_1[mcs_out_1['case_name'] == case_name]['fire_load_density'].values),
+                np.sort(mcs_out_4[mcs_out_4['case_name'] == case_name]['fire_load_density'].values),
+            )
+
+        # only the sampler is kept to resume from
+        dir_case = os.path.join(dir_work, MCS0.DEFAULT_TEMP_FOLDER_NAME, list(mcs_input.keys())[0])
+        run(n_threads=2, stream_in=True, seed=0)
+        assert isinstance(ColumnarSink.load_inputs(dir_case), StratifiedSampler)
+
+
+def _test_mcs_adaptive():
+    import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:1]}
+        case_name = list(mcs_input.keys())[0]
+        mcs_input[case_name]['n_simulations'] = 2000
+
+        mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+        mcs_config.update(dict(n_threads=2, batch=True, adaptive_tolerance=5 * 60, adaptive_batch_size=200))
+        mcs = MCS0()
+        mcs.mcs_inputs = copy.deepcopy(mcs_input)
+        mcs.mcs_config = mcs_config
+        mcs.run_mcs()
+
+        status = mcs.mcs_convergence[case_name]
+        assert status['converged']
+        assert status['width'] <= 5 * 60
+        assert status['n_samples'] == len(mcs.mcs_out.index) < 2000
+
+        # maximum number of samples is respected when not converged
+        mcs_input[case_name]['n_simulations'] = 300
+        mcs_config.update(dict(adaptive_tolerance=1e-3, adaptive_batch_size=100))
+        mcs = MCS0()
+        mcs.mcs_inputs = copy.deepcopy(mcs_input)
+        mcs.mcs_config = mcs_config
+        mcs.run_mcs()
+
+        status = mcs.mcs_convergence[case_name]
+        assert not status['converged']
+        assert status['n_samples'] == len(mcs.mcs_out.index) == 300
+
+
+def _test_mcs_importance_sampling():
+    import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:1]}
+        case_name = list(mcs_input.keys())[0]
+        mcs_input[case_name]['n_simulations'] = 1000
+
+        def run(bias: float = None, **kwargs) -> MCS0:
+            mcs_input_ = copy.deepcopy(mcs_input)
+            mcs_input_[case_name]['fire_load_density']['bias'] = bias
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(dict(n_threads=2, batch=True, seed=0), **kwargs)
+            mcs = MCS0()
+            mcs.mcs_inputs = mcs_input_
+            mcs.mcs_config = mcs_config
+            mcs.run_mcs()
+            return mcs
+
+        # samples are concentrated in large fire load densities, weighted samples follow the unbiased distribution
+        df_0, df_1 = run().mcs_out, run(bias=3).mcs_out
+        assert np.all(df_0['sample_weight'].values == 1)
+        assert np.mean(df_1['fire_load_density']) > np.mean(df_0['fire_load_density']) + 50
+        assert abs(np.mean(df_1['sample_weight']) - 1) < 0.05
+        assert abs(
+            np.average(df_1['fire_load_density'], weights=df_1['sample_weight']) - np.mean(df_0['fire_load_density'])
+        ) < 10
+        assert 'sample_weight' in pd.read_csv(os.path.join(dir_work, MCS0.DEFAULT_MCS_OUTPUT_FILE_NAME))
+
+        # adaptive sample size, confidence interval from weighted results
+        mcs = run(bias=3, adaptive_tolerance=1e-3, adaptive_batch_size=500)
+        status = mcs.mcs_convergence[case_name]
+        assert status['n_samples'] == 1000 and status['n_effective'] < 1000
+
+
+def _test_mcs_qmc():
+    import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:1]}
+        case_name = list(mcs_input.keys())[0]
+        mcs_input[case_name]['n_simulations'] = 512
+
+        def run(**kwargs) -> MCS0:
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(dict(n_threads=2, batch=True, seed=0, sampler='sobol', sampler_replicates=8), **kwargs)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.run_mcs()
+            return mcs
+
+        # interval of the fractile from the spread between replicates
+        mcs = run()
+        status = mcs.mcs_convergence[case_name]
+        assert status['n_replicates'] == 8 and status['n_samples'] == 512
+        assert status['lower'] <= status['estimate'] <= status['upper'] and np.isfinite(status['width'])
+
+        # samples produced by the workers are the same
+        mcs_ = run(stream_in=True, chunk_size=50)
+        for k in ['fire_load_density', 'fire_spread_speed', 'window_open_fraction']:
+            assert np.allclose(mcs.mcs_out.sort_values('index')[k].values, mcs_.mcs_out.sort_values('index')[k].values)
+
+        # adaptive sample size, every batch holds an equal share of the replicates
+        mcs = run(adaptive_tolerance=60 * 60, adaptive_batch_size=128)
+        status = mcs.mcs_convergence[case_name]
+        assert status['converged'] and status['n_samples'] < 512 and status['n_replicates'] == 8
+
+
+def _test_mcs_surrogate():
+    import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:1]}
+        case_name = list(mcs_input.keys())[0]
+        mcs_input[case_name]['n_simulations'] = 3000
+
+        def run(**kwargs) -> MCS0:
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(dict(n_threads=2, batch=True, seed=0), **kwargs)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.run_mcs()
+            return mcs
+
+        df = run().mcs_out.sort_values('index')
+        mcs = run(surrogate_n_train=1000)
+        df_ = mcs.mcs_out.sort_values('index')
+        status = mcs.mcs_surrogate[case_name]
+        assert status['n_train'] == 1000 and status['n_predicted'] == 2000 and 'fire_load_density' in status['features']
+
+        # training samples are solved, a share of the rest is emulated and only those are not exactly the same
+        is_emulated = df_['surrogate'].values.astype(bool)
+        assert not np.any(is_emulated[:1000]) and np.sum(is_emulated) == status['n_confident'] > 1500
+        teq, teq_ = df['solver_time_equivalence_solved'].values, df_['solver_time_equivalence_solved'].values
+        assert np.allclose(teq[:1000], teq_[:1000], equal_nan=True)
+        # the rest are solved in chunks other than above, agree within the tolerance of the solver
+        assert np.allclose(teq[~is_emulated], teq_[~is_emulated], rtol=1e-2, equal_nan=True)
+        assert np.median(np.abs(teq[is_emulated] - teq_[is_emulated])) < 120
+        assert abs(np.percentile(teq[np.isfinite(teq)], 80) - np.percentile(teq_[np.isfinite(teq_)], 80)) < 120
+        assert np.all(np.isnan(df_['solver_protection_thickness'].values[is_emulated]))
+
+        # resumed with all training samples solved, results streamed
+        mcs = run(surrogate_n_train=1000, stream_out=True, chunk_size=500)
+        assert np.sum(mcs.mcs_out['surrogate'].values) == mcs.mcs_surrogate[case_name]['n_confident'] > 1500
+
+
+def _test_mcs_control_variate():
+    import copy
+    import shutil
+    import tempfile
+    from sfeprapy.func.mcs_sink import ColumnarSink
+    from sfeprapy.func.mcs_gen import case_seed_sequence, main as mcs_gen_main, sampler_rng
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+        for v in mcs_input.values():
+            v['n_simulations'] = 1000
+
+        def run(resume: bool = False, **kwargs) -> MCS0:
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(dict(n_threads=2, batch=True, seed=0))
+            mcs_config.update(kwargs)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.run_mcs(resume=resume)
+            return mcs
+
+        # closed form counterpart, same order of magnitude and correlated
+        x = mcs_gen_main(copy.deepcopy(list(mcs_input.values())[1]), 500, rng=np.random.default_rng(0))
+        teq, teq_control = teq_main_batch(x)['solver_time_equivalence_solved'].values, teq_annex_b_batch(x)
+        is_finite = np.isfinite(teq)
+        assert 0.5 < np.median(teq_control) / np.median(teq[is_finite]) < 2
+        assert np.corrcoef(teq[is_finite], teq_control[is_finite])[0, 1] > 0.5
+
+        mcs = run(control_variate_n=20000, control_variate_fractiles=[0.5, 0.8])
+        df = mcs.mcs_control_variate
+        assert len(df.index) == 4 and list(df['case_name'].unique()) == list(mcs_input.keys())
+        assert np.all(df['n_samples'] == 1000) and np.all(df['n_control'] == 20000)
+        assert np.all((df['lower'] <= df['estimate']) & (df['estimate'] <= df['upper']))
+        assert np.all(df['variance_reduction'] > 1)
+        # corrected estimates are within the intervals of the plain estimates and the intervals are narrower
+        assert np.all((df['lower_plain'] <= df['estimate']) & (df['estimate'] <= df['upper_plain']))
+        assert np.sum(df['upper'] - df['lower']) < np.sum(df['upper_plain'] - df['lower_plain'])
+        assert os.path.isfile(os.path.join(dir_work, MCS0.DEFAULT_CONTROL_VARIATE_FILE_NAME))
+
+        # solved samples are the first of the samples of the cheap model
+        case_name = list(mcs_input.keys())[0]
+        x = mcs_gen_main(copy.deepcopy(mcs_input[case_name]), 20000, rng=sampler_rng(case_seed_sequence(
+            np.random.SeedSequence(0), case_name)))
+        df = mcs.mcs_out[mcs.mcs_out['case_name'] == case_name].sort_values('index')
+        assert np.allclose(df['fire_load_density'].values, x['fire_load_density'].values[:1000])
+
+        try:
+            run(control_variate_n=20000, stream_in=True)
+            raise AssertionError('`stream_in` is not applicable')
+        except ValueError:
+            pass
+
+        # an unseeded run resumed, i.e. with another seed, pairs results completed before with the same controls
+        df_1 = run(control_variate_n=5000, stream_out=True, seed=None).mcs_control_variate
+        case_name = list(mcs_input.keys())[1]
+        dir_case = os.path.join(dir_work, MCS0.DEFAULT_TEMP_FOLDER_NAME, case_name)
+        x = ColumnarSink.load_inputs(dir_case)
+        df = ColumnarSink(dir_case, resume=True).read()
+        df = df.set_index('index').loc[x['index'].iloc[:600]].reset_index()[list(df.columns)]
+        shutil.rmtree(dir_case)
+        sink = ColumnarSink(dir_case)
+        sink.save_inputs(x, x_raw=mcs.mcs_inputs[case_name])
+        sink.append(df, rows=(0, 600))
+        df_2 = run(resume=True, control_variate_n=5000, seed=None).mcs_control_variate
+        assert np.all(df_2['n_control'] == 5000)
+        assert np.allclose(df_1['estimate'].values, df_2['estimate'].values, rtol=0, atol=1e-6)
+        assert np.allclose(df_1['variance_reduction'].values, df_2['variance_reduction'].values)
+
+
+def _test_mcs_iso834_table():
+    import copy
+    import tempfile
+    from sfeprapy.func.iso834_steel_table import _tables
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    case_name = list(EXAMPLE_INPUT_DICT.keys())[0]
+    mcs_input = {case_name: copy.deepcopy(EXAMPLE_INPUT_DICT[case_name])}
+    mcs_input[case_name]['n_simulations'] = 400
+
+    def run(**kwargs) -> np.ndarray:
+        with tempfile.TemporaryDirectory() as dir_work:
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(kwargs)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.run_mcs()
+            return mcs.mcs_out.sort_values('index')['solver_time_equivalence_solved'].to_numpy(dtype=float)
+
+    # the same seeded case gives the same results however many samples the process has solved before
+    teq_1 = run(n_threads=1, seed=7, iso834_table=True)
+    assert np.array_equal(teq_1, run(n_threads=1, seed=7, iso834_table=True), equal_nan=True)
+    assert np.array_equal(teq_1, run(n_threads=2, seed=7, iso834_table=True), equal_nan=True)
+    teq_0 = run(n_threads=1, seed=7)
+    assert np.array_equal(teq_0, run(n_threads=1, seed=7), equal_nan=True)
+    assert not np.array_equal(teq_0, teq_1, equal_nan=True)  # i.e. interpolated from the table
+    is_finite = np.isfinite(teq_0)
+    assert np.array_equal(is_finite, np.isfinite(teq_1))
+    assert np.allclose(teq_0[is_finite], teq_1[is_finite], rtol=0, atol=1.)
+
+    # tables are written to the on-disk cache only if defined, results are the same
+    with tempfile.TemporaryDirectory() as dir_work:
+        _tables.clear()
+        dir_cache = os.path.join(dir_work, 'iso834_steel_table')
+        assert np.array_equal(teq_1, run(
+            n_threads=1, seed=7, iso834_table=True, iso834_table_cache_dir=dir_cache), equal_nan=True)
+        assert len(os.listdir(os.path.join(dir_cache, os.listdir(dir_cache)[0]))) > 0
+        _tables.clear()
+
+
+def _test_mcs_seed():
+    import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+        for v in mcs_input.values():
+            v['n_simulations'] = 40
+
+        def run(**kwargs) -> pd.DataFrame:
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(kwargs)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.run_mcs()
+            assert kwargs.get('seed') is None or mcs.mcs_seed == kwargs['seed']
+            return mcs.mcs_out.sort_values(['case_name', 'index'])
+
+        def teq(df: pd.DataFrame) -> np.ndarray:
+            return df['solver_time_equivalence_solved'].to_numpy()
+
+        # reproducible regardless of the executor, the number of processes and the order of cases
+        mcs_out_1 = run(n_threads=1, seed=1)
+        assert np.array_equal(teq(mcs_out_1), teq(run(n_threads=2, seed=1)), equal_nan=True)
+        mcs_input = dict(reversed(list(mcs_input.items())))
+        mcs_out_3 = run(n_threads=2, chunk_size=1, executor='futures', seed=1)
+        assert np.array_equal(teq(mcs_out_1), teq(mcs_out_3), equal_nan=True)
+
+        mcs_out_2 = run(n_threads=2, batch=True, chunk_size=8, seed=1)
+        mcs_out_3 = run(n_threads=2, batch=True, chunk_size=8, seed=1, prefetch_cases=0)
+        assert np.array_equal(teq(mcs_out_2), teq(mcs_out_3), equal_nan=True)
+        # the same samples are solved in batch
+        assert np.allclose(mcs_out_1['fire_load_density'], mcs_out_2['fire_load_density'])
+
+        assert not np.allclose(mcs_out_1['fire_load_density'], run(n_threads=1, seed=2)['fire_load_density'])
+
+
+def _test_mcs_telemetry():
+    import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+        for v in mcs_input.values():
+            v['n_simulations'] = 50
+
+        for mcs_config_ in [
+            dict(n_threads=2),
+            dict(n_threads=1),
+            # total is reduced as cases converge
+            dict(n_threads=2, batch=True, adaptive_tolerance=60 * 60, adaptive_batch_size=10),
+        ]:
+            statuses = list()
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(mcs_config_)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.telemetry_callback = statuses.append
+            mcs.run_mcs()
+
+            status = statuses[-1]
+            assert status['n_completed'] == status['n_total'] == len(mcs.mcs_out.index)
+            assert status['eta'] == 0 and status['queue_depth'] == 0
+            assert sum(v['n_samples'] for v in status['workers'].values()) == status['n_completed']
+            assert 1 <= len(status['workers']) <= mcs_config['n_threads']
+            assert all(v['samples_per_second'] > 0 for v in status['workers'].values())
+            if mcs_config['n_threads'] > 1:
+                assert len(statuses) < 100  # per chunk
+                assert str(os.getpid()) not in ''.join(status['workers'].keys())
+
+
+def _test_mcs_profile():
+    import copy
+    import tempfile
+    from sfeprapy.func.mcs_profile import TOTAL
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+    for v in mcs_input.values():
+        v['n_simulations'] = 20
+    stages = {
+        TOTAL, 'decide_fire', 'evaluate_fire_temperature', 'solve_protection_thickness',
+        'solve_time_equivalence_iso834', 'timber_iteration',
+    }
+
+    for mcs_config_ in [dict(n_threads=1), dict(n_threads=2), dict(n_threads=2, batch=True)]:
+        with tempfile.TemporaryDirectory() as dir_work:
+            mcs_config = copy.deepcopy(EXAMPLE_CONFIG_DICT)
+            mcs_config.update(mcs_config_, profile=True, cwd=dir_work)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.run_mcs()
+
+            # timings of all workers are aggregated per case and written alongside `mcs.out.csv`
+            df = pd.read_csv(os.path.join(dir_work, MCS0.DEFAULT_PROFILE_FILE_NAME))
+            assert set(df['case_name']) == set(mcs_input.keys())
+            for case_name, df_ in df.groupby('case_name'):
+                df_ = df_.set_index('stage')
+                assert set(df_.index) == stages
+                assert df_.loc[TOTAL, 'n_samples'] == df_.loc['solve_time_equivalence_iso834', 'n_samples'] == 20
+                assert df_.loc['decide_fire', 'n_samples'] >= 20
+                assert df_.loc['timber_iteration', 'n_calls'] >= (1 if mcs_config.get('batch') else 20)
+                assert df_.loc[TOTAL, 'time'] >= df_.loc['timber_iteration', 'time'] > 0
+                if not mcs_config.get('batch'):
+                    assert 0 <= df_.loc['solve_protection_thickness', 'index_max'] < 20
+            assert len(mcs.mcs_profile.index) == len(df.index)
+
+    # not profiled by default
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs = MCS0()
+        mcs.mcs_inputs = copy.deepcopy(mcs_input)
+        mcs.mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), n_threads=2, cwd=dir_work)
+        mcs.run_mcs()
+        assert mcs.mcs_profile is None
+        assert not os.path.exists(os.path.join(dir_work, MCS0.DEFAULT_PROFILE_FILE_NAME))
+
+
+def _test_mcs_prefetch_cases():
+    import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        # many small cases, tasks of all cases are queued in the executor at once by default
+        case_0 = copy.deepcopy(list(EXAMPLE_INPUT_DICT.values())[0])
+        case_0['n_simulations'] = 20
+        mcs_input = {f'Case {i}': dict(copy.deepcopy(case_0), case_name=f'Case {i}') for i in range(6)}
+
+        for mcs_config_ in [
+            dict(n_threads=2, batch=True),
+            dict(n_threads=2, batch=True, prefetch_cases=0),
+            dict(n_threads=2, chunk_size=4, prefetch_cases=2),
+            dict(n_threads=2),
+        ]:
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(mcs_config_)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            mcs.run_mcs()
+
+            mcs_out = mcs.mcs_out
+            assert len(mcs_out.index) == 120
+            # results are routed back to their cases
+            assert list(mcs_out['case_name'].unique()) == list(mcs_input.keys())
+            assert all(mcs_out.groupby('case_name')['index'].apply(lambda x: sorted(x) == list(range(20))))
+
+
+def _test_mcs_cache():
+    import asyncio
+    import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+        for v in mcs_input.values():
+            v['n_simulations'] = 50
+        case_1, case_2 = mcs_input.keys()
+
+        async def run(mcs_input_: dict, **kwargs):
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(dict(n_threads=2, batch=True, cache_dir=dir_cache, seed=0))
+            mcs_config.update(kwargs)
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input_)
+            mcs.mcs_config = mcs_config
+            events = [e async for e in mcs.run_async()]
+            cached = {e['case_name']: e['cached'] for e in events if e['event'] == 'case_start'}
+            results = {e['case_name']: e['result'] for e in events if e['event'] == 'case_end'}
+            return cached, results
+
+        with tempfile.TemporaryDirectory() as dir_cache:
+            cached, results_1 = asyncio.run(run(mcs_input))
+            assert cached == {case_1: False, case_2: False}
+
+            # only the changed case is solved
+            mcs_input[case_2]['fire_load_density']['mean'] = 600
+            cached, results_2 = asyncio.run(run(mcs_input, stream_out=True))
+            assert cached == {case_1: True, case_2: False}
+            teq_1 = results_1[case_1]['solver_time_equivalence_solved'].to_numpy()
+            assert np.array_equal(teq_1, results_2[case_1]['solver_time_equivalence_solved'].to_numpy(), equal_nan=True)
+            assert len(results_2[case_2].index) == 50
+
+            cached, _ = asyncio.run(run(mcs_input))
+            assert cached == {case_1: True, case_2: True}
+
+            # unseeded runs are neither served from nor stored in the cache
+            cached, _ = asyncio.run(run(mcs_input, seed=None))
+            assert cached == {case_1: False, case_2: False}
+            n_entries = len(os.listdir(dir_cache))
+            mcs_input[case_1]['fire_load_density']['mean'] = 600
+            cached, _ = asyncio.run(run(mcs_input, seed=None))
+            assert cached == {case_1: False, case_2: False} and len(os.listdir(dir_cache)) == n_entries
+
+
+def _test_mcs_run_async():
+    import asyncio
+    import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        mcs_input = {k: copy.deepcopy(EXAMPLE_INPUT_DICT[k]) for k in list(EXAMPLE_INPUT_DICT.keys())[:2]}
+        for v in mcs_input.values():
+            v['n_simulations'] = 50
+
+        async def collect(mcs_):
+            return [event async for event in mcs_.run_async()]
+
+        for n_threads in (1, 2):
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(dict(n_threads=n_threads))
+            mcs = MCS0()
+            mcs.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs.mcs_config = mcs_config
+            events = asyncio.run(collect(mcs))
+
+            assert [e['event'] for e in events if e['event'] != 'chunk'] == ['case_start', 'case_end'] * 2 + ['end']
+            chunks = [e for e in events if e['event'] == 'chunk']
+            assert sum(len(e['result'].index) for e in chunks) == 100
+            assert chunks[-1]['n_completed'] == chunks[-1]['n_simulations'] == 50
+            assert len(events[-1]['result'].index) == len(mcs.mcs_out.index) == 100
+
+        # the consumer stopping early closes the run
+        async def first_chunk(mcs_):
+            async for event in mcs_.run_async():
+                if event['event'] == 'chunk':
+                    return event
+
+        assert len(asyncio.run(first_chunk(mcs))['result'].index) > 0
+
+
+def _test_standard_case():
+    import copy
+    import tempfile
+    from sfeprapy.mcs0 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+    from scipy.interpolate import interp1d
 
-    mcs.mcs_inputs = mcs_input
-    mcs.mcs_config = mcs_config
-    mcs.run_mcs()
-    mcs_out = mcs.mcs_out
-
-    def get_time_equivalence(data, fractile: float):
-        hist, edges = np.histogram(data, bins=np.arange(0, 181, 0.5))
-        x, y = (edges[:-1] + edges[1:]) / 2, np.cumsum(hist / np.sum(hist))
-        return interp1d(y, x)(fractile)
-
-    mcs_out_standard_case_1 = mcs_out.loc[mcs_out['case_name'] == 'Standard Case 1']
-    teq = mcs_out_standard_case_1["solver_time_equivalence_solved"] / 60.0
-    teq_at_80_percentile = get_time_equivalence(teq, 0.8)
-    print(f'Time equivalence at CDF 0.8 is {teq_at_80_percentile:<6.3f} min')
-    target, target_tol = 60, 2
-    assert target - target_tol < teq_at_80_percentile < target + target_tol
-
-    mcs_out_standard_case_2 = mcs_out.loc[mcs_out['case_name'] == 'Standard Case 2 (with teq_phi)']
-    teq = mcs_out_standard_case_2["solver_time_equivalence_solved"] / 60.0
-    teq_at_80_percentile = get_time_equivalence(teq, 0.8)
-    print(f'Time equivalence at CDF 0.8 is {teq_at_80_percentile:<6.3f} min')
-    target, target_tol = 64, 2  # 64 minutes based on a test run on 2nd Oct 2020
-    assert target - target_tol < teq_at_80_percentile < target + target_tol
-
-    mcs_out_standard_case_3 = mcs_out.loc[mcs_out['case_name'] == 'Standard Case 3 (with timber)']
-    teq = mcs_out_standard_case_3["solver_time_equivalence_solved"] / 60.0
-    teq_at_80_percentile = get_time_equivalence(teq, 0.8)
-    print(f'Time equivalence at CDF 0.8 is {teq_at_80_percentile:<6.3f} min')
-    target, target_tol = 90, 2  # 81 minutes based on a test run on 2nd Oct 2020
-    assert target - target_tol < teq_at_80_percentile < target + target_tol
+    with tempfile.TemporaryDirectory() as dir_work:
+        # increase the number of simulations so it gives sensible results
+        mcs_input = copy.deepcopy(EXAMPLE_INPUT_DICT)
+        mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+        mcs_config["n_threads"] = 1
+
+        mcs = MCS0()
+
+        mcs.mcs_inputs = mcs_input
+        mcs.mcs_config = mcs_config
+        mcs.run_mcs()
+        mcs_out = mcs.mcs_out
+
+        def get_time_equivalence(data, fractile: float):
+            hist, edges = np.histogram(data, bins=np.arange(0, 181, 0.5))
+            x, y = (edges[:-1] + edges[1:]) / 2, np.cumsum(hist / np.sum(hist))
+            return interp1d(y, x)(fractile)
+
+        mcs_out_standard_case_1 = mcs_out.loc[mcs_out['case_name'] == 'Standard Case 1']
+        teq = mcs_out_standard_case_1["solver_time_equivalence_solved"] / 60.0
+        teq_at_80_percentile = get_time_equivalence(teq, 0.8)
+        print(f'Time equivalence at CDF 0.8 is {teq_at_80_percentile:<6.3f} min')
+        target, target_tol = 60, 2
+        assert target - target_tol < teq_at_80_percentile < target + target_tol
+
+        mcs_out_standard_case_2 = mcs_out.loc[mcs_out['case_name'] == 'Standard Case 2 (with teq_phi)']
+        teq = mcs_out_standard_case_2["solver_time_equivalence_solved"] / 60.0
+        teq_at_80_percentile = get_time_equivalence(teq, 0.8)
+        print(f'Time equivalence at CDF 0.8 is {teq_at_80_percentile:<6.3f} min')
+        target, target_tol = 64, 2  # 64 minutes based on a test run on 2nd Oct 2020
+        assert target - target_tol < teq_at_80_percentile < target + target_tol
+
+        mcs_out_standard_case_3 = mcs_out.loc[mcs_out['case_name'] == 'Standard Case 3 (with timber)']
+        teq = mcs_out_standard_case_3["solver_time_equivalence_solved"] / 60.0
+        teq_at_80_percentile = get_time_equivalence(teq, 0.8)
+        print(f'Time equivalence at CDF 0.8 is {teq_at_80_percentile:<6.3f} min')
+        target, target_tol = 90, 2  # 81 minutes based on a test run on 2nd Oct 2020
+        assert target - target_tol < teq_at_80_percentile < target + target_tol
 
 
 if __name__ == '__main__':
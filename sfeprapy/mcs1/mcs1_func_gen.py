@@ -189,7 +189,7 @@ def gumbel_r_trunc_ppf(a, b, n_rv, loc, scale, cdf_y=None):
 
 
 def latin_hypercube_sampling(
-    num_samples, num_arguments=1, sample_lbound=0, sample_ubound=1
+    num_samples, num_arguments=1, sample_lbound=0, sample_ubound=1, rng=None
 ):
     """
     NAME: latin_hypercube_sampling
@@ -205,6 +205,7 @@ def latin_hypercube_sampling(
     :param num_arguments: Number of arguments (i.e. columns)
     :param sample_lbound: Lower sampling boundary
     :param sample_ubound: Upper sampling boundary
+    :param rng: Optional, `numpy.random.Generator` to shuffle the columns, the global `np.random` state if undefined
     :return: An array with shape (num_samples, num_arguments)
 
     EXAMPLE:
@@ -243,7 +244,7 @@ def latin_hypercube_sampling(
     # np.random.shuffle(mat_random_nums)
 
     for i in range(np.shape(mat_random_nums)[1]):
-        np.random.shuffle(mat_random_nums[:, i])
+        (np.random if rng is None else rng).shuffle(mat_random_nums[:, i])
 
     if num_arguments == 1:
         mat_random_nums = mat_random_nums.flatten()
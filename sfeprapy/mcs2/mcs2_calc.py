@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from sfeprapy.mcs0.mcs0_calc import MCS0
 from sfeprapy.mcs0.mcs0_calc import teq_main as teq_main_mcs0
+from sfeprapy.mcs0.mcs0_calc import teq_main_batch as teq_main_batch_mcs0
 
 
 def teq_main_wrapper(args):
@@ -59,6 +60,10 @@ def teq_main(
         timber_exposed_area: float = None,
         timber_solver_tol: float = None,
         timber_solver_ilim: float = None,
+        sample_weight: float = 1.,
+        iso834_table: bool = False,
+        iso834_table_cache_dir: str = None,
+        iso834_table_cache_max_size: int = None,
         *_,
         **__,
 ) -> dict:
@@ -103,47 +108,111 @@ def teq_main(
     return outputs
 
 
+def teq_main_batch(
+        df,
+        iso834_table: bool = False,
+        iso834_table_cache_dir: str = None,
+        iso834_table_cache_max_size: int = None,
+):
+    """Columnar version of `teq_main`, see `sfeprapy.mcs0.mcs0_calc.teq_main_batch`."""
+    df = df.copy()
+
+    room_floor_area = df['room_floor_area'].to_numpy(dtype=float)
+    room_breadth_depth_ratio = df['room_breadth_depth_ratio'].to_numpy(dtype=float)
+
+    # Calculate `room_breadth` and `room_depth`, see `teq_main`
+    room_depth = (room_floor_area / room_breadth_depth_ratio) ** 0.5
+    room_breadth = room_breadth_depth_ratio * (room_floor_area / room_breadth_depth_ratio) ** 0.5
+    assert (room_breadth_depth_ratio <= 1).all()
+    assert (abs(room_depth * room_breadth - room_floor_area) < 1e-5).all()
+
+    # Calculate window opening width
+    window_width = room_floor_area * df['window_floor_ratio'].to_numpy(dtype=float) / df['window_height'].to_numpy(
+        dtype=float)
+
+    df['room_breadth'] = room_depth
+    df['room_depth'] = room_breadth
+    df['window_width'] = window_width
+
+    return teq_main_batch_mcs0(
+        df, iso834_table=iso834_table, iso834_table_cache_dir=iso834_table_cache_dir,
+        iso834_table_cache_max_size=iso834_table_cache_max_size,
+    )
+
+
 class MCS2(MCS0):
     def __init__(self):
         super().__init__()
 
     def mcs_deterministic_calc(self, *args, **kwargs) -> dict:
-        return teq_main(*args, **kwargs)
+        return teq_main(*args, **kwargs, **self._iso834_table_kwargs())
 
     def mcs_deterministic_calc_mp(self, *args, **kwargs) -> dict:
         return teq_main_wrapper(*args, **kwargs)
 
+    def mcs_deterministic_calc_batch(self, *args, **kwargs):
+        return teq_main_batch(*args, **kwargs, **self._iso834_table_kwargs())
+
+
+def _test_mcs_importance_sampling():
+    import copy
+    from sfeprapy.mcs2 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
+    import numpy as np
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        case_name = list(EXAMPLE_INPUT_DICT.keys())[0]
+        mcs_input = {case_name: copy.deepcopy(EXAMPLE_INPUT_DICT[case_name])}
+        mcs_input[case_name].update(n_simulations=200, probability_weight=1.)
+        mcs_input[case_name]['fire_load_density']['bias'] = 2
+
+        def run(**kwargs) -> np.ndarray:
+            mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+            mcs_config.update(dict(n_threads=1, seed=0), **kwargs)
+            mcs2 = MCS2()
+            mcs2.mcs_inputs = copy.deepcopy(mcs_input)
+            mcs2.mcs_config = mcs_config
+            mcs2.run_mcs()
+            return mcs2.mcs_out.sort_values('index')['sample_weight'].to_numpy(dtype=float)
+
+        # importance sampling weights are carried through by both the per sample and the columnar routines
+        sample_weight = run()
+        assert len(np.unique(sample_weight)) > 1 and abs(np.mean(sample_weight) - 1) < 0.2
+        assert np.allclose(sample_weight, run(batch=True))
+
 
 def _test_standard_case_new():
     import copy
     from sfeprapy.mcs2 import EXAMPLE_INPUT_DICT, EXAMPLE_CONFIG_DICT
     from scipy.interpolate import interp1d
     import numpy as np
-
-    # increase the number of simulations so it gives sensible results
-    mcs_input = copy.deepcopy(EXAMPLE_INPUT_DICT)
-    mcs_config = copy.deepcopy(EXAMPLE_CONFIG_DICT)
-    for k in list(mcs_input.keys()):
-        mcs_input[k]["phi_teq"] = 1
-        mcs_input[k]["n_simulations"] = 10000
-        mcs_input[k]["probability_weight"] = 1 / 3.0
-        mcs_input[k]["fire_time_duration"] = 10000
-        mcs_input[k]["timber_exposed_area"] = 0
-
-    # increase the number of threads so it runs faster
-    mcs_config["n_threads"] = 1  # coverage does not support
-    mcs2 = MCS2()
-    mcs2.mcs_inputs = mcs_input
-    mcs2.mcs_config = mcs_config
-    mcs2.run_mcs()
-    mcs_out = mcs2.mcs_out
-    teq = mcs_out["solver_time_equivalence_solved"] / 60.0
-    hist, edges = np.histogram(teq, bins=np.arange(0, 181, 0.5))
-    x, y = (edges[:-1] + edges[1:]) / 2, np.cumsum(hist / np.sum(hist))
-    teq_at_80_percentile = interp1d(y, x)(0.8)
-    print(teq_at_80_percentile)
-    # target, target_tol = 60, 2
-    # assert target - target_tol < teq_at_80_percentile < target + target_tol
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as dir_work:
+        # increase the number of simulations so it gives sensible results
+        mcs_input = copy.deepcopy(EXAMPLE_INPUT_DICT)
+        mcs_config = dict(copy.deepcopy(EXAMPLE_CONFIG_DICT), cwd=dir_work)
+        for k in list(mcs_input.keys()):
+            mcs_input[k]["phi_teq"] = 1
+            mcs_input[k]["n_simulations"] = 10000
+            mcs_input[k]["probability_weight"] = 1 / 3.0
+            mcs_input[k]["fire_time_duration"] = 10000
+            mcs_input[k]["timber_exposed_area"] = 0
+
+        # increase the number of threads so it runs faster
+        mcs_config["n_threads"] = 1  # coverage does not support
+        mcs2 = MCS2()
+        mcs2.mcs_inputs = mcs_input
+        mcs2.mcs_config = mcs_config
+        mcs2.run_mcs()
+        mcs_out = mcs2.mcs_out
+        teq = mcs_out["solver_time_equivalence_solved"] / 60.0
+        hist, edges = np.histogram(teq, bins=np.arange(0, 181, 0.5))
+        x, y = (edges[:-1] + edges[1:]) / 2, np.cumsum(hist / np.sum(hist))
+        teq_at_80_percentile = interp1d(y, x)(0.8)
+        print(teq_at_80_percentile)
+        # target, target_tol = 60, 2
+        # assert target - target_tol < teq_at_80_percentile < target + target_tol
 
 
 if __name__ == '__main__':
@@ -0,0 +1,5 @@
+from sfeprapy.func.fire_parametric import _test_temperature_din_fsetools as test_temperature_din_fsetools
+from sfeprapy.func.fire_parametric import _test_temperature_ec_fsetools as test_temperature_ec_fsetools
+
+test_temperature_ec_fsetools()
+test_temperature_din_fsetools()
@@ -0,0 +1,5 @@
+from sfeprapy.func.fire_travelling import _test_temperature_fsetools as test_temperature_fsetools
+from sfeprapy.func.fire_travelling import _test_worst_case_beam_location as test_worst_case_beam_location
+
+test_temperature_fsetools()
+test_worst_case_beam_location()
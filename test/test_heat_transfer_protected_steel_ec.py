@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from sfeprapy.func.heat_transfer_protected_steel_ec import _test_temperature_fsetools as test_temperature_fsetools
+
+test_temperature_fsetools()
@@ -0,0 +1,3 @@
+from sfeprapy.func.iso834_steel_table import _test_iso834_steel_table as test_iso834_steel_table
+
+test_iso834_steel_table()
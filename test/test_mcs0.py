@@ -1,7 +1,47 @@
 # -*- coding: utf-8 -*-
 
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_adaptive as test_mcs_adaptive
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_cache as test_mcs_cache
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_chunk_size as test_mcs_chunk_size
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_control_variate as test_mcs_control_variate
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_executor as test_mcs_executor
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_importance_sampling as test_mcs_importance_sampling
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_iso834_table as test_mcs_iso834_table
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_stream_in as test_mcs_stream_in
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_stream_out as test_mcs_stream_out
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_prefetch_cases as test_mcs_prefetch_cases
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_profile as test_mcs_profile
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_qmc as test_mcs_qmc
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_remote_executor as test_mcs_remote_executor
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_resume as test_mcs_resume
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_run_async as test_mcs_run_async
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_seed as test_mcs_seed
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_surrogate as test_mcs_surrogate
+from sfeprapy.mcs0.mcs0_calc import _test_mcs_telemetry as test_mcs_telemetry
+from sfeprapy.mcs0.mcs0_calc import _test_protection_thickness as test_protection_thickness
 from sfeprapy.mcs0.mcs0_calc import _test_standard_case as test_standard_case
+from sfeprapy.mcs0.mcs0_calc import _test_teq_main_batch as test_teq_main_batch
 from sfeprapy.mcs0.mcs0_calc import _test_teq_phi as test_teq_phi
 
 test_teq_phi()
+test_protection_thickness()
+test_teq_main_batch()
+test_mcs_chunk_size()
+test_mcs_executor()
+test_mcs_remote_executor()
+test_mcs_stream_out()
+test_mcs_resume()
+test_mcs_stream_in()
+test_mcs_adaptive()
+test_mcs_importance_sampling()
+test_mcs_qmc()
+test_mcs_surrogate()
+test_mcs_control_variate()
+test_mcs_run_async()
+test_mcs_prefetch_cases()
+test_mcs_cache()
+test_mcs_seed()
+test_mcs_iso834_table()
+test_mcs_telemetry()
+test_mcs_profile()
 test_standard_case()
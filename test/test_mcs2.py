@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from sfeprapy.mcs2.mcs2_calc import _test_mcs_importance_sampling as test_mcs_importance_sampling
+
+test_mcs_importance_sampling()
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from sfeprapy.func.mcs_cache import _test_result_cache as test_result_cache
+
+test_result_cache()
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+from sfeprapy.func.mcs_convergence import (
+    _test_control_variate_fractile_interval as test_control_variate_fractile_interval,
+)
+from sfeprapy.func.mcs_convergence import _test_fractile_confidence_interval as test_fractile_confidence_interval
+
+from sfeprapy.func.mcs_convergence import _test_replicate_fractile_interval as test_replicate_fractile_interval
+from sfeprapy.func.mcs_convergence import (
+    _test_weighted_fractile_confidence_interval as test_weighted_fractile_confidence_interval,
+)
+
+test_fractile_confidence_interval()
+test_weighted_fractile_confidence_interval()
+test_replicate_fractile_interval()
+test_control_variate_fractile_interval()
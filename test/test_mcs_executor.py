@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+from sfeprapy.func.mcs_executor import _test_executors as test_executors
+from sfeprapy.func.mcs_executor import _test_process_executor as test_process_executor
+from sfeprapy.func.mcs_executor import _test_remote_executor_worker_lost as test_remote_executor_worker_lost
+
+test_process_executor()
+test_executors()
+test_remote_executor_worker_lost()
@@ -1,9 +1,17 @@
 # -*- coding: utf-8 -*-
 
 from sfeprapy.func.mcs_gen import _test_dict_flatten as test_mcs_gen_dict_flatten
+from sfeprapy.func.mcs_gen import _test_importance_sampling as test_mcs_gen_importance_sampling
+from sfeprapy.func.mcs_gen import _test_qmc_sampler as test_mcs_gen_qmc_sampler
 from sfeprapy.func.mcs_gen import (
     _test_random_variable_generator as test_mcs_gen_random_variable_generator,
 )
+from sfeprapy.func.mcs_gen import _test_seed_sequence as test_mcs_gen_seed_sequence
+from sfeprapy.func.mcs_gen import _test_stratified_sampler as test_mcs_gen_stratified_sampler
 
 test_mcs_gen_dict_flatten()
 test_mcs_gen_random_variable_generator()
+test_mcs_gen_seed_sequence()
+test_mcs_gen_stratified_sampler()
+test_mcs_gen_importance_sampling()
+test_mcs_gen_qmc_sampler()
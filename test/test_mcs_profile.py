@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from sfeprapy.func.mcs_profile import _test_mcs_profile as test_mcs_profile
+
+test_mcs_profile()
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from sfeprapy.func.mcs_shared import _test_shared_constants as test_shared_constants
+
+test_shared_constants()
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from sfeprapy.func.mcs_sink import _test_columnar_sink as test_columnar_sink
+
+test_columnar_sink()
@@ -0,0 +1,3 @@
+from sfeprapy.func.mcs_surrogate import _test_polynomial_chaos_surrogate as test_polynomial_chaos_surrogate
+
+test_polynomial_chaos_surrogate()
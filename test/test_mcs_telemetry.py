@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from sfeprapy.func.mcs_telemetry import _test_mcs_telemetry as test_mcs_telemetry
+
+test_mcs_telemetry()